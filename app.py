@@ -1,14 +1,32 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response, stream_with_context
 import os
 import psycopg2
+from psycopg2.extras import execute_values
 import threading
+import atexit
 import time
 from datetime import datetime
 from dinamica_simbolica import aplicar_dinamica_simbolica
 from modulo_funcoes import gerar_grafico_interativo
-from ml_classifier import EEGClassifier
+from ml_classifier import EEGClassifier, prever_lote_modelos
 from testes_sistema import TestadorSistema
 from modelo_comparador import ModeloComparador
+from qualidade_sinal import avaliar_qualidade, garantir_coluna_qualidade
+from cache_predicoes import CachePredicoes, versao_arquivo_modelo
+from servidor_inferencia import LoteadorInferencia
+from cascata_inferencia import CascataInferencia, ajustar_limiares
+from fila_tarefas import FilaTarefas, FilaCheia
+from classificacao_continua import GerenciadorSessoes, ler_amostras_texto, formatar_evento_sse
+from treinamento_paralelo import treinar_modelos_paralelo
+from aprendizado_online import AprendizadoOnline
+from busca_hiperparametros import ESPACOS, buscar_com_dataset, carregar_resultados
+import validacao_cruzada
+import destilacao
+from perfil_treino import PerfilTreino, salvar_perfil, listar_perfis
+from werkzeug.datastructures import FileStorage
+import io
+from complexidade import complexidade_lempel_ziv, calcular_features_complexidade
+from entropia_multiescala import calcular_features_multiescala
 import numpy as np
 import uuid
 from config import config
@@ -27,6 +45,7 @@ classifier = EEGClassifier()
 # Variáveis globais para logs e status
 retraining_logs = []
 retraining_status = "idle"  # idle, running, completed, error
+perfil_retreinamento = None  # PerfilTreino do retreinamento em andamento
 test_logs = []
 test_status = "idle"
 
@@ -34,9 +53,20 @@ test_status = "idle"
 classifier_cnn = None
 classifier_lstm = None
 classifier_cnn_original = None  # Modelo CNN original
+classifier_estudante = None  # Estudante destilado do ensemble Keras
 
-# Cache de predições para performance
-cache_predicoes = None
+# Cache de predições por (sinal, modelo, versão do modelo)
+cache_predicoes = CachePredicoes()
+
+# Arquivo salvo de cada modelo (a versão do modelo é o hash do arquivo)
+ARQUIVOS_MODELOS = {
+    'principal': config.MODEL_PATH,
+    'mlp_tabular': 'modelo_mlp_tabular.pkl',
+    'cnn_original': 'modelo_cnn.pkl',
+    'lstm': 'modelo_lstm.pkl',
+    'online': config.ONLINE_MODEL_PATH,
+    'estudante': config.DISTILL_MODEL_PATH
+}
 
 # Sistema de gerenciamento de processos
 processos_ativos = {}
@@ -105,22 +135,70 @@ def obter_conexao_db():
     """Conecta ao banco de dados PostgreSQL."""
     return psycopg2.connect(**config.get_db_connection_string())
 
+def modelos_carregados():
+    """Modelos em memória por nome de predição (os ainda não carregados valem None)"""
+    return {'principal': classifier, 'mlp_tabular': classifier_cnn,
+            'cnn_original': classifier_cnn_original, 'lstm': classifier_lstm,
+            'online': aprendizado_online.modelo if config.ONLINE_LEARNING else None,
+            'estudante': classifier_estudante}
+
 def carregar_cache_predicoes():
-    """Carrega cache de predições se existir"""
-    global cache_predicoes
+    """Carrega o cache de predições persistido, se existir"""
+    return cache_predicoes.carregar()
+
+def prever_lote_cache(nome_modelo, modelo, ids_sinais):
+    """
+    Predição em lote consultando antes o cache versionado; só os sinais ausentes
+    do cache vão para o modelo
+    
+    Returns:
+        dict: {id_sinal: predição ou None}
+    """
+    resultados = {id_sinal: cache_predicoes.obter(id_sinal, nome_modelo, modelo.versao) for id_sinal in ids_sinais}
+    faltantes = [id_sinal for id_sinal, predicao in resultados.items() if predicao is None]
+    if faltantes:
+        for id_sinal, predicao in modelo.prever_lote(faltantes).items():
+            resultados[id_sinal] = predicao
+            cache_predicoes.guardar(id_sinal, nome_modelo, modelo.versao, predicao)
+    return resultados
+
+# Requisições concorrentes de /predicao_sinal viram micro-lotes do modelo principal
+loteador_predicoes = LoteadorInferencia(lambda ids_sinais: prever_lote_cache('principal', classifier, ids_sinais))
+
+# Cascata: Random Forest primeiro, modelos Keras só para os sinais incertos
+cascata = CascataInferencia()
+
+# Tarefas assíncronas (predições e uploads) fora da thread da requisição
+fila_tarefas = FilaTarefas()
+
+# Sessões de classificação contínua (buffer circular por sessão)
+sessoes_continuas = GerenciadorSessoes()
+
+# Modelo atualizado com partial_fit a cada categoria real marcada
+aprendizado_online = AprendizadoOnline()
+
+# Busca de hiperparâmetros em segundo plano (uma por vez)
+busca_logs = []
+lock_busca = threading.Lock()
+busca_em_andamento = False
+
+def requisicao_assincrona():
+    """Indica se a requisição pediu execução assíncrona (?assincrono=1)"""
+    return request.args.get('assincrono', '').lower() in ('1', 'true', 'sim')
+
+def enfileirar_tarefa(tipo, funcao, *args):
+    """Enfileira uma tarefa e responde 202 com o ID, ou 429 se a fila estiver cheia"""
     try:
-        if os.path.exists('cache_predicoes.pkl'):
-            import pickle
-            with open('cache_predicoes.pkl', 'rb') as f:
-                cache_predicoes = pickle.load(f)
-            print(f"✅ Cache carregado: {len(cache_predicoes)} predições")
-            return True
-        else:
-            print("⚠️ Cache de predições não encontrado")
-            return False
-    except Exception as e:
-        print(f"❌ Erro ao carregar cache: {e}")
-        return False
+        id_tarefa = fila_tarefas.submeter(tipo, funcao, *args)
+    except FilaCheia as e:
+        resposta = jsonify({'sucesso': False, 'erro': str(e)})
+        resposta.headers['Retry-After'] = '1'
+        return resposta, 429
+    return jsonify({
+        'sucesso': True,
+        'id_tarefa': id_tarefa,
+        'status_url': url_for('consultar_tarefa', id_tarefa=id_tarefa)
+    }), 202
 
 def inicializar_classificador():
     """Inicializa o classificador, carregando modelo salvo ou treinando novo."""
@@ -146,13 +224,15 @@ def inicializar_classificador():
     try:
         log_retraining("📊 Criando dataset de treinamento...")
         X, y, _ = classifier.criar_dataset(limite=20)
-        log_retraining(f"✅ Dataset criado: {X.shape[0]} amostras, {X.shape[1]} features")
+        origem = "cache reutilizado" if classifier.dataset_do_cache else "features extraídas"
+        log_retraining(f"✅ Dataset criado: {X.shape[0]} amostras, {X.shape[1]} features ({origem})")
         
         log_retraining("🧠 Criando modelo Random Forest...")
         classifier.criar_modelo(tipo_modelo='random_forest')
         
         log_retraining("🚀 Iniciando treinamento...")
         resultado_treino = classifier.treinar_modelo(X, y)
+        classifier.ids_treino = set(int(id_sinal) for id_sinal in classifier.ids_dataset)
         log_retraining("✅ Treinamento concluído com sucesso!")
         
         log_retraining("💾 Salvando modelo...")
@@ -196,25 +276,18 @@ def home():
         # Processar sinais com o limite correto
         sinais_para_processar = resultado['dados_sinais'][:limite]  # Usar o limite correto
         
+        # Predição do modelo principal (Random Forest) para todos os sinais de uma vez
+        predicoes_lote = {}
+        if classifier and classifier.is_trained:
+            predicoes_lote = prever_lote_cache('principal', classifier, [sinal['id'] for sinal in sinais_para_processar])
+        
         for sinal in sinais_para_processar:
             try:
                 resultado_ds = aplicar_dinamica_simbolica(sinal['id'], m=3)
                 if resultado_ds is None:
                     continue
                 
-                # Fazer apenas predição do modelo principal (Random Forest) para velocidade
-                predicao = None
-                if classifier and classifier.is_trained:
-                    try:
-                        predicao_raw = classifier.prever_sinal(sinal['id'])
-                        # Verificar se a predição é válida
-                        if predicao_raw and isinstance(predicao_raw, dict):
-                            predicao = predicao_raw
-                        else:
-                            predicao = None
-                    except Exception as e:
-                        print(f"❌ Erro na predição: {e}")
-                        predicao = None
+                predicao = predicoes_lote.get(sinal['id'])
                 
                 # Buscar predições salvas no banco de dados
                 predicoes_salvas = buscar_predicoes_banco(sinal['id'])
@@ -253,11 +326,51 @@ def home():
     except Exception as erro_geral:
         return render_template("erro.html", mensagem=f"Erro ao carregar a página principal: {erro_geral}")
 
-def executar_retreinamento_background():
-    """Executa o retreinamento em background"""
+def retreinar_floresta_principal(completo=False):
+    """Retreino incremental do Random Forest principal (warm_start), salvo ao final"""
+    def log_retraining(mensagem):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] {mensagem}"
+        retraining_logs.append(log_entry)
+        print(log_entry)
+    
+    log_retraining("🚀 Retreino incremental do Random Forest...")
+    registro = classifier.retreinar_floresta(completo=completo, log=log_retraining)
+    if registro is None:
+        return False
+    
+    log_retraining("💾 Salvando modelo...")
+    if not classifier.salvar_modelo(config.MODEL_PATH):
+        return False
+    log_retraining(f"✅ Random Forest salvo ({registro['modo']}, {registro['arvores']} árvores, "
+                   f"{registro.get('duracao_s', 0):.1f}s)")
+    return True
+
+def iniciar_perfil(nome):
+    """Cria o perfil do retreinamento e o liga ao classificador principal"""
+    global perfil_retreinamento
+    perfil_retreinamento = PerfilTreino(nome)
+    classifier.perfil = perfil_retreinamento
+    return perfil_retreinamento
+
+def encerrar_perfil(status):
+    """Finaliza e grava o perfil do retreinamento (mantido em memória para /status_retreinamento)"""
+    perfil = perfil_retreinamento
+    classifier.perfil = None
+    if perfil is None:
+        return
+    perfil.finalizar(status)
+    try:
+        salvar_perfil(perfil)
+    except Exception as e:
+        print(f"⚠️ Erro ao gravar o perfil do retreinamento: {e}")
+
+def executar_retreinamento_background(completo=False):
+    """Executa o retreinamento em background (completo=True refaz o Random Forest do zero)"""
     global retraining_status, retraining_logs
     retraining_status = "running"
     retraining_logs.clear()
+    iniciar_perfil('retreinamento')
     
     # Obter ID do processo atual
     processo_id = None
@@ -274,7 +387,14 @@ def executar_retreinamento_background():
             retraining_status = "cancelled"
             return
         
-        sucesso = inicializar_classificador()
+        if config.RF_INCREMENTAL and classifier.is_trained:
+            sucesso = retreinar_floresta_principal(completo)
+        else:
+            sucesso = inicializar_classificador()
+        if sucesso:
+            # Predições de versões anteriores do modelo principal não servem mais
+            cache_predicoes.invalidar_modelo('principal', manter_versao=classifier.versao)
+            cache_predicoes.salvar()
         
         # Verificar cancelamento após inicialização
         if processo_id and verificar_cancelamento(processo_id):
@@ -289,6 +409,8 @@ def executar_retreinamento_background():
     except Exception as e:
         retraining_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Erro geral: {e}")
         retraining_status = "error"
+    finally:
+        encerrar_perfil(retraining_status)
 
 @app.route("/retreinar", methods=["POST"])
 def retreinar():
@@ -298,8 +420,11 @@ def retreinar():
     if retraining_status == "running":
         return jsonify({"status": "running", "message": "Retreinamento já está em andamento"})
     
+    # ?completo=1 refaz o Random Forest do zero em vez de crescer a floresta
+    completo = request.args.get('completo') == '1'
+    
     # Inicia o retreinamento em background com gerenciamento de processos
-    thread = threading.Thread(target=executar_retreinamento_background)
+    thread = threading.Thread(target=executar_retreinamento_background, args=(completo,))
     thread.daemon = True
     thread.start()
     
@@ -331,6 +456,7 @@ def executar_retreinamento_todos_background():
     global retraining_status, retraining_logs
     retraining_status = "running"
     retraining_logs.clear()
+    perfil = iniciar_perfil('retreinamento_todos')
     
     try:
         def log_retraining(mensagem):
@@ -348,57 +474,32 @@ def executar_retreinamento_todos_background():
         # Criar dataset
         log_retraining("📊 Criando dataset de treinamento...")
         X, y, _ = classifier.criar_dataset(limite=20)
-        log_retraining(f"✅ Dataset criado: {X.shape[0]} amostras, {X.shape[1]} features")
-        
-        # Retreinar Random Forest (modelo principal)
-        log_retraining("🧠 Retreinando Random Forest...")
-        classifier.criar_modelo(tipo_modelo='random_forest')
-        classifier.treinar_modelo(X, y)
-        classifier.salvar_modelo('modelo_eeg.pkl')
-        log_retraining("✅ Random Forest retreinado!")
-        
-        # Retreinar MLP Tabular
-        log_retraining("🧠 Retreinando MLP Tabular...")
-        global classifier_cnn
-        classifier_cnn = EEGClassifier()
-        classifier_cnn.criar_modelo('mlp_tabular')
-        classifier_cnn.treinar_modelo(X, y)
-        classifier_cnn.salvar_modelo('modelo_mlp_tabular.pkl')
-        log_retraining("✅ MLP Tabular retreinado e salvo!")
-        
-        # Retreinar CNN Original
-        log_retraining("🧠 Retreinando CNN Original...")
-        global classifier_cnn_original
-        classifier_cnn_original = EEGClassifier()
-        classifier_cnn_original.criar_modelo('cnn')
-        
-        # Garantir que o CNN seja treinado corretamente
-        try:
-            classifier_cnn_original.treinar_modelo(X, y)
-            if classifier_cnn_original.is_trained:
-                classifier_cnn_original.salvar_modelo('modelo_cnn.pkl')
-                log_retraining("✅ CNN Original retreinado e salvo!")
-            else:
-                log_retraining("❌ CNN Original não foi treinado corretamente")
-        except Exception as e:
-            log_retraining(f"❌ Erro ao treinar CNN Original: {e}")
-        
-        # Retreinar LSTM
-        log_retraining("🧠 Retreinando LSTM...")
-        global classifier_lstm
-        classifier_lstm = EEGClassifier()
-        classifier_lstm.criar_modelo('lstm')
-        
-        # Garantir que o LSTM seja treinado corretamente
-        try:
-            classifier_lstm.treinar_modelo(X, y)
-            if classifier_lstm.is_trained:
-                classifier_lstm.salvar_modelo('modelo_lstm.pkl')
-                log_retraining("✅ LSTM retreinado e salvo!")
-            else:
-                log_retraining("❌ LSTM não foi treinado corretamente")
-        except Exception as e:
-            log_retraining(f"❌ Erro ao treinar LSTM: {e}")
+        origem = "cache reutilizado" if classifier.dataset_do_cache else "features extraídas"
+        log_retraining(f"✅ Dataset criado: {X.shape[0]} amostras, {X.shape[1]} features ({origem})")
+        
+        # Todos os modelos treinam ao mesmo tempo, em processos; cada um é carregado assim que termina
+        tipos_modelos = {'principal': 'random_forest', 'mlp_tabular': 'mlp_tabular',
+                         'cnn_original': 'cnn', 'lstm': 'lstm'}
+        especificacoes = [(nome, tipo, ARQUIVOS_MODELOS[nome]) for nome, tipo in tipos_modelos.items()]
+        
+        def carregar_modelo_treinado(nome, resultado):
+            global classifier_cnn, classifier_cnn_original, classifier_lstm
+            if not resultado['sucesso']:
+                return
+            modelo = classifier if nome == 'principal' else EEGClassifier()
+            if not modelo.carregar_modelo(resultado['caminho']):
+                return
+            if nome == 'mlp_tabular':
+                classifier_cnn = modelo
+            elif nome == 'cnn_original':
+                classifier_cnn_original = modelo
+            elif nome == 'lstm':
+                classifier_lstm = modelo
+            log_retraining(f"🔄 {nome} carregado (versão {modelo.versao})")
+        
+        treinar_modelos_paralelo(especificacoes, X, y, classifier.feature_names,
+                                 log=log_retraining, ao_concluir=carregar_modelo_treinado, perfil=perfil,
+                                 ids_sinais=classifier.ids_dataset)
         
         # Após treinar, fazer predições com todos os modelos para os sinais atuais
         log_retraining("🔮 Fazendo predições com todos os modelos...")
@@ -409,6 +510,7 @@ def executar_retreinamento_todos_background():
         cursor.execute("""
             SELECT s.id, s.nome
             FROM sinais s
+            WHERE COALESCE(s.flags_qualidade, 0) = 0
             ORDER BY s.id DESC
         """)
         todos_sinais = cursor.fetchall()
@@ -417,34 +519,29 @@ def executar_retreinamento_todos_background():
         
         log_retraining(f"📊 Processando {len(todos_sinais)} sinais para predições...")
         
-        # Fazer predições com todos os modelos e salvar no banco
-        total_sinais = len(todos_sinais)
-        for i, (sinal_id, nome) in enumerate(todos_sinais, 1):
-            try:
-                # Mostrar progresso a cada 10 sinais
-                if i % 10 == 0 or i == total_sinais:
-                    log_retraining(f"📈 Progresso: {i}/{total_sinais} sinais processados ({i/total_sinais*100:.1f}%)")
-                
-                # Predição com MLP Tabular
-                if classifier_cnn and classifier_cnn.is_trained:
-                    predicao_mlp = classifier_cnn.prever_sinal(sinal_id)
-                    # Salvar predição no banco
-                    salvar_predicao_banco(sinal_id, 'mlp_tabular', predicao_mlp)
-                
-                # Predição com CNN Original
-                if classifier_cnn_original and classifier_cnn_original.is_trained:
-                    predicao_cnn = classifier_cnn_original.prever_sinal(sinal_id)
-                    # Salvar predição no banco
-                    salvar_predicao_banco(sinal_id, 'cnn_original', predicao_cnn)
-                
-                # Predição com LSTM
-                if classifier_lstm and classifier_lstm.is_trained:
-                    predicao_lstm = classifier_lstm.prever_sinal(sinal_id)
-                    # Salvar predição no banco
-                    salvar_predicao_banco(sinal_id, 'lstm', predicao_lstm)
-                    
-            except Exception as e:
-                log_retraining(f"❌ Erro ao fazer predição para sinal {nome}: {e}")
+        # Features extraídas uma vez e compartilhadas por todos os modelos
+        ids_sinais = [sinal_id for sinal_id, _ in todos_sinais]
+        # 'principal' também é salvo: as predições rotuladas servem para ajustar a cascata
+        predicoes_modelos = prever_lote_modelos(modelos_carregados(), ids_sinais)
+        
+        registros = []
+        for tipo_modelo, predicoes_lote in predicoes_modelos.items():
+            preditos = [(sinal_id, predicao) for sinal_id, predicao in predicoes_lote.items() if predicao]
+            log_retraining(f"📈 {tipo_modelo}: {len(preditos)}/{len(ids_sinais)} sinais preditos")
+            registros.extend((sinal_id, tipo_modelo, predicao) for sinal_id, predicao in preditos)
+        
+        # Todas as predições gravadas em um único upsert
+        salvar_predicoes_banco_lote(registros)
+        log_retraining(f"💾 {len(registros)} predições salvas no banco")
+        
+        # Cache: descarta versões antigas e guarda as predições das versões novas
+        modelos_salvos = modelos_carregados()
+        for tipo_modelo, modelo in modelos_salvos.items():
+            if modelo and modelo.is_trained:
+                cache_predicoes.invalidar_modelo(tipo_modelo, manter_versao=modelo.versao)
+        for sinal_id, tipo_modelo, predicao in registros:
+            cache_predicoes.guardar(sinal_id, tipo_modelo, modelos_salvos[tipo_modelo].versao, predicao)
+        cache_predicoes.salvar()
         
         log_retraining("🎉 Todos os modelos foram retreinados e testados com sucesso!")
         retraining_status = "completed"
@@ -452,16 +549,28 @@ def executar_retreinamento_todos_background():
     except Exception as e:
         log_retraining(f"❌ Erro durante retreinamento: {e}")
         retraining_status = "error"
+    finally:
+        encerrar_perfil(retraining_status)
 
 @app.route("/status_retreinamento")
 def status_retreinamento():
     """Rota para verificar o status do retreinamento"""
     global retraining_status, retraining_logs
+    estado_floresta = classifier.estado_incremental
     return jsonify({
         "status": retraining_status,
-        "logs": retraining_logs
+        "logs": retraining_logs,
+        # Acurácia no holdout de cada crescimento/ajuste completo do Random Forest
+        "historico_floresta": estado_floresta['historico'][-20:] if estado_floresta else [],
+        # Tempo, amostras/s, CPU e RSS por fase e por época (execução atual ou a última)
+        "perfil": perfil_retreinamento.resumo() if perfil_retreinamento else next(iter(listar_perfis(limite=1)), None)
     })
 
+@app.route("/perfis_treino")
+def perfis_treino():
+    """Rota para obter os perfis dos retreinamentos anteriores (mais recentes primeiro)"""
+    return jsonify(listar_perfis(limite=request.args.get('limite', 10, type=int)))
+
 @app.route("/status_processos")
 def status_processos():
     """Rota para verificar o status de todos os processos ativos"""
@@ -523,19 +632,18 @@ def dashboard():
             LIMIT 10
         """)
         sinais_amostra = cursor.fetchall()
+        
+        # Predição do modelo principal para todos os sinais de uma vez
+        predicoes_lote = {}
+        if classifier and classifier.is_trained:
+            predicoes_lote = prever_lote_cache('principal', classifier, [sinal_id for sinal_id, _, _ in sinais_amostra])
+        
         for sinal_id, nome, categoria in sinais_amostra:
             try:
                 resultado = aplicar_dinamica_simbolica(sinal_id, m=3)
                 if resultado and 'entropia' in resultado:
                     entropias.append(resultado['entropia'])
-                    
-                    # Fazer apenas predição do modelo principal para velocidade
-                    predicao = None
-                    if classifier and classifier.is_trained:
-                        try:
-                            predicao = classifier.prever_sinal(sinal_id)
-                        except Exception:
-                            pass
+                    predicao = predicoes_lote.get(sinal_id)
                     
                     sinais_recentes.append({
                         'id': sinal_id,
@@ -559,8 +667,9 @@ def dashboard():
         }
         cursor.close()
         conexao.close()
-        # Calcular taxa de acerto (placeholder - pode ser implementado depois)
-        taxa_acerto = 0.85  # Valor padrão
+        # Taxa de acerto do modelo principal medida na validação cruzada (None sem validação)
+        validacao = validacao_cruzada.carregar_resultados().get('random_forest')
+        taxa_acerto = validacao['acuracia']['media'] if validacao else None
         
         # Converter sinais para JSON para JavaScript
         import json
@@ -591,6 +700,7 @@ def dashboard():
                              sinais_sim=sinais_sim,
                              sinais_nao=sinais_nao,
                              taxa_acerto=taxa_acerto,
+                             validacao=validacao,
                              sinais=sinais_recentes,
                              sinais_json=sinais_json,
                              entropias=entropias)
@@ -633,21 +743,64 @@ def salvar_predicao_banco(sinal_id, tipo_modelo, predicao):
     except Exception as e:
         print(f"❌ Erro ao salvar predição {tipo_modelo} para sinal {sinal_id}: {e}")
 
+def inserir_predicoes(cursor, registros):
+    """
+    Upsert de várias predições em predicoes_ia usando o cursor (e a transação) do chamador
+    
+    Args:
+        cursor: Cursor psycopg2 aberto
+        registros (list): Tuplas (sinal_id, tipo_modelo, predicao)
+    """
+    execute_values(cursor, """
+        INSERT INTO predicoes_ia (id_sinal, tipo_modelo, classe_predita, probabilidade, data_predicao)
+        VALUES %s
+        ON CONFLICT (id_sinal, tipo_modelo) DO UPDATE
+        SET classe_predita = EXCLUDED.classe_predita,
+            probabilidade = EXCLUDED.probabilidade,
+            data_predicao = EXCLUDED.data_predicao
+    """, [(sinal_id, tipo_modelo, predicao['classe_predita'], predicao['probabilidade'])
+          for sinal_id, tipo_modelo, predicao in registros],
+        template="(%s, %s, %s, %s, NOW())")
+
+def salvar_predicoes_banco_lote(registros):
+    """
+    Salva várias predições no banco com um único upsert
+    
+    Args:
+        registros (list): Tuplas (sinal_id, tipo_modelo, predicao)
+    """
+    if not registros:
+        return
+    
+    try:
+        conexao = obter_conexao_db()
+        cursor = conexao.cursor()
+        
+        inserir_predicoes(cursor, registros)
+        
+        conexao.commit()
+        cursor.close()
+        conexao.close()
+        print(f"✅ {len(registros)} predições salvas no banco")
+        
+    except Exception as e:
+        print(f"❌ Erro ao salvar predições em lote: {e}")
+
 def buscar_predicoes_banco(sinal_id):
-    """Busca todas as predições salvas no banco para um sinal"""
-    global cache_predicoes
+    """Busca as predições salvas dos modelos adicionais de um sinal, consultando antes o cache"""
+    modelos_salvos = ('mlp_tabular', 'cnn_original', 'lstm')
+    versoes = {tipo_modelo: versao_arquivo_modelo(ARQUIVOS_MODELOS[tipo_modelo]) for tipo_modelo in modelos_salvos}
     
-    # Primeiro, tentar usar o cache
-    if cache_predicoes and sinal_id in cache_predicoes:
-        predicoes_cache = cache_predicoes[sinal_id]
-        # Converter para o formato esperado
-        predicoes = {}
-        for modelo, predicao in predicoes_cache.items():
-            if predicao and isinstance(predicao, dict):
-                predicoes[modelo] = {
-                    'classe_predita': predicao.get('classe_predita', ''),
-                    'probabilidade': predicao.get('probabilidade', 0.0)
-                }
+    # Primeiro, tentar usar o cache (válido apenas para a versão atual de cada modelo)
+    predicoes = {}
+    for tipo_modelo, versao in versoes.items():
+        predicao = cache_predicoes.obter(sinal_id, tipo_modelo, versao)
+        if predicao:
+            predicoes[tipo_modelo] = {
+                'classe_predita': predicao.get('classe_predita', ''),
+                'probabilidade': predicao.get('probabilidade', 0.0)
+            }
+    if len(predicoes) == len(modelos_salvos):
         return predicoes
     
     # Se não estiver no cache, buscar no banco
@@ -667,6 +820,8 @@ def buscar_predicoes_banco(sinal_id):
                 'classe_predita': classe_predita,
                 'probabilidade': probabilidade
             }
+            if tipo_modelo in versoes:
+                cache_predicoes.guardar(sinal_id, tipo_modelo, versoes[tipo_modelo], predicoes[tipo_modelo])
         
         cursor.close()
         conexao.close()
@@ -809,6 +964,26 @@ def processar_arquivo_eeg(arquivo):
         
         print(f"📊 Valores lidos: {len(valores)} amostras")
         
+        # Triagem de qualidade antes de qualquer processamento caro
+        qualidade = avaliar_qualidade(valores)
+        if not qualidade['valido']:
+            print(f"⚠️ Sinal reprovado na triagem: {', '.join(qualidade['motivos'])}")
+        
+        # Pontuação na ingestão, antes de abrir a transação: todos os modelos carregados,
+        # features do array em memória (extraídas uma vez), indexadas pelo nome do arquivo
+        # até o sinal ter ID
+        modelos = modelos_carregados()
+        predicoes_arquivo = {}
+        if qualidade['valido']:
+            try:
+                valores_sinal = {nome_arquivo: np.asarray(valores, dtype=config.PIPELINE_DTYPE)}
+                predicoes_modelos = prever_lote_modelos(modelos, [nome_arquivo], valores_sinal)
+                predicoes_arquivo = {tipo_modelo: predicoes[nome_arquivo]
+                                     for tipo_modelo, predicoes in predicoes_modelos.items() if predicoes.get(nome_arquivo)}
+            except Exception as e:
+                # Falha na pontuação não impede o armazenamento do sinal
+                print(f"⚠️ Erro na pontuação do sinal na ingestão: {e}")
+        
         # Inserir no banco de dados
         try:
             conexao = obter_conexao_db()
@@ -825,11 +1000,11 @@ def processar_arquivo_eeg(arquivo):
         """, ('N',))
         id_usuario = cursor.fetchone()[0]
         
-        # Criar sinal
+        # Criar sinal (com as flags da triagem de qualidade)
         cursor.execute("""
-            INSERT INTO sinais (nome, idusuario) 
-            VALUES (%s, %s) RETURNING id
-        """, (nome_arquivo, id_usuario))
+            INSERT INTO sinais (nome, idusuario, flags_qualidade) 
+            VALUES (%s, %s, %s) RETURNING id
+        """, (nome_arquivo, id_usuario, qualidade['flags']))
         id_sinal = cursor.fetchone()[0]
         
         # Inserir valores em lote (otimizado)
@@ -839,10 +1014,39 @@ def processar_arquivo_eeg(arquivo):
             VALUES (%s, %s)
         """, valores_para_inserir)
         
+        # Predições na mesma transação do sinal; o savepoint isola um erro no upsert, que
+        # de outro modo abortaria a transação e levaria o sinal junto no commit
+        registros = [(id_sinal, tipo_modelo, predicao_modelo) for tipo_modelo, predicao_modelo in predicoes_arquivo.items()]
+        if registros:
+            cursor.execute("SAVEPOINT pontuacao")
+            try:
+                inserir_predicoes(cursor, registros)
+                cursor.execute("RELEASE SAVEPOINT pontuacao")
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT pontuacao")
+                print(f"⚠️ Erro ao gravar as predições do sinal na ingestão: {e}")
+                registros = []
+        
         conexao.commit()
         cursor.close()
         conexao.close()
         
+        # Dados novos para este ID: predições em cache (ex.: banco recriado) não valem mais
+        cache_predicoes.invalidar_sinal(id_sinal)
+        for _, tipo_modelo, predicao_modelo in registros:
+            cache_predicoes.guardar(id_sinal, tipo_modelo, modelos[tipo_modelo].versao, predicao_modelo)
+        predicoes = {tipo_modelo: {'classe_predita': str(predicao_modelo['classe_predita']),
+                                   'probabilidade': float(predicao_modelo['probabilidade'])}
+                     for _, tipo_modelo, predicao_modelo in registros}
+        
+        # Sinais reprovados ficam marcados no banco, mas não seguem para a análise
+        if not qualidade['valido']:
+            return {
+                'erro': f"Sinal reprovado na triagem de qualidade: {', '.join(qualidade['motivos'])}",
+                'id_sinal': int(id_sinal),
+                'qualidade': qualidade
+            }
+        
         # Aplicar dinâmica simbólica
         try:
             print(f"🔧 Aplicando dinâmica simbólica para sinal {id_sinal}")
@@ -858,19 +1062,8 @@ def processar_arquivo_eeg(arquivo):
             print(f"❌ Erro na dinâmica simbólica: {str(e)}")
             return {'erro': f'Erro na dinâmica simbólica: {str(e)}'}
         
-        # Fazer predição se o modelo estiver treinado
-        predicao = None
-        if classifier.is_trained:
-            try:
-                predicao_raw = classifier.prever_sinal(id_sinal)
-                # Converter tipos NumPy para Python nativos
-                if predicao_raw:
-                    predicao = {
-                        'classe_predita': str(predicao_raw.get('classe_predita', '')),
-                        'probabilidade': float(predicao_raw.get('probabilidade', 0.0))
-                    }
-            except Exception as e:
-                print(f"Erro na predição: {e}")
+        # Predição do modelo principal, já calculada na ingestão
+        predicao = predicoes.get('principal')
         
         # Calcular confiança baseada na entropia
         entropia = float(resultado_ds.get('entropia', 0))
@@ -909,6 +1102,7 @@ def processar_arquivo_eeg(arquivo):
         resultados = {
             'id_sinal': int(id_sinal),
             'nome_arquivo': arquivo.filename,
+            'nome_sinal': nome_arquivo,
             'total_amostras': int(len(valores)),
             'entropia': entropia,
             'limiar': float(resultado_ds.get('limiar', 0)),
@@ -920,6 +1114,7 @@ def processar_arquivo_eeg(arquivo):
             'sequencia_binaria': [int(x) for x in resultado_ds.get('sequencia_binaria', [])[:20]],
             'grupos_binarios': [int(x) for x in resultado_ds.get('grupos_binarios', [])[:10]],
             'predicao': predicao,
+            'predicoes': predicoes,
             'sucesso': True
         }
         
@@ -1020,6 +1215,7 @@ def aplicar_dinamica_simbolica_direta(valores, id_sinal, m=3):
         
         return {
             'entropia': entropia,
+            'complexidade': complexidade_lempel_ziv(sequencia_binaria),
             'limiar': limiar,
             'sequencia_binaria': sequencia_binaria,
             'grupos_binarios': grupos_binarios,
@@ -1066,7 +1262,7 @@ def extrair_features_manualmente(valores):
         }
         
         # Aplicar dinâmica simbólica para completar features
-        resultado_ds = aplicar_dinamica_simbolica_direta(valores, "temp", m=3)
+        resultado_ds = aplicar_dinamica_simbolica_direta(valores, "temp", m=config.SYMBOLIC_M)
         if resultado_ds:
             features.update({
                 'entropia_shannon': resultado_ds['entropia'],
@@ -1079,6 +1275,8 @@ def extrair_features_manualmente(valores):
                 'std_frequencias': float(np.std(list(resultado_ds['frequencias'].values()))),
                 'entropia_frequencias': calcular_entropia_shannon(list(resultado_ds['frequencias'].values()))
             })
+            features.update(calcular_features_complexidade(valores, resultado_ds['sequencia_binaria']))
+            features.update(calcular_features_multiescala(valores, m=config.SYMBOLIC_M))
         
         return features
         
@@ -1168,42 +1366,15 @@ def upload_eeg():
     arquivo = request.files['arquivo']
     print(f"📁 Processando arquivo: {arquivo.filename}")
     
+    if requisicao_assincrona():
+        # O stream do upload fecha com a requisição: o conteúdo vai em memória para a tarefa
+        copia = FileStorage(io.BytesIO(arquivo.read()), filename=arquivo.filename)
+        return enfileirar_tarefa('upload_eeg', processar_arquivo_eeg, copia)
+    
     try:
         resultado = processar_arquivo_eeg(arquivo)
         print(f"✅ Processamento concluído: {resultado.get('sucesso', False)}")
         
-        # Se o processamento foi bem-sucedido, retornar também a predição
-        if resultado.get('sucesso'):
-            # Buscar o ID do sinal recém-criado
-            conexao = obter_conexao_db()
-            cursor = conexao.cursor()
-            
-            cursor.execute("""
-                SELECT s.id, s.nome 
-                FROM sinais s 
-                ORDER BY s.id DESC 
-                LIMIT 1
-            """)
-            
-            sinal_info = cursor.fetchone()
-            cursor.close()
-            conexao.close()
-            
-            if sinal_info:
-                id_sinal = sinal_info[0]
-                nome_sinal = sinal_info[1]
-                
-                # Fazer predição
-                try:
-                    predicao = classifier.prever_sinal(id_sinal)
-                    resultado['predicao'] = predicao
-                    resultado['id_sinal'] = id_sinal
-                    resultado['nome_sinal'] = nome_sinal
-                except Exception as e:
-                    print(f"❌ Erro na predição: {e}")
-                    resultado['predicao'] = None
-                    resultado['erro_predicao'] = str(e)
-        
         return jsonify(resultado)
     except Exception as e:
         print(f"❌ Erro no processamento: {str(e)}")
@@ -1240,12 +1411,37 @@ def marcar_categoria_real():
         
         return jsonify({
             'sucesso': True,
-            'mensagem': f'Categoria real marcada como {"Sim" if categoria_real == "S" else "Não"}'
+            'mensagem': f'Categoria real marcada como {"Sim" if categoria_real == "S" else "Não"}',
+            'aprendizado_online': aprender_rotulo_online(id_sinal, categoria_real)
         })
         
     except Exception as e:
         return jsonify({'erro': f'Erro ao marcar categoria: {str(e)}'})
 
+def aprender_rotulo_online(id_sinal, categoria_real):
+    """
+    Atualiza o modelo online com o rótulo recém-marcado e, quando pedido (periódico
+    ou drift), dispara o retreino completo em segundo plano com todos os sinais rotulados
+    """
+    if not config.ONLINE_LEARNING:
+        return None
+    try:
+        valores = classifier.obter_valores_sinal(id_sinal)
+        resultado = aprendizado_online.registrar_rotulo(valores, categoria_real)
+        if resultado.get('retreino'):
+            # LIMIT NULL no criar_dataset: todos os sinais rotulados
+            aprendizado_online.iniciar_retreino(lambda: EEGClassifier().criar_dataset(limite=None),
+                                                resultado['retreino'])
+        return resultado
+    except Exception as e:
+        print(f"⚠️ Erro no aprendizado online do sinal {id_sinal}: {e}")
+        return {'atualizado': False, 'motivo': str(e)}
+
+@app.route("/estatisticas_online")
+def estatisticas_online():
+    """Rota para obter o estado do aprendizado online (acurácia recente, retreinos)"""
+    return jsonify(aprendizado_online.estatisticas())
+
 @app.route("/verificar_dados")
 def verificar_dados():
     """Rota para verificar dados no banco"""
@@ -1340,6 +1536,7 @@ def calcular_precisao_ia():
             FROM sinais s
             JOIN usuarios u ON s.idusuario = u.id
             WHERE u.possui IN ('S', 'N')
+              AND COALESCE(s.flags_qualidade, 0) = 0
             ORDER BY s.id DESC
             LIMIT 100
         """)
@@ -1354,10 +1551,12 @@ def calcular_precisao_ia():
         acertos = 0
         total = 0
         
+        # Predição da IA para todos os sinais testados de uma vez
+        predicoes_lote = prever_lote_cache('principal', classifier, [sinal_id for sinal_id, _ in sinais_testados])
+        
         for sinal_id, categoria_real in sinais_testados:
             try:
-                # Fazer predição da IA
-                predicao = classifier.prever_sinal(sinal_id)
+                predicao = predicoes_lote.get(sinal_id)
                 if predicao and 'classe_predita' in predicao:
                     classe_predita = predicao['classe_predita']
                     
@@ -1382,9 +1581,8 @@ def calcular_precisao_ia():
         print(f"Erro ao calcular precisão: {e}")
         return {'total': 0, 'acertos': 0, 'precisao': 0.0}
 
-@app.route("/predicao_sinal/<int:sinal_id>")
-def predicao_sinal(sinal_id):
-    """Rota para obter predição de um sinal específico"""
+def executar_predicao_sinal(sinal_id):
+    """Predição de um sinal no formato de resposta de /predicao_sinal"""
     try:
         # Verificar se o classificador está treinado
         if not classifier:
@@ -1392,37 +1590,336 @@ def predicao_sinal(sinal_id):
             inicializar_classificador()
             
         if not classifier or not hasattr(classifier, 'is_trained') or not classifier.is_trained:
-            return jsonify({
+            return {
                 'sucesso': False,
                 'erro': 'Modelo não está treinado. Clique em "Retreinar" para treinar o modelo.'
-            })
+            }
         
-        # Fazer predição (sem timeout no Windows)
+        # Fazer predição pelo loteador (consulta o cache e agrupa requisições simultâneas)
         try:
-            predicao = classifier.prever_sinal(sinal_id)
+            predicao = loteador_predicoes.prever(sinal_id)
             
             if predicao and isinstance(predicao, dict):
-                return jsonify({
+                return {
                     'sucesso': True,
                     'predicao': predicao
-                })
+                }
             else:
-                return jsonify({
+                return {
                     'sucesso': False,
                     'erro': 'Não foi possível fazer predição'
-                })
+                }
         except Exception as pred_error:
-            return jsonify({
+            return {
                 'sucesso': False,
                 'erro': f'Erro na predição: {str(pred_error)}'
-            })
+            }
             
+    except Exception as e:
+        return {
+            'sucesso': False,
+            'erro': str(e)
+        }
+
+@app.route("/predicao_sinal/<int:sinal_id>")
+def predicao_sinal(sinal_id):
+    """Rota para obter predição de um sinal específico (?assincrono=1 devolve o ID de uma tarefa)"""
+    if requisicao_assincrona():
+        return enfileirar_tarefa('predicao_sinal', executar_predicao_sinal, sinal_id)
+    return jsonify(executar_predicao_sinal(sinal_id))
+
+@app.route("/stream/<id_sessao>", methods=["POST"])
+def stream_amostras(id_sessao):
+    """
+    Rota de classificação contínua: recebe blocos de amostras (POST chunked em texto,
+    ou JSON {"amostras": [...]}) e responde um evento de predição por salto, via
+    Server-Sent Events (ou JSON, quando o corpo é JSON)
+    """
+    try:
+        sessao = sessoes_continuas.obter(id_sessao)
+    except RuntimeError as e:
+        return jsonify({'sucesso': False, 'erro': str(e)}), 429
+    
+    if request.is_json:
+        amostras = (request.get_json(silent=True) or {}).get('amostras', [])
+        return jsonify({'sucesso': True, 'eventos': sessao.adicionar(amostras, classifier)})
+    
+    def gerar_eventos():
+        # O corpo é lido aos poucos: cada bloco recebido já gera seus eventos
+        blocos = iter(lambda: request.stream.read(4096), b'')
+        for amostras in ler_amostras_texto(blocos):
+            for evento in sessao.adicionar(amostras, classifier):
+                yield formatar_evento_sse(evento)
+        yield formatar_evento_sse(sessao.estatisticas(), tipo='fim_bloco')
+    
+    return Response(stream_with_context(gerar_eventos()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route("/stream/<id_sessao>", methods=["GET"])
+def status_stream(id_sessao):
+    """Rota para obter as estatísticas incrementais de uma sessão contínua"""
+    sessao = sessoes_continuas.obter(id_sessao, criar=False)
+    if sessao is None:
+        return jsonify({'sucesso': False, 'erro': 'Sessão não encontrada'}), 404
+    return jsonify({'sucesso': True, 'eventos': sessao.eventos, 'estatisticas': sessao.estatisticas()})
+
+@app.route("/stream/<id_sessao>", methods=["DELETE"])
+def encerrar_stream(id_sessao):
+    """Rota para encerrar uma sessão contínua"""
+    return jsonify({'sucesso': sessoes_continuas.encerrar(id_sessao)})
+
+@app.route("/jobs/<id_tarefa>")
+def consultar_tarefa(id_tarefa):
+    """Rota para consultar o status e o resultado de uma tarefa assíncrona"""
+    tarefa = fila_tarefas.obter(id_tarefa)
+    if tarefa is None:
+        return jsonify({'sucesso': False, 'erro': 'Tarefa não encontrada ou resultado expirado'}), 404
+    return jsonify(tarefa)
+
+def executar_busca_hiperparametros(tipos_modelos, n_configuracoes, eta):
+    """Corpo da tarefa de busca de hiperparâmetros (na fila de tarefas)"""
+    global busca_em_andamento
+    
+    def log_busca(mensagem):
+        log_entry = f"[{datetime.now().strftime('%H:%M:%S')}] {mensagem}"
+        busca_logs.append(log_entry)
+        print(log_entry)
+    
+    try:
+        resultado = buscar_com_dataset(tipos_modelos, log=log_busca, n_configuracoes=n_configuracoes, eta=eta)
+        return {'melhores': resultado['melhores'], 'busca': resultado['busca']}
+    finally:
+        with lock_busca:
+            busca_em_andamento = False
+
+@app.route("/buscar_hiperparametros", methods=["POST"])
+def buscar_hiperparametros():
+    """Rota para iniciar a busca de hiperparâmetros (successive halving) em segundo plano"""
+    global busca_em_andamento
+    
+    dados = request.get_json(silent=True) or {}
+    tipos_modelos = dados.get('tipos_modelos') or list(ESPACOS)
+    invalidos = [tipo for tipo in tipos_modelos if tipo not in ESPACOS]
+    if invalidos:
+        return jsonify({'sucesso': False, 'erro': f'Tipos de modelo sem espaço de busca: {invalidos}'}), 400
+    
+    with lock_busca:
+        if busca_em_andamento:
+            return jsonify({'sucesso': False, 'erro': 'Busca de hiperparâmetros já está em andamento'}), 409
+        busca_em_andamento = True
+    busca_logs.clear()
+    
+    resposta = enfileirar_tarefa('busca_hiperparametros', executar_busca_hiperparametros, tipos_modelos,
+                                 dados.get('n_configuracoes'), dados.get('eta'))
+    if resposta[1] != 202:
+        with lock_busca:
+            busca_em_andamento = False
+    return resposta
+
+@app.route("/hiperparametros")
+def hiperparametros():
+    """Rota para obter as melhores configurações, o leaderboard e o log da busca"""
+    try:
+        resultados = carregar_resultados()
+    except Exception as e:
+        return jsonify({'erro': str(e)})
+    limite = request.args.get('limite', 50, type=int)
+    return jsonify({
+        'em_andamento': busca_em_andamento,
+        'melhores': resultados.get('melhores', {}),
+        'leaderboard': resultados.get('leaderboard', [])[:limite],
+        'busca': resultados.get('busca'),
+        'logs': busca_logs
+    })
+
+@app.route("/validacao_cruzada", methods=["POST"])
+def executar_validacao_cruzada():
+    """Rota para iniciar a validação cruzada dos modelos em segundo plano"""
+    dados = request.get_json(silent=True) or {}
+    tipos_modelos = dados.get('tipos_modelos') or ['random_forest']
+    invalidos = [tipo for tipo in tipos_modelos if tipo not in ESPACOS]
+    if invalidos:
+        return jsonify({'sucesso': False, 'erro': f'Tipos de modelo desconhecidos: {invalidos}'}), 400
+    
+    def validar():
+        resultados = validacao_cruzada.validar_com_dataset(tipos_modelos, k=dados.get('k'),
+                                                           repeticoes=dados.get('repeticoes'))
+        # Resumo sem as métricas de cada dobra (essas ficam em GET /validacao_cruzada)
+        return {tipo: {nome: resultado[nome] for nome in ('k', 'repeticoes', 'amostras', 'acuracia', 'f1')}
+                for tipo, resultado in resultados.items()}
+    
+    return enfileirar_tarefa('validacao_cruzada', validar)
+
+@app.route("/validacao_cruzada")
+def resultados_validacao_cruzada():
+    """Rota para obter as métricas da última validação cruzada de cada tipo de modelo"""
+    return jsonify(validacao_cruzada.carregar_resultados())
+
+def carregar_estudante():
+    """Carrega o estudante destilado salvo; retorna True se ele existia"""
+    global classifier_estudante
+    if not os.path.exists(config.DISTILL_MODEL_PATH):
+        return False
+    estudante = EEGClassifier()
+    if not estudante.carregar_modelo(config.DISTILL_MODEL_PATH):
+        return False
+    classifier_estudante = estudante
+    return True
+
+@app.route("/destilar", methods=["POST"])
+def destilar():
+    """Rota para destilar o ensemble Keras em um estudante rápido, em segundo plano"""
+    dados = request.get_json(silent=True) or {}
+    
+    def executar():
+        relatorio = destilacao.destilar_do_banco(hiperparametros=dados.get('hiperparametros'))
+        if relatorio is None:
+            raise RuntimeError("Destilação sem professores ou sem sinais")
+        carregar_estudante()
+        return relatorio
+    
+    return enfileirar_tarefa('destilacao', executar)
+
+@app.route("/destilacao")
+def relatorio_destilacao():
+    """Rota para obter o relatório de concordância e latência da última destilação"""
+    return jsonify(destilacao.carregar_relatorio())
+
+@app.route("/jobs")
+def estatisticas_tarefas():
+    """Rota para obter a profundidade e os contadores da fila de tarefas"""
+    return jsonify(fila_tarefas.estatisticas())
+
+@app.route("/predicao_epocas/<int:sinal_id>")
+def predicao_epocas(sinal_id):
+    """Rota para obter a linha do tempo de predições por época de um sinal"""
+    try:
+        if not classifier or not classifier.is_trained:
+            return jsonify({
+                'sucesso': False,
+                'erro': 'Modelo não está treinado. Clique em "Retreinar" para treinar o modelo.'
+            })
+
+        tamanho_epoca = request.args.get('tamanho', type=int)
+        sobreposicao = request.args.get('sobreposicao', type=float)
+
+        linha_tempo = classifier.prever_epocas_sinal(sinal_id, tamanho_epoca, sobreposicao)
+        if linha_tempo is None:
+            return jsonify({
+                'sucesso': False,
+                'erro': 'Não foi possível fazer a predição por épocas'
+            })
+
+        return jsonify({
+            'sucesso': True,
+            'id_sinal': sinal_id,
+            'epocas': linha_tempo
+        })
+
     except Exception as e:
         return jsonify({
             'sucesso': False,
             'erro': str(e)
         })
 
+@app.route("/estatisticas_cache")
+def estatisticas_cache():
+    """Rota para obter o tamanho e a taxa de acerto do cache de predições"""
+    return jsonify(cache_predicoes.estatisticas())
+
+@app.route("/estatisticas_inferencia")
+def estatisticas_inferencia():
+    """Rota para obter as estatísticas dos micro-lotes de /predicao_sinal"""
+    return jsonify(loteador_predicoes.estatisticas())
+
+def modelos_pesados_cascata():
+    """Modelos Keras da cascata, carregados do disco na primeira vez"""
+    if classifier_cnn is None and classifier_cnn_original is None and classifier_lstm is None:
+        inicializar_todos_modelos()
+    return {'mlp_tabular': classifier_cnn, 'cnn_original': classifier_cnn_original, 'lstm': classifier_lstm}
+
+@app.route("/predicao_cascata/<int:sinal_id>")
+def predicao_cascata(sinal_id):
+    """Rota para a predição em cascata de um sinal (Random Forest, e Keras se incerto)"""
+    try:
+        if not classifier or not classifier.is_trained:
+            inicializar_classificador()
+        
+        predicao = cascata.prever_lote(classifier, modelos_pesados_cascata(), [sinal_id]).get(sinal_id)
+        if predicao:
+            return jsonify({'sucesso': True, 'predicao': predicao})
+        return jsonify({'sucesso': False, 'erro': 'Não foi possível fazer predição'})
+    except Exception as e:
+        return jsonify({'sucesso': False, 'erro': str(e)})
+
+@app.route("/estatisticas_cascata")
+def estatisticas_cascata():
+    """Rota para obter escalonamentos e latência economizada pela cascata"""
+    return jsonify(cascata.estatisticas())
+
+def carregar_predicoes_validacao(modelos_pesados, ids_treino):
+    """
+    Busca as predições salvas dos sinais com categoria real marcada, fora do treino
+    
+    A predição de um modelo em um sinal do próprio ajuste é otimista e estreitaria a
+    faixa da cascata: sinais do treino do principal ficam de fora e, nos pesados, a
+    predição vira NaN. Modelos sem ids_treino (treinados antes do registro) não entram.
+    
+    Args:
+        modelos_pesados (list): Nomes dos modelos pesados, na ordem das colunas
+        ids_treino (dict): {nome do modelo: IDs dos sinais do ajuste, ou None}
+        
+    Returns:
+        tuple: (probabilidades do principal, matriz dos modelos pesados com NaN, rótulos 0/1)
+    """
+    conexao = obter_conexao_db()
+    cursor = conexao.cursor()
+    cursor.execute("""
+        SELECT p.id_sinal, p.tipo_modelo, p.probabilidade, u.possui
+        FROM predicoes_ia p
+        JOIN sinais s ON s.id = p.id_sinal
+        JOIN usuarios u ON s.idusuario = u.id
+        WHERE u.possui IN ('S', 'N')
+          AND p.tipo_modelo = ANY(%s)
+    """, (['principal', *modelos_pesados],))
+    linhas = cursor.fetchall()
+    cursor.close()
+    conexao.close()
+    
+    por_sinal = {}
+    for sinal_id, tipo_modelo, probabilidade, possui in linhas:
+        registro = por_sinal.setdefault(sinal_id, {'rotulo': 1 if possui == 'S' else 0})
+        vistos = ids_treino.get(tipo_modelo)
+        if vistos is not None and sinal_id not in vistos:
+            registro[tipo_modelo] = probabilidade
+    
+    # Apenas sinais com predição do modelo principal
+    registros = [registro for registro in por_sinal.values() if 'principal' in registro]
+    prob_rapido = np.array([registro['principal'] for registro in registros], dtype=np.float64)
+    prob_pesados = np.array([[registro.get(nome, np.nan) for nome in modelos_pesados] for registro in registros],
+                            dtype=np.float64).reshape(len(registros), len(modelos_pesados))
+    rotulos = np.array([registro['rotulo'] for registro in registros])
+    return prob_rapido, prob_pesados, rotulos
+
+@app.route("/ajustar_cascata", methods=["POST"])
+def ajustar_cascata():
+    """Rota para ajustar os limiares da cascata com as predições de validação salvas"""
+    try:
+        metodo = (request.get_json(silent=True) or {}).get('metodo', cascata.combinacao)
+        ids_treino = {nome: getattr(modelo, 'ids_treino', None) for nome, modelo in modelos_carregados().items()}
+        prob_rapido, prob_pesados, rotulos = carregar_predicoes_validacao(['mlp_tabular', 'cnn_original', 'lstm'],
+                                                                          ids_treino)
+        if len(rotulos) == 0:
+            return jsonify({'sucesso': False, 'erro': 'Nenhuma predição rotulada fora do treino. '
+                                                      'Retreine todos os modelos e rotule sinais novos antes.'})
+        
+        ajuste = ajustar_limiares(prob_rapido, prob_pesados, rotulos, metodo=metodo)
+        cascata.aplicar_ajuste(ajuste)
+        cascata.salvar_limiares(ajuste)
+        return jsonify({'sucesso': True, 'ajuste': ajuste})
+    except Exception as e:
+        return jsonify({'sucesso': False, 'erro': str(e)})
+
 @app.route("/estatisticas_precisao")
 def estatisticas_precisao():
     """Rota para obter estatísticas atualizadas de precisão"""
@@ -1489,8 +1986,29 @@ if __name__ == "__main__":
     # Mostrar configurações ao iniciar
     config.print_config()
     
-    # Carregar cache de predições para performance
+    # Garantir a coluna de flags de qualidade em bancos antigos
+    try:
+        conexao = obter_conexao_db()
+        with conexao, conexao.cursor() as cursor:
+            garantir_coluna_qualidade(cursor)
+        conexao.close()
+    except Exception as e:
+        print(f"⚠️ Não foi possível verificar a coluna de qualidade: {e}")
+    
+    # Carregar cache de predições para performance (persistido de novo ao encerrar)
     carregar_cache_predicoes()
+    atexit.register(cache_predicoes.salvar)
+    
+    # Limiares ajustados da cascata (sem arquivo, vale config.CASCADE_BAND)
+    cascata.carregar_limiares()
+    
+    # Modelo online salvo (sem arquivo, ele nasce com o primeiro rótulo marcado)
+    if config.ONLINE_LEARNING and aprendizado_online.carregar():
+        print(f"✅ Modelo online carregado (versão {aprendizado_online.modelo.versao})")
+    
+    # Estudante destilado (sem arquivo, ele é criado em POST /destilar)
+    if carregar_estudante():
+        print(f"✅ Estudante destilado carregado (versão {classifier_estudante.versao})")
     
     # Inicializar apenas o classificador principal (Random Forest)
     inicializar_classificador()
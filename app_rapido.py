@@ -5,7 +5,6 @@ Script de inicialização rápida com otimizações
 
 import os
 import sys
-import pickle
 from pathlib import Path
 
 # Configurar variáveis de ambiente para performance
@@ -20,20 +19,13 @@ matplotlib.rcParams['figure.dpi'] = 100
 matplotlib.rcParams['savefig.bbox'] = 'tight'
 matplotlib.rcParams['figure.max_open_warning'] = 0
 
-# Carregar cache de predições se existir
-cache_predicoes = None
-if os.path.exists('cache_predicoes.pkl'):
-    try:
-        with open('cache_predicoes.pkl', 'rb') as f:
-            cache_predicoes = pickle.load(f)
-        print(f"✅ Cache carregado: {len(cache_predicoes)} predições")
-    except Exception as e:
-        print(f"⚠️ Erro ao carregar cache: {e}")
-
 # Inicializar app
-from app import app, inicializar_classificador
+from app import app, inicializar_classificador, carregar_cache_predicoes
 
 if __name__ == "__main__":
     print("🚀 Inicializando servidor otimizado...")
+    
+    # Carregar cache versionado de predições se existir
+    carregar_cache_predicoes()
     inicializar_classificador()
     app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Aprendizado online com os rótulos marcados em /marcar_categoria_real
+
+Cada rótulo novo atualiza o modelo implantado com partial_fit (SGDClassifier ou o
+MLP sklearn 'mlp_online') e um StandardScaler acumulado, em milissegundos, e o
+modelo é salvo de forma atômica com uma nova versão. Antes de aprender com o
+rótulo, o modelo prevê o sinal (avaliação prequencial): a acurácia nos últimos
+config.ONLINE_DRIFT_WINDOW rótulos alimenta a detecção de drift. Um retreino
+completo é pedido a cada config.ONLINE_RETRAIN_EVERY rótulos ou quando essa
+acurácia cai config.ONLINE_DRIFT_THRESHOLD abaixo da melhor desde o último retreino.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+import numpy as np
+from ml_classifier import EEGClassifier
+from extracao_features import NOMES_FEATURES
+from config import config
+
+class AprendizadoOnline:
+    """Modelo atualizado rótulo a rótulo, com retreino completo periódico ou por drift"""
+
+    def __init__(self, caminho=None, tipo_modelo=None, retreino_a_cada=None, janela_drift=None, limiar_drift=None):
+        """
+        Args:
+            caminho (str): Arquivo do modelo online
+            tipo_modelo (str): Tipo com partial_fit ('sgd' ou 'mlp_online')
+            retreino_a_cada (int): Rótulos entre retreinos completos
+            janela_drift (int): Rótulos recentes usados na acurácia prequencial
+            limiar_drift (float): Queda de acurácia que dispara o retreino
+        """
+        self.caminho = caminho or config.ONLINE_MODEL_PATH
+        self.tipo_modelo = tipo_modelo or config.ONLINE_MODEL_TYPE
+        self.retreino_a_cada = retreino_a_cada or config.ONLINE_RETRAIN_EVERY
+        self.limiar_drift = config.ONLINE_DRIFT_THRESHOLD if limiar_drift is None else limiar_drift
+        self.modelo = None
+        self.lock = threading.Lock()
+
+        self.acertos = deque(maxlen=janela_drift or config.ONLINE_DRIFT_WINDOW)
+        self.melhor_acuracia = None  # Melhor acurácia da janela desde o último retreino
+        self.rotulos_desde_retreino = 0
+        self.total_rotulos = 0
+        self.tempos_ms = deque(maxlen=100)
+        self.retreinos = 0
+        self.retreino_em_andamento = False
+        self.ultimo_retreino = None
+
+    def _novo_modelo(self):
+        modelo = EEGClassifier()
+        modelo.criar_modelo(self.tipo_modelo)
+        modelo.feature_names = list(NOMES_FEATURES)
+        return modelo
+
+    def carregar(self):
+        """Carrega o modelo online salvo; retorna True se ele existia"""
+        if not os.path.exists(self.caminho):
+            return False
+        modelo = EEGClassifier()
+        if not modelo.carregar_modelo(self.caminho) or not modelo.suporta_online:
+            print(f"⚠️ Modelo online em {self.caminho} não pôde ser usado")
+            return False
+        with self.lock:
+            self.modelo = modelo
+        return True
+
+    def acuracia_recente(self):
+        """Acurácia prequencial nos últimos rótulos (None sem rótulos avaliados)"""
+        return float(np.mean(self.acertos)) if self.acertos else None
+
+    def _motivo_retreino(self):
+        """'periodico', 'drift' ou None"""
+        if self.retreino_em_andamento:
+            return None
+        if self.rotulos_desde_retreino >= self.retreino_a_cada:
+            return 'periodico'
+        if len(self.acertos) == self.acertos.maxlen:
+            acuracia = self.acuracia_recente()
+            self.melhor_acuracia = max(self.melhor_acuracia or 0.0, acuracia)
+            if self.melhor_acuracia - acuracia >= self.limiar_drift:
+                return 'drift'
+        return None
+
+    def registrar_rotulo(self, valores, rotulo):
+        """
+        Aprende com um sinal rotulado
+
+        Args:
+            valores (np.array): Valores brutos do sinal
+            rotulo: 'S'/'N' (ou 1/0)
+
+        Returns:
+            dict: 'atualizado', 'tempo_ms', 'versao', 'acuracia_recente' e 'retreino'
+                  (motivo do retreino completo pedido, ou None)
+        """
+        y = 1 if rotulo in ('S', 1, True) else 0
+        with self.lock:
+            if self.modelo is None:
+                self.modelo = self._novo_modelo()
+            modelo = self.modelo
+
+            inicio = time.perf_counter()
+            ids, X = modelo.extrair_features_lote({0: np.asarray(valores, dtype=config.PIPELINE_DTYPE)})
+            if not ids:
+                return {'atualizado': False, 'motivo': 'Sinal reprovado na triagem de qualidade'}
+
+            # Prequencial: prevê antes de aprender com o rótulo
+            if modelo.is_trained:
+                probabilidade = float(modelo.prever_matriz(X)[0])
+                self.acertos.append(int(probabilidade >= 0.5) == y)
+
+            modelo.atualizar_online(X, np.array([y]))
+            if not modelo.salvar_modelo(self.caminho):
+                return {'atualizado': False, 'motivo': 'Erro ao salvar o modelo online'}
+            tempo_ms = (time.perf_counter() - inicio) * 1000.0
+
+            self.tempos_ms.append(tempo_ms)
+            self.total_rotulos += 1
+            self.rotulos_desde_retreino += 1
+            return {
+                'atualizado': True,
+                'tempo_ms': round(tempo_ms, 3),
+                'versao': modelo.versao,
+                'acuracia_recente': self.acuracia_recente(),
+                'retreino': self._motivo_retreino()
+            }
+
+    def retreino_completo(self, X, y, feature_names):
+        """
+        Treina um modelo novo do zero e o coloca no lugar do atual
+
+        O treino roda fora do lock, então a predição e os rótulos continuam sendo
+        atendidos pelo modelo antigo; rótulos que chegarem durante o treino já
+        estão no banco e entram no próximo retreino.
+
+        Returns:
+            bool: True se o modelo novo foi treinado e salvo
+        """
+        modelo = EEGClassifier()
+        modelo.criar_modelo(self.tipo_modelo)
+        modelo.feature_names = list(feature_names)
+        modelo.treinar_modelo(X, y)
+        if not modelo.is_trained:
+            return False
+
+        with self.lock:
+            if not modelo.salvar_modelo(self.caminho):
+                return False
+            self.modelo = modelo
+            self.acertos.clear()
+            self.melhor_acuracia = None
+            self.rotulos_desde_retreino = 0
+            self.retreinos += 1
+            self.ultimo_retreino = time.time()
+        return True
+
+    def iniciar_retreino(self, obter_dataset, motivo, log=print):
+        """
+        Dispara o retreino completo em uma thread (no máximo um por vez)
+
+        Args:
+            obter_dataset (callable): Retorna (X, y, feature_names)
+            motivo (str): Motivo registrado no log
+
+        Returns:
+            threading.Thread: Thread do retreino, ou None se já há um em andamento
+        """
+        with self.lock:
+            if self.retreino_em_andamento:
+                return None
+            self.retreino_em_andamento = True
+
+        def executar():
+            try:
+                log(f"🔁 Retreino completo do modelo online ({motivo})")
+                X, y, feature_names = obter_dataset()
+                if X is None or len(X) == 0:
+                    log("⚠️ Retreino online sem dados de treinamento")
+                elif self.retreino_completo(X, y, feature_names):
+                    log(f"✅ Modelo online retreinado (versão {self.modelo.versao})")
+                else:
+                    log("❌ Retreino do modelo online falhou")
+            except Exception as e:
+                log(f"❌ Erro no retreino do modelo online: {e}")
+            finally:
+                with self.lock:
+                    self.retreino_em_andamento = False
+
+        thread = threading.Thread(target=executar, name="retreino_online", daemon=True)
+        thread.start()
+        return thread
+
+    def estatisticas(self):
+        """Estado do aprendizado online"""
+        with self.lock:
+            return {
+                'tipo_modelo': self.tipo_modelo,
+                'treinado': bool(self.modelo and self.modelo.is_trained),
+                'versao': self.modelo.versao if self.modelo else None,
+                'total_rotulos': self.total_rotulos,
+                'rotulos_desde_retreino': self.rotulos_desde_retreino,
+                'retreino_a_cada': self.retreino_a_cada,
+                'acuracia_recente': self.acuracia_recente(),
+                'rotulos_avaliados': len(self.acertos),
+                'melhor_acuracia': self.melhor_acuracia,
+                'limiar_drift': self.limiar_drift,
+                'tempo_medio_ms': round(float(np.mean(self.tempos_ms)), 3) if self.tempos_ms else None,
+                'retreinos': self.retreinos,
+                'retreino_em_andamento': self.retreino_em_andamento,
+                'ultimo_retreino': self.ultimo_retreino
+            }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark das medidas de complexidade (complexidade.py)
+
+Mede o tempo de LZ76, entropia de permutação e entropia amostral em um sinal
+típico (4.000 amostras) e em um registro longo (1.000.000 amostras), e o da linha
+do tempo por época de um registro de 1 h (todas as features em lote contra LZ e
+entropia amostral calculados época a época).
+
+Uso: python benchmark_complexidade.py [amostras ...]
+"""
+
+import sys
+import time
+import numpy as np
+from scipy.signal import lfilter
+from complexidade import complexidade_lempel_ziv, entropia_permutacao, entropia_amostral
+from extracao_features import janelas_epocas, extrair_features_epocas
+
+TAMANHOS_PADRAO = [4000, 1000000]
+
+# Linha do tempo: 1 h a 256 Hz, épocas de 2 s com 50% de sobreposição
+DURACAO_LINHA_DO_TEMPO = 3600
+FREQUENCIA_AMOSTRAGEM = 256
+TAMANHO_EPOCA = 512
+EPOCAS_AMOSTRADAS = 100
+
+def gerar_sinal(n_amostras, semente=0):
+    """Sinal sintético com ritmo oscilatório (processo AR(2)), semelhante a um EEG"""
+    rng = np.random.default_rng(semente)
+    return lfilter([1.0], [1.0, -1.6, 0.8], rng.normal(0, 1, n_amostras))
+
+def cronometrar(funcao, *args):
+    """Executa a função e retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+def executar_benchmark(tamanhos=None):
+    """Executa o benchmark para cada tamanho de sinal"""
+    tamanhos = tamanhos or TAMANHOS_PADRAO
+
+    print("⏱️ BENCHMARK DAS MEDIDAS DE COMPLEXIDADE")
+    print("=" * 60)
+
+    resultados = []
+    for n_amostras in tamanhos:
+        sinal = gerar_sinal(n_amostras)
+        binario = sinal >= sinal.mean()
+
+        lz, tempo_lz = cronometrar(complexidade_lempel_ziv, binario)
+        pe, tempo_pe = cronometrar(entropia_permutacao, sinal)
+        se, tempo_se = cronometrar(entropia_amostral, sinal)
+
+        print(f"\n📊 {n_amostras:,} amostras")
+        print(f"   Lempel-Ziv:            {lz:.4f}  ({tempo_lz:.3f}s)")
+        print(f"   Entropia permutação:   {pe:.4f}  ({tempo_pe:.3f}s)")
+        print(f"   Entropia amostral:     {se:.4f}  ({tempo_se:.3f}s)")
+
+        resultados.append({
+            'amostras': n_amostras,
+            'complexidade_lz': (lz, tempo_lz),
+            'entropia_permutacao': (pe, tempo_pe),
+            'entropia_amostral': (se, tempo_se)
+        })
+
+    print("\n" + "=" * 60)
+    return resultados
+
+def executar_benchmark_epocas(duracao_s=None):
+    """
+    Compara a linha do tempo por época em lote com LZ e entropia amostral época a época
+
+    O tempo época a época é estimado a partir de EPOCAS_AMOSTRADAS épocas. O lote
+    precisa ficar abaixo da metade dessa estimativa; acima disso algo voltou a ser
+    calculado época a época.
+
+    Returns:
+        dict: Épocas, tempo do lote, estimativa época a época e aceleração
+    """
+    duracao_s = duracao_s or DURACAO_LINHA_DO_TEMPO
+    sinal = np.cumsum(np.random.default_rng(0).normal(0, 1, duracao_s * FREQUENCIA_AMOSTRAGEM)).astype(np.float32)
+    epocas, _ = janelas_epocas(sinal, TAMANHO_EPOCA, 0.5)
+
+    inicio = time.perf_counter()
+    for epoca in epocas[:EPOCAS_AMOSTRADAS]:
+        complexidade_lempel_ziv(epoca >= epoca.mean())
+        entropia_amostral(epoca)
+    estimativa = (time.perf_counter() - inicio) * len(epocas) / min(EPOCAS_AMOSTRADAS, len(epocas))
+
+    (matriz, _), tempo_lote = cronometrar(extrair_features_epocas, sinal, TAMANHO_EPOCA, 0.5)
+
+    print(f"\n📊 Linha do tempo de {duracao_s} s: {len(matriz)} épocas de {TAMANHO_EPOCA} amostras")
+    print(f"   Todas as features em lote:          {tempo_lote:.2f}s")
+    print(f"   LZ + entropia amostral por época:  ~{estimativa:.2f}s (estimado)")
+    print(f"   Aceleração:                         {estimativa / tempo_lote:.1f}x")
+    if tempo_lote >= estimativa / 2:
+        print("   ⚠️ Lote acima da metade do tempo época a época: a extração deixou de ser vetorizada?")
+
+    return {'epocas': len(matriz), 'tempo_lote': tempo_lote, 'estimativa_por_epoca': estimativa,
+            'aceleracao': estimativa / tempo_lote}
+
+if __name__ == "__main__":
+    executar_benchmark([int(arg) for arg in sys.argv[1:]] or None)
+    executar_benchmark_epocas()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Busca de hiperparâmetros com successive halving
+
+Para cada tipo de modelo, config.HYPERPARAM_CONFIGS configurações são sorteadas do
+espaço em ESPACOS e avaliadas com um orçamento pequeno (fração das épocas nos
+modelos Keras, fração das amostras de treino nos modelos sklearn). A cada rodada
+só o melhor 1/eta de cada tipo segue, com orçamento eta vezes maior, até o
+orçamento completo. As tentativas de todos os tipos de uma rodada rodam juntas em
+um pool de processos ('spawn'), que recebe a matriz de features (do cache de
+datasets) uma única vez, na criação de cada processo.
+
+Todas as tentativas formam o leaderboard; a melhor configuração de cada tipo no
+orçamento completo é gravada em config.HYPERPARAMS_PATH, e criar_modelo passa a
+usá-la no lugar dos valores fixos.
+
+Uso: python busca_hiperparametros.py [tipo_modelo ...]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+from datetime import datetime
+import numpy as np
+from treinamento_paralelo import pool_treinamento, dados_trabalhador
+from config import config
+
+TIPOS_KERAS = ('mlp_tabular', 'cnn', 'lstm', 'hybrid')
+
+# Espaço de busca: lista = escolha uniforme; ('log', a, b) = log-uniforme em [a, b]
+ESPACOS = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [None, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 'log2', 0.5]
+    },
+    'mlp': {
+        'hidden_layer_sizes': [(32, 16), (64, 32, 16), (128, 64)],
+        'alpha': ('log', 1e-5, 1e-2),
+        'learning_rate_init': ('log', 1e-4, 1e-2)
+    },
+    'sgd': {
+        'alpha': ('log', 1e-6, 1e-2),
+        'penalty': ['l2', 'l1', 'elasticnet']
+    },
+    'mlp_online': {
+        'hidden_layer_sizes': [(16,), (32, 16), (64, 32)],
+        'alpha': ('log', 1e-5, 1e-2),
+        'learning_rate_init': ('log', 1e-4, 1e-2)
+    },
+    'mlp_tabular': {
+        'learning_rate': ('log', 1e-4, 3e-3),
+        'batch_size': [8, 16, 32],
+        'dropout': [0.1, 0.2, 0.3, 0.4]
+    },
+    'cnn': {
+        'learning_rate': ('log', 1e-4, 3e-3),
+        'batch_size': [8, 16, 32],
+        'dropout': [0.1, 0.2, 0.3, 0.4]
+    },
+    'lstm': {
+        'learning_rate': ('log', 1e-4, 3e-3),
+        'batch_size': [8, 16, 32],
+        'dropout': [0.1, 0.2, 0.3, 0.4]
+    },
+    'hybrid': {
+        'learning_rate': ('log', 1e-4, 3e-3),
+        'batch_size': [8, 16, 32],
+        'dropout': [0.1, 0.2, 0.3, 0.4]
+    }
+}
+
+def sortear_configuracao(tipo_modelo, rng):
+    """Sorteia uma configuração do espaço de busca do tipo"""
+    configuracao = {}
+    for nome, espaco in ESPACOS[tipo_modelo].items():
+        if isinstance(espaco, tuple) and espaco[0] == 'log':
+            configuracao[nome] = float(np.exp(rng.uniform(np.log(espaco[1]), np.log(espaco[2]))))
+        else:
+            escolha = espaco[rng.integers(len(espaco))]
+            configuracao[nome] = escolha.item() if isinstance(escolha, np.generic) else escolha
+    return configuracao
+
+def melhores_hiperparametros(tipo_modelo, caminho=None):
+    """Melhor configuração gravada para o tipo ({} se nunca houve busca)"""
+    caminho = caminho or config.HYPERPARAMS_PATH
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return dict(json.load(f).get('melhores', {}).get(tipo_modelo, {}).get('parametros', {}))
+    except Exception as e:
+        print(f"⚠️ Hiperparâmetros ilegíveis em {caminho}: {e}")
+        return {}
+
+def carregar_resultados(caminho=None):
+    """Conteúdo do arquivo de hiperparâmetros (melhores, leaderboard e resumo da busca)"""
+    caminho = caminho or config.HYPERPARAMS_PATH
+    if not os.path.exists(caminho):
+        return {'melhores': {}, 'leaderboard': [], 'busca': None}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def salvar_resultados(melhores, leaderboard, resumo, caminho=None):
+    """Grava os resultados (escrita atômica), mantendo os melhores dos tipos fora desta busca"""
+    caminho = caminho or config.HYPERPARAMS_PATH
+    anteriores = carregar_resultados(caminho).get('melhores', {})
+    conteudo = {
+        'melhores': {**anteriores, **melhores},
+        'leaderboard': leaderboard,
+        'busca': resumo
+    }
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+def dividir_validacao(y, fracao=0.25, semente=42):
+    """Índices de treino e validação estratificados (a mesma divisão em todas as tentativas)"""
+    rng = np.random.default_rng(semente)
+    treino, validacao = [], []
+    for classe in np.unique(y):
+        indices = rng.permutation(np.flatnonzero(y == classe))
+        n_validacao = max(1, int(round(len(indices) * fracao)))
+        validacao.extend(indices[:n_validacao])
+        treino.extend(indices[n_validacao:])
+    return np.sort(treino), np.sort(validacao)
+
+def subamostrar(indices, y, fracao, semente=42):
+    """Fração estratificada dos índices de treino (pelo menos 5 por classe, para a validação interna do treino)"""
+    if fracao >= 1.0:
+        return indices
+    rng = np.random.default_rng(semente)
+    escolhidos = []
+    for classe in np.unique(y[indices]):
+        da_classe = indices[y[indices] == classe]
+        n = min(len(da_classe), max(5, int(round(len(da_classe) * fracao))))
+        escolhidos.extend(rng.choice(da_classe, size=n, replace=False))
+    return np.sort(escolhidos)
+
+def avaliar_tentativa(tipo_modelo, parametros, orcamento, X=None, y=None, feature_names=None):
+    """
+    Treina uma configuração com o orçamento dado e mede a validação
+
+    Args:
+        orcamento (float): Fração do orçamento completo (épocas nos modelos Keras,
+                           amostras de treino nos sklearn)
+
+    Returns:
+        dict: 'acuracia', 'log_loss' e 'duracao_s' (ou 'erro')
+    """
+    from ml_classifier import EEGClassifier
+
+    inicio = time.time()
+    X = dados_trabalhador['X'] if X is None else X
+    y = dados_trabalhador['y'] if y is None else y
+    feature_names = dados_trabalhador['feature_names'] if feature_names is None else feature_names
+    try:
+        treino, validacao = dividir_validacao(y)
+        hiperparametros = dict(parametros)
+        if tipo_modelo in TIPOS_KERAS:
+            hiperparametros['epochs'] = max(5, int(round(orcamento * config.HYPERPARAM_MAX_EPOCHS)))
+        else:
+            treino = subamostrar(treino, y, orcamento)
+
+        modelo = EEGClassifier()
+        modelo.criar_modelo(tipo_modelo, hiperparametros)
+        if 'n_threads' in dados_trabalhador and hasattr(modelo.model, 'n_jobs'):
+            modelo.model.n_jobs = dados_trabalhador['n_threads']
+        modelo.feature_names = list(feature_names)
+        modelo.treinar_modelo(X[treino], y[treino])
+        if not modelo.is_trained:
+            raise RuntimeError("Modelo não foi treinado")
+
+        probabilidades = np.clip(modelo.prever_matriz(X[validacao]), 1e-7, 1 - 1e-7)
+        y_validacao = y[validacao]
+        log_loss = -np.mean(y_validacao * np.log(probabilidades) + (1 - y_validacao) * np.log(1 - probabilidades))
+        return {
+            'acuracia': float(np.mean((probabilidades >= 0.5) == y_validacao)),
+            'log_loss': float(log_loss),
+            'duracao_s': round(time.time() - inicio, 3)
+        }
+    except Exception as e:
+        return {'erro': str(e), 'duracao_s': round(time.time() - inicio, 3)}
+
+def _chave_ordenacao(tentativa):
+    """Maior acurácia primeiro; empate decidido pelo menor log loss"""
+    if 'erro' in tentativa:
+        return (1, 0.0, 0.0)
+    return (0, -tentativa['acuracia'], tentativa['log_loss'])
+
+def orcamentos_rodadas(eta, orcamento_minimo):
+    """Orçamentos de cada rodada: orcamento_minimo * eta^k, terminando em 1.0"""
+    n_rodadas = max(1, int(math.floor(math.log(1.0 / orcamento_minimo, eta) + 1e-9)) + 1)
+    return [min(1.0, eta ** (rodada - n_rodadas + 1)) for rodada in range(n_rodadas)]
+
+def _successive_halving(vivos, orcamentos, eta, avaliar_lote, log):
+    """
+    Rodadas do successive halving
+
+    Args:
+        vivos (dict): {tipo: [(id, parâmetros)]} candidatos iniciais de cada tipo
+        avaliar_lote (callable): Recebe [(tipo, id, parâmetros)] e o orçamento; retorna os resultados
+
+    Returns:
+        list: Todas as tentativas (leaderboard sem ordenar)
+    """
+    leaderboard = []
+    for rodada, orcamento in enumerate(orcamentos):
+        tarefas = [(tipo, id_config, parametros) for tipo, candidatos in vivos.items()
+                   for id_config, parametros in candidatos]
+        log(f"🔁 Rodada {rodada + 1}/{len(orcamentos)}: {len(tarefas)} tentativas com orçamento {orcamento:.3f}")
+        resultados = avaliar_lote(tarefas, orcamento)
+
+        da_rodada = {tipo: [] for tipo in vivos}
+        for (tipo, id_config, parametros), resultado in zip(tarefas, resultados):
+            tentativa = {'tipo_modelo': tipo, 'id': id_config, 'rodada': rodada + 1,
+                         'orcamento': orcamento, 'parametros': parametros, **resultado}
+            leaderboard.append(tentativa)
+            da_rodada[tipo].append(tentativa)
+
+        # Só o melhor 1/eta de cada tipo segue para a próxima rodada
+        for tipo, tentativas in da_rodada.items():
+            tentativas.sort(key=_chave_ordenacao)
+            manter = max(1, len(tentativas) // eta)
+            vivos[tipo] = [(t['id'], t['parametros']) for t in tentativas[:manter] if 'erro' not in t]
+            melhor = tentativas[0]
+            if 'erro' in melhor:
+                log(f"   ❌ {tipo}: todas as tentativas falharam ({melhor['erro']})")
+            else:
+                log(f"   📈 {tipo}: melhor {melhor['id']} acurácia {melhor['acuracia']:.4f} "
+                    f"log loss {melhor['log_loss']:.4f}")
+        vivos = {tipo: candidatos for tipo, candidatos in vivos.items() if candidatos}
+        if not vivos:
+            break
+    return leaderboard
+
+def buscar_hiperparametros(X, y, feature_names, tipos_modelos=None, n_configuracoes=None, eta=None,
+                           orcamento_minimo=None, max_processos=None, semente=42, log=print,
+                           caminho=None, avaliar=None):
+    """
+    Successive halving de todos os tipos de modelo ao mesmo tempo
+
+    Args:
+        X, y, feature_names: Dataset (normalmente o do cache de datasets)
+        tipos_modelos (list): Tipos buscados (padrão: todos de ESPACOS)
+        n_configuracoes (int): Configurações sorteadas por tipo (padrão: config.HYPERPARAM_CONFIGS)
+        eta (int): Fator de corte por rodada (padrão: config.HYPERPARAM_ETA)
+        orcamento_minimo (float): Orçamento da primeira rodada (padrão: config.HYPERPARAM_MIN_BUDGET)
+        max_processos (int): Processos do pool (padrão: config.HYPERPARAM_PROCESSES, 0 = núcleos)
+        avaliar (callable): Substitui o pool (avaliação no próprio processo), para testes
+
+    Returns:
+        dict: {'melhores': {tipo: {...}}, 'leaderboard': [...], 'busca': resumo}
+    """
+    tipos_modelos = list(tipos_modelos or ESPACOS)
+    n_configuracoes = n_configuracoes or config.HYPERPARAM_CONFIGS
+    eta = eta or config.HYPERPARAM_ETA
+    orcamento_minimo = orcamento_minimo or config.HYPERPARAM_MIN_BUDGET
+    max_processos = max_processos or config.HYPERPARAM_PROCESSES or os.cpu_count() or 1
+    rng = np.random.default_rng(semente)
+    inicio = time.time()
+
+    # Candidatos vivos por tipo: (id, parâmetros)
+    vivos = {tipo: [(f"{tipo}-{i}", sortear_configuracao(tipo, rng)) for i in range(n_configuracoes)]
+             for tipo in tipos_modelos}
+    orcamentos = orcamentos_rodadas(eta, orcamento_minimo)
+    log(f"🎛️ Busca de hiperparâmetros: {len(tipos_modelos)} tipos x {n_configuracoes} configurações, "
+        f"eta {eta}, orçamentos {[round(o, 3) for o in orcamentos]}")
+
+    if avaliar is None:
+        with pool_treinamento(max_processos, X, y, feature_names) as pool:
+            def avaliar_lote(tarefas, orcamento):
+                return list(pool.map(avaliar_tentativa, [tipo for tipo, _, _ in tarefas],
+                                     [parametros for _, _, parametros in tarefas], [orcamento] * len(tarefas)))
+            leaderboard = _successive_halving(vivos, orcamentos, eta, avaliar_lote, log)
+    else:
+        leaderboard = _successive_halving(
+            vivos, orcamentos, eta,
+            lambda tarefas, orcamento: [avaliar(tipo, parametros, orcamento) for tipo, _, parametros in tarefas], log)
+
+    # Melhor configuração de cada tipo no orçamento completo
+    melhores = {}
+    for tipo in tipos_modelos:
+        completas = sorted((t for t in leaderboard if t['tipo_modelo'] == tipo and t['orcamento'] >= 1.0
+                            and 'erro' not in t), key=_chave_ordenacao)
+        if completas:
+            melhores[tipo] = {
+                'parametros': completas[0]['parametros'],
+                'acuracia': completas[0]['acuracia'],
+                'log_loss': completas[0]['log_loss'],
+                'data': datetime.now().isoformat(timespec='seconds')
+            }
+
+    leaderboard.sort(key=lambda t: (-t['orcamento'], _chave_ordenacao(t)))
+    resumo = {
+        'tipos_modelos': tipos_modelos,
+        'n_configuracoes': n_configuracoes,
+        'eta': eta,
+        'orcamentos': orcamentos,
+        'tentativas': len(leaderboard),
+        'processos': max_processos if avaliar is None else 1,
+        'amostras': int(len(X)),
+        'duracao_s': round(time.time() - inicio, 3)
+    }
+    salvar_resultados(melhores, leaderboard, resumo, caminho)
+    log(f"🏆 Busca concluída em {resumo['duracao_s']:.1f}s: {len(leaderboard)} tentativas, "
+        f"{len(melhores)} configurações gravadas em {caminho or config.HYPERPARAMS_PATH}")
+    return {'melhores': melhores, 'leaderboard': leaderboard, 'busca': resumo}
+
+def buscar_com_dataset(tipos_modelos=None, log=print, **kwargs):
+    """Busca sobre o dataset de todos os sinais rotulados (reaproveitando o cache de datasets)"""
+    from ml_classifier import EEGClassifier
+
+    X, y, feature_names = EEGClassifier().criar_dataset(limite=None)
+    if X is None:
+        raise RuntimeError("Dataset de treinamento indisponível")
+    return buscar_hiperparametros(X, y, feature_names, tipos_modelos=tipos_modelos, log=log, **kwargs)
+
+if __name__ == "__main__":
+    buscar_com_dataset(sys.argv[1:] or None)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Cache dos datasets de treinamento
+
+criar_dataset guarda X, y, os nomes das features e os IDs dos sinais de cada linha
+em um .npz comprimido. A chave
+combina os sinais selecionados (id, nome e categoria real, que é a versão do
+rótulo) com a versão do extrator de features, então um retreinamento com os mesmos
+sinais e rótulos pula a extração e os gráficos e vai direto para o ajuste do modelo.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from extracao_features import versao_extrator
+from config import config
+
+def chave_dataset(sinais):
+    """
+    Chave do dataset para um conjunto de sinais rotulados
+
+    Args:
+        sinais (list): Tuplas (id_sinal, nome, categoria real)
+
+    Returns:
+        str: Hash hexadecimal (a ordem dos sinais não importa)
+    """
+    conteudo = {
+        'sinais': sorted([int(id_sinal), str(nome), str(possui)] for id_sinal, nome, possui in sinais),
+        'extrator': versao_extrator()
+    }
+    return hashlib.sha1(json.dumps(conteudo, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def caminho_dataset(chave, diretorio=None):
+    """Arquivo .npz de uma chave"""
+    return os.path.join(diretorio or config.DATASET_CACHE_DIR, f"dataset_{chave}.npz")
+
+def carregar_dataset(chave, diretorio=None):
+    """
+    Carrega um dataset do cache
+
+    Returns:
+        tuple: (X, y, feature_names, ids dos sinais) ou None se a chave não está no cache
+               (ids é None em arquivos gravados antes de guardar os IDs)
+    """
+    caminho = caminho_dataset(chave, diretorio)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with np.load(caminho) as dados:
+            X, y, nomes = dados['X'], dados['y'], [str(nome) for nome in dados['feature_names']]
+            ids_sinais = dados['ids'] if 'ids' in dados else None
+        os.utime(caminho)  # Marca como usado recentemente para a limpeza
+        return X, y, nomes, ids_sinais
+    except Exception as e:
+        print(f"⚠️ Dataset em cache ilegível ({caminho}): {e}")
+        return None
+
+def salvar_dataset(chave, X, y, feature_names, diretorio=None, max_arquivos=None, ids_sinais=None):
+    """Salva um dataset no cache (escrita atômica) e remove os arquivos menos usados além do limite"""
+    diretorio = diretorio or config.DATASET_CACHE_DIR
+    max_arquivos = max_arquivos or config.DATASET_CACHE_MAX_FILES
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = caminho_dataset(chave, diretorio)
+        temporario = f"{caminho}.tmp.npz"
+        arrays = {'X': X, 'y': y, 'feature_names': np.array(feature_names)}
+        if ids_sinais is not None:
+            arrays['ids'] = np.asarray(ids_sinais, dtype=np.int64)
+        np.savez_compressed(temporario, **arrays)
+        os.replace(temporario, caminho)
+
+        arquivos = sorted((os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+                           if nome.startswith('dataset_') and nome.endswith('.npz') and '.tmp' not in nome),
+                          key=os.path.getmtime)
+        for antigo in arquivos[:max(len(arquivos) - max_arquivos, 0)]:
+            os.remove(antigo)
+        return True
+    except Exception as e:
+        print(f"⚠️ Erro ao salvar dataset em cache: {e}")
+        return False
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cache versionado de predições
+
+Cada entrada é identificada por (id do sinal, nome do modelo, versão do modelo), em
+que a versão é o hash do arquivo salvo do modelo. Um retreinamento gera um novo
+arquivo e portanto uma nova versão, então entradas antigas nunca são servidas; elas
+são descartadas por invalidar_modelo ou saem pelo LRU. O cache fica em memória e é
+persistido em disco (config.PREDICTION_CACHE_PATH).
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from config import config
+
+# Versão do formato do arquivo persistido (o formato antigo era {id_sinal: predição})
+FORMATO_CACHE = 2
+
+_versoes_arquivos = {}
+_lock_versoes = threading.Lock()
+
+def calcular_versao(dados):
+    """Hash curto (12 caracteres) do conteúdo serializado de um modelo"""
+    return hashlib.sha1(dados).hexdigest()[:12]
+
+def versao_arquivo_modelo(caminho_arquivo):
+    """
+    Versão do modelo salvo em um arquivo, ou None se o arquivo não existe
+
+    O hash é memorizado por (tamanho, mtime), então o arquivo só é relido quando muda.
+    """
+    try:
+        estado = os.stat(caminho_arquivo)
+    except OSError:
+        return None
+
+    assinatura = (estado.st_size, estado.st_mtime_ns)
+    with _lock_versoes:
+        memorizada = _versoes_arquivos.get(caminho_arquivo)
+        if memorizada and memorizada[0] == assinatura:
+            return memorizada[1]
+
+    with open(caminho_arquivo, 'rb') as f:
+        versao = calcular_versao(f.read())
+
+    with _lock_versoes:
+        _versoes_arquivos[caminho_arquivo] = (assinatura, versao)
+    return versao
+
+class CachePredicoes:
+    """Cache LRU de predições por (id_sinal, modelo, versão), seguro entre threads"""
+
+    def __init__(self, caminho_arquivo=None, capacidade=None):
+        self.caminho_arquivo = caminho_arquivo or config.PREDICTION_CACHE_PATH
+        self.capacidade = capacidade or config.PREDICTION_CACHE_SIZE
+        self.entradas = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def obter(self, id_sinal, nome_modelo, versao):
+        """Retorna a predição em cache ou None (conta acerto/falta)"""
+        if versao is None:
+            return None
+
+        chave = (id_sinal, nome_modelo, versao)
+        with self.lock:
+            predicao = self.entradas.get(chave)
+            if predicao is None:
+                self.faltas += 1
+                return None
+            self.entradas.move_to_end(chave)
+            self.acertos += 1
+            return predicao
+
+    def guardar(self, id_sinal, nome_modelo, versao, predicao):
+        """Guarda uma predição; a entrada menos usada sai quando o cache está cheio"""
+        if versao is None or predicao is None:
+            return
+
+        chave = (id_sinal, nome_modelo, versao)
+        with self.lock:
+            self.entradas[chave] = predicao
+            self.entradas.move_to_end(chave)
+            while len(self.entradas) > self.capacidade:
+                self.entradas.popitem(last=False)
+
+    def invalidar_sinal(self, id_sinal):
+        """Remove as predições de um sinal (dados do sinal alterados ou ID reutilizado)"""
+        with self.lock:
+            chaves = [chave for chave in self.entradas if chave[0] == id_sinal]
+            for chave in chaves:
+                del self.entradas[chave]
+        return len(chaves)
+
+    def invalidar_modelo(self, nome_modelo, manter_versao=None):
+        """Remove as predições de um modelo, exceto as da versão informada"""
+        with self.lock:
+            chaves = [chave for chave in self.entradas
+                      if chave[1] == nome_modelo and chave[2] != manter_versao]
+            for chave in chaves:
+                del self.entradas[chave]
+        return len(chaves)
+
+    def limpar(self):
+        """Remove todas as entradas e zera as estatísticas"""
+        with self.lock:
+            self.entradas.clear()
+            self.acertos = 0
+            self.faltas = 0
+
+    def estatisticas(self):
+        """Tamanho do cache e taxa de acerto"""
+        with self.lock:
+            consultas = self.acertos + self.faltas
+            return {
+                'entradas': len(self.entradas),
+                'capacidade': self.capacidade,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'taxa_acerto': round(self.acertos / consultas, 4) if consultas else 0.0
+            }
+
+    def salvar(self):
+        """Persiste as entradas em disco (escrita atômica)"""
+        try:
+            with self.lock:
+                dados = {'formato': FORMATO_CACHE, 'entradas': list(self.entradas.items())}
+            temporario = f"{self.caminho_arquivo}.tmp"
+            with open(temporario, 'wb') as f:
+                pickle.dump(dados, f)
+            os.replace(temporario, self.caminho_arquivo)
+            print(f"✅ Cache de predições salvo: {len(dados['entradas'])} entradas")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao salvar cache de predições: {e}")
+            return False
+
+    def carregar(self):
+        """Carrega as entradas persistidas; arquivos no formato antigo são descartados"""
+        try:
+            if not os.path.exists(self.caminho_arquivo):
+                print("⚠️ Cache de predições não encontrado")
+                return False
+
+            with open(self.caminho_arquivo, 'rb') as f:
+                dados = pickle.load(f)
+
+            if not isinstance(dados, dict) or dados.get('formato') != FORMATO_CACHE:
+                print("⚠️ Cache de predições em formato antigo (sem versão do modelo) descartado")
+                return False
+
+            with self.lock:
+                self.entradas = OrderedDict(dados['entradas'])
+                while len(self.entradas) > self.capacidade:
+                    self.entradas.popitem(last=False)
+            print(f"✅ Cache carregado: {len(self.entradas)} predições")
+            return True
+
+        except Exception as e:
+            print(f"❌ Erro ao carregar cache: {e}")
+            return False
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Cascata de inferência: modelo rápido primeiro, modelos pesados só na dúvida
+
+O Random Forest (compilado em arrays) pontua todos os sinais. Só os sinais cuja
+probabilidade cai dentro da faixa de incerteza (limiar_inferior, limiar_superior)
+sobem para os modelos Keras, que são combinados por média das probabilidades ou por
+votação. As features são extraídas uma única vez para todos os estágios.
+
+Os limiares são ajustados sobre predições de validação já salvas (ajustar_limiares):
+a menor faixa cuja acurácia fica a até config.CASCADE_TUNING_TOLERANCE da melhor.
+"""
+
+import os
+import json
+import time
+import threading
+import numpy as np
+from ml_classifier import extrair_features_modelos, colunas_modelo
+from config import config
+
+METODOS_COMBINACAO = ('media', 'votacao')
+
+def combinar_probabilidades(probabilidades, metodo=None):
+    """
+    Combina as probabilidades de vários modelos, linha a linha
+
+    Args:
+        probabilidades (np.array): Matriz (n_sinais, n_modelos); NaN = modelo sem predição
+        metodo (str): 'media' das probabilidades ou 'votacao' (fração de votos 'Sim')
+
+    Returns:
+        np.array: Probabilidade combinada (NaN nas linhas sem nenhuma predição)
+    """
+    metodo = metodo or config.CASCADE_COMBINATION
+    if metodo not in METODOS_COMBINACAO:
+        raise ValueError(f"Método de combinação inválido: {metodo}")
+
+    probabilidades = np.atleast_2d(np.asarray(probabilidades, dtype=np.float64))
+    validos = ~np.isnan(probabilidades)
+    n_validos = validos.sum(axis=1)
+    if metodo == 'media':
+        soma = np.where(validos, probabilidades, 0.0).sum(axis=1)
+    else:
+        soma = (validos & (probabilidades >= 0.5)).sum(axis=1).astype(np.float64)
+
+    combinada = np.full(probabilidades.shape[0], np.nan)
+    np.divide(soma, n_validos, out=combinada, where=n_validos > 0)
+    return combinada
+
+def ajustar_limiares(prob_rapido, prob_pesados, rotulos, metodo=None, passo=0.05, tolerancia=None):
+    """
+    Escolhe a faixa de incerteza sobre predições de validação salvas
+
+    Cada faixa (inferior, superior) em volta de 0.5 é avaliada: dentro dela vale a
+    combinação dos modelos pesados (quando existe), fora dela vale o modelo rápido.
+    Entre as faixas com acurácia a até `tolerancia` da melhor, fica a que escala
+    menos sinais.
+
+    Args:
+        prob_rapido (np.array): Probabilidades do modelo rápido (n_sinais,)
+        prob_pesados (np.array): Probabilidades dos modelos pesados (n_sinais, n_modelos), NaN = ausente
+        rotulos (np.array): Classe real (1 = 'Sim', 0 = 'Não')
+        metodo (str): Combinação dos modelos pesados
+        passo (float): Passo da grade de limiares
+        tolerancia (float): Perda de acurácia aceita (padrão: config.CASCADE_TUNING_TOLERANCE)
+
+    Returns:
+        dict: Limiares escolhidos, acurácia, taxa de escalonamento e referências
+    """
+    tolerancia = config.CASCADE_TUNING_TOLERANCE if tolerancia is None else tolerancia
+    prob_rapido = np.asarray(prob_rapido, dtype=np.float64)
+    rotulos = np.asarray(rotulos).astype(bool)
+    if len(prob_rapido) == 0:
+        raise ValueError("Nenhuma predição de validação para ajustar a cascata")
+
+    combinada = combinar_probabilidades(prob_pesados, metodo)
+    tem_pesados = ~np.isnan(combinada)
+    acerto_rapido = (prob_rapido >= 0.5) == rotulos
+    acerto_pesados = np.where(tem_pesados, (combinada >= 0.5) == rotulos, acerto_rapido)
+
+    # Grade de faixas: 0.5 - i*passo < p < 0.5 + j*passo
+    passos = np.arange(int(round(0.5 / passo)) + 1) * passo
+    candidatos = []
+    for inferior in 0.5 - passos:
+        for superior in 0.5 + passos:
+            escalados = (prob_rapido > inferior) & (prob_rapido < superior) & tem_pesados
+            candidatos.append({
+                'limiar_inferior': round(float(inferior), 4),
+                'limiar_superior': round(float(superior), 4),
+                'acuracia': float(np.where(escalados, acerto_pesados, acerto_rapido).mean()),
+                'taxa_escalonamento': float(escalados.mean())
+            })
+
+    melhor_acuracia = max(candidato['acuracia'] for candidato in candidatos)
+    aceitos = [candidato for candidato in candidatos if candidato['acuracia'] >= melhor_acuracia - tolerancia]
+    escolhido = min(aceitos, key=lambda c: (c['taxa_escalonamento'], -c['acuracia'],
+                                            c['limiar_superior'] - c['limiar_inferior']))
+
+    return dict(escolhido,
+                acuracia_rapido=float(acerto_rapido.mean()),
+                acuracia_pesados=float(acerto_pesados.mean()),
+                amostras=int(len(prob_rapido)),
+                metodo=metodo or config.CASCADE_COMBINATION)
+
+class CascataInferencia:
+    """Predição em dois estágios com contagem de escalonamentos e latência economizada"""
+
+    def __init__(self, limiar_inferior=None, limiar_superior=None, combinacao=None, caminho_limiares=None):
+        self.limiar_inferior = 0.5 - config.CASCADE_BAND if limiar_inferior is None else limiar_inferior
+        self.limiar_superior = 0.5 + config.CASCADE_BAND if limiar_superior is None else limiar_superior
+        self.combinacao = combinacao or config.CASCADE_COMBINATION
+        self.caminho_limiares = caminho_limiares or config.CASCADE_THRESHOLDS_PATH
+        self.lock = threading.Lock()
+        self.zerar_estatisticas()
+
+    def zerar_estatisticas(self):
+        """Zera os contadores acumulados"""
+        self.sinais = 0
+        self.escalados = 0
+        self.tempo_rapido = 0.0
+        self.tempo_pesado = 0.0
+        self.custo_pesado_por_sinal = None  # Segundos por sinal, medido nos lotes escalados
+        self.latencia_economizada = 0.0
+
+    def incerto(self, probabilidades):
+        """Máscara dos sinais dentro da faixa de incerteza"""
+        probabilidades = np.asarray(probabilidades)
+        return (probabilidades > self.limiar_inferior) & (probabilidades < self.limiar_superior)
+
+    def prever_lote(self, modelo_rapido, modelos_pesados, ids_sinais):
+        """
+        Prediz vários sinais pela cascata
+
+        Args:
+            modelo_rapido (EEGClassifier): Modelo que pontua todos os sinais
+            modelos_pesados (dict): {nome: EEGClassifier} usados só nos sinais incertos
+            ids_sinais (list): IDs dos sinais
+
+        Returns:
+            dict: {id_sinal: predição ou None}; cada predição traz também 'escalado',
+                'modelos' e 'probabilidade_rapido'
+        """
+        resultados = {id_sinal: None for id_sinal in ids_sinais}
+        if not modelo_rapido or not modelo_rapido.is_trained or not ids_sinais:
+            return resultados
+
+        pesados = {nome: modelo for nome, modelo in modelos_pesados.items() if modelo and modelo.is_trained}
+        nomes, ids_validos, X = extrair_features_modelos([modelo_rapido, *pesados.values()], ids_sinais)
+        if len(ids_validos) == 0:
+            return resultados
+
+        inicio = time.perf_counter()
+        prob_rapido = modelo_rapido.prever_matriz(X[:, colunas_modelo(nomes, modelo_rapido)])
+        tempo_rapido = time.perf_counter() - inicio
+
+        escalar = self.incerto(prob_rapido) if pesados else np.zeros(len(ids_validos), dtype=bool)
+        n_escalados = int(escalar.sum())
+        prob_pesados = np.full((n_escalados, len(pesados)), np.nan)
+        tempo_pesado = 0.0
+        if n_escalados:
+            X_incertos = X[escalar]
+            for coluna, (nome_modelo, modelo) in enumerate(pesados.items()):
+                inicio = time.perf_counter()
+                try:
+                    prob_pesados[:, coluna] = modelo.prever_matriz(X_incertos[:, colunas_modelo(nomes, modelo)])
+                except Exception as e:
+                    print(f"❌ Erro no modelo {nome_modelo} da cascata: {e}")
+                tempo_pesado += time.perf_counter() - inicio
+
+        probabilidades = prob_rapido.astype(np.float64)
+        combinada = combinar_probabilidades(prob_pesados, self.combinacao)
+        indices_escalados = np.flatnonzero(escalar)
+        com_pesados = ~np.isnan(combinada)
+        probabilidades[indices_escalados[com_pesados]] = combinada[com_pesados]
+        modelos_escalados = ['principal', *pesados]
+
+        nomes_rapido = modelo_rapido.feature_names or nomes
+        colunas_rapido = colunas_modelo(nomes, modelo_rapido)
+        posicao_escalado = {indice: posicao for posicao, indice in enumerate(indices_escalados)}
+        for indice, id_sinal in enumerate(ids_validos):
+            escalado = indice in posicao_escalado and com_pesados[posicao_escalado[indice]]
+            resultados[id_sinal] = {
+                'classe_predita': 'Sim' if probabilidades[indice] >= 0.5 else 'Não',
+                'probabilidade': float(probabilidades[indice]),
+                'probabilidade_rapido': float(prob_rapido[indice]),
+                'escalado': bool(escalado),
+                'modelos': modelos_escalados if escalado else ['principal'],
+                'features': {nome: float(valor) for nome, valor in zip(nomes_rapido, X[indice, colunas_rapido])}
+            }
+
+        self._registrar(len(ids_validos), n_escalados, tempo_rapido, tempo_pesado)
+        return resultados
+
+    def _registrar(self, n_sinais, n_escalados, tempo_rapido, tempo_pesado):
+        """Acumula contagens e estima a latência que os sinais não escalados economizaram"""
+        with self.lock:
+            self.sinais += n_sinais
+            self.escalados += n_escalados
+            self.tempo_rapido += tempo_rapido
+            self.tempo_pesado += tempo_pesado
+            if n_escalados:
+                custo = tempo_pesado / n_escalados
+                self.custo_pesado_por_sinal = custo if self.custo_pesado_por_sinal is None \
+                    else 0.9 * self.custo_pesado_por_sinal + 0.1 * custo
+            if self.custo_pesado_por_sinal is not None:
+                self.latencia_economizada += (n_sinais - n_escalados) * self.custo_pesado_por_sinal
+
+    def estatisticas(self):
+        """Sinais atendidos, escalonamentos e latência economizada"""
+        with self.lock:
+            return {
+                'sinais': self.sinais,
+                'escalados': self.escalados,
+                'taxa_escalonamento': round(self.escalados / self.sinais, 4) if self.sinais else 0.0,
+                'tempo_rapido_s': round(self.tempo_rapido, 4),
+                'tempo_pesado_s': round(self.tempo_pesado, 4),
+                'custo_pesado_por_sinal_ms': round(self.custo_pesado_por_sinal * 1000.0, 3)
+                    if self.custo_pesado_por_sinal is not None else None,
+                'latencia_economizada_s': round(self.latencia_economizada, 4),
+                'limiar_inferior': self.limiar_inferior,
+                'limiar_superior': self.limiar_superior,
+                'combinacao': self.combinacao
+            }
+
+    def aplicar_ajuste(self, ajuste):
+        """Usa os limiares e o método de combinação de um resultado de ajustar_limiares"""
+        self.limiar_inferior = ajuste['limiar_inferior']
+        self.limiar_superior = ajuste['limiar_superior']
+        self.combinacao = ajuste.get('metodo', self.combinacao)
+
+    def salvar_limiares(self, ajuste):
+        """Persiste o resultado do ajuste (escrita atômica)"""
+        try:
+            temporario = f"{self.caminho_limiares}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(ajuste, f, indent=2)
+            os.replace(temporario, self.caminho_limiares)
+            print(f"✅ Limiares da cascata salvos: ({ajuste['limiar_inferior']}, {ajuste['limiar_superior']})")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao salvar limiares da cascata: {e}")
+            return False
+
+    def carregar_limiares(self):
+        """Carrega os limiares ajustados; sem arquivo, ficam os de config.CASCADE_BAND"""
+        try:
+            if not os.path.exists(self.caminho_limiares):
+                return False
+            with open(self.caminho_limiares, 'r', encoding='utf-8') as f:
+                self.aplicar_ajuste(json.load(f))
+            print(f"✅ Limiares da cascata carregados: ({self.limiar_inferior}, {self.limiar_superior})")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao carregar limiares da cascata: {e}")
+            return False
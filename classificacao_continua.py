@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Classificação contínua de EEG em tempo real
+
+Cada sessão guarda as últimas config.STREAM_WINDOW amostras em um buffer circular.
+A cada config.STREAM_HOP amostras novas (um salto), a janela deslizante passa pelas
+mesmas features do EEGClassifier (calcular_features_matriz) e pelo modelo, gerando
+um evento de predição. O custo de um bloco depende só do tamanho do bloco e da
+janela, nunca do comprimento da sessão:
+
+- estatísticas da sessão (média e variância de Welford) e somas da janela são
+  atualizadas incrementalmente, amostra a amostra, em O(bloco);
+- a dinâmica simbólica da sessão é causal: cada amostra vira bit comparando com a
+  média da sessão até ela, e só as contagens de palavras de m bits são guardadas
+  (com os últimos m-1 bits para emendar os blocos).
+"""
+
+import json
+import time
+import threading
+import numpy as np
+from extracao_features import calcular_features_matriz, NOMES_FEATURES
+from dinamica_simbolica import calcular_entropia_shannon_lote
+from qualidade_sinal import avaliar_qualidade
+from config import config
+
+class BufferCircular:
+    """Buffer de tamanho fixo com as últimas `capacidade` amostras"""
+
+    def __init__(self, capacidade, dtype=None):
+        self.capacidade = capacidade
+        self.dados = np.zeros(capacidade, dtype=dtype or config.PIPELINE_DTYPE)
+        self.posicao = 0  # Próxima posição de escrita
+        self.tamanho = 0
+
+    @property
+    def cheio(self):
+        return self.tamanho == self.capacidade
+
+    def escrever(self, amostras):
+        """
+        Escreve as amostras (no máximo `capacidade` por chamada)
+
+        Returns:
+            np.array: Amostras sobrescritas (as que saíram da janela), na ordem de chegada
+        """
+        amostras = np.asarray(amostras, dtype=self.dados.dtype)
+        n = len(amostras)
+        if n > self.capacidade:
+            raise ValueError(f"Bloco de {n} amostras maior que o buffer ({self.capacidade})")
+
+        indices = (self.posicao + np.arange(n)) % self.capacidade
+        n_sobrescritas = max(self.tamanho + n - self.capacidade, 0)
+        sobrescritas = self.dados[indices[n - n_sobrescritas:]].copy() if n_sobrescritas else self.dados[:0].copy()
+        self.dados[indices] = amostras
+        self.posicao = (self.posicao + n) % self.capacidade
+        self.tamanho = min(self.tamanho + n, self.capacidade)
+        return sobrescritas
+
+    def janela(self):
+        """Amostras em ordem cronológica (da mais antiga para a mais nova)"""
+        if not self.cheio:
+            return self.dados[:self.tamanho].copy()
+        return np.concatenate((self.dados[self.posicao:], self.dados[:self.posicao]))
+
+class SessaoContinua:
+    """Estado de uma sessão de classificação contínua"""
+
+    def __init__(self, id_sessao, janela=None, salto=None, m=None):
+        self.id_sessao = id_sessao
+        self.janela = janela or config.STREAM_WINDOW
+        self.salto = salto or config.STREAM_HOP
+        self.m = m or config.SYMBOLIC_M
+        if self.salto > self.janela:
+            raise ValueError("O salto não pode ser maior que a janela")
+
+        self.buffer = BufferCircular(self.janela)
+        self.lock = threading.Lock()
+        self.criada = time.time()
+        self.ultimo_acesso = self.criada
+        self.desde_ultimo_salto = 0
+        self.eventos = 0
+
+        # Estatísticas da sessão (Welford)
+        self.n_total = 0
+        self.media = 0.0
+        self.m2 = 0.0
+
+        # Somas da janela, atualizadas com as amostras que entram e saem
+        self.soma_janela = 0.0
+        self.soma_quadrados_janela = 0.0
+
+        # Dinâmica simbólica causal da sessão
+        self.contagens_palavras = np.zeros(2 ** self.m, dtype=np.int64)
+        self.bits_anteriores = np.zeros(0, dtype=np.int64)
+
+    def _atualizar_estatisticas(self, bloco):
+        """Welford em bloco para a sessão (combinação de médias e M2)"""
+        n_bloco = len(bloco)
+        media_bloco = float(bloco.mean(dtype=np.float64))
+        m2_bloco = float(np.sum((bloco.astype(np.float64) - media_bloco) ** 2))
+        n_novo = self.n_total + n_bloco
+        delta = media_bloco - self.media
+        self.media += delta * n_bloco / n_novo
+        self.m2 += m2_bloco + delta ** 2 * self.n_total * n_bloco / n_novo
+        self.n_total = n_novo
+
+    def _atualizar_simbolica(self, bloco, soma_anterior, n_anterior):
+        """Bits causais (amostra >= média da sessão até ela) e contagem das novas palavras"""
+        medias = (soma_anterior + np.cumsum(bloco, dtype=np.float64)) / (n_anterior + np.arange(1, len(bloco) + 1))
+        bits = np.concatenate((self.bits_anteriores, (bloco >= medias).astype(np.int64)))
+        n_palavras = len(bits) - self.m + 1
+        if n_palavras > 0:
+            palavras = np.zeros(n_palavras, dtype=np.int64)
+            for j in range(self.m):
+                palavras = (palavras << 1) | bits[j:j + n_palavras]
+            self.contagens_palavras += np.bincount(palavras, minlength=len(self.contagens_palavras))
+        self.bits_anteriores = bits[-(self.m - 1):] if self.m > 1 else bits[:0]
+
+    def _inserir(self, bloco):
+        """Insere um bloco de no máximo `salto` amostras"""
+        soma_anterior = self.media * self.n_total
+        n_anterior = self.n_total
+        self._atualizar_estatisticas(bloco)
+        self._atualizar_simbolica(bloco, soma_anterior, n_anterior)
+
+        saidas = self.buffer.escrever(bloco).astype(np.float64)
+        entradas = bloco.astype(np.float64)
+        self.soma_janela += entradas.sum() - saidas.sum()
+        self.soma_quadrados_janela += np.dot(entradas, entradas) - np.dot(saidas, saidas)
+        self.desde_ultimo_salto += len(bloco)
+
+    def estatisticas(self):
+        """Estatísticas incrementais da sessão e da janela atual"""
+        tamanho = self.buffer.tamanho
+        total_palavras = self.contagens_palavras.sum()
+        frequencias = self.contagens_palavras / max(total_palavras, 1)
+        return {
+            'amostras': self.n_total,
+            'media_sessao': self.media,
+            'desvio_padrao_sessao': float(np.sqrt(self.m2 / self.n_total)) if self.n_total else 0.0,
+            'media_janela': self.soma_janela / tamanho if tamanho else 0.0,
+            'rms_janela': float(np.sqrt(max(self.soma_quadrados_janela, 0.0) / tamanho)) if tamanho else 0.0,
+            'entropia_simbolica_sessao': float(calcular_entropia_shannon_lote(frequencias[None, :])[0])
+        }
+
+    def adicionar(self, amostras, modelo=None):
+        """
+        Recebe um bloco de amostras e gera um evento por salto completado
+
+        Args:
+            amostras (array-like): Novas amostras, em ordem
+            modelo (EEGClassifier): Modelo treinado usado na janela (opcional)
+
+        Returns:
+            list: Eventos (dicts) de predição, um por salto
+        """
+        amostras = np.asarray(amostras, dtype=config.PIPELINE_DTYPE).ravel()
+        amostras = amostras[np.isfinite(amostras)]
+        eventos = []
+        with self.lock:
+            self.ultimo_acesso = time.time()
+            inicio = 0
+            while inicio < len(amostras):
+                # Corta o bloco na fronteira do próximo salto
+                tamanho = min(self.salto - self.desde_ultimo_salto, len(amostras) - inicio)
+                self._inserir(amostras[inicio:inicio + tamanho])
+                inicio += tamanho
+                if self.desde_ultimo_salto >= self.salto:
+                    self.desde_ultimo_salto = 0
+                    if self.buffer.cheio:
+                        eventos.append(self._evento(modelo))
+        return eventos
+
+    def _evento(self, modelo):
+        """Predição do modelo sobre a janela atual"""
+        inicio = time.perf_counter()
+        janela = self.buffer.janela()
+        evento = {
+            'sessao': self.id_sessao,
+            'evento': self.eventos,
+            'amostra_final': self.n_total,
+            'estatisticas': self.estatisticas()
+        }
+        self.eventos += 1
+
+        qualidade = avaliar_qualidade(janela)
+        evento['qualidade'] = {'flags': qualidade['flags'], 'motivos': qualidade['motivos']}
+        if not qualidade['valido']:
+            evento['predicao'] = None
+        elif modelo is None or not modelo.is_trained:
+            evento['predicao'] = None
+            evento['erro'] = 'Modelo não está treinado'
+        else:
+            nomes = modelo.feature_names or NOMES_FEATURES
+            X = calcular_features_matriz(janela[None, :], m=config.SYMBOLIC_M, nomes=nomes)
+            probabilidade = float(modelo.prever_matriz(X)[0])
+            evento['predicao'] = {
+                'classe_predita': 'Sim' if probabilidade >= 0.5 else 'Não',
+                'probabilidade': probabilidade
+            }
+
+        evento['tempo_ms'] = round((time.perf_counter() - inicio) * 1000.0, 3)
+        return evento
+
+class GerenciadorSessoes:
+    """Sessões de classificação contínua abertas, com limite e expiração por inatividade"""
+
+    def __init__(self, max_sessoes=None, expiracao_s=None):
+        self.max_sessoes = max_sessoes or config.STREAM_MAX_SESSIONS
+        self.expiracao_s = config.STREAM_SESSION_TTL_S if expiracao_s is None else expiracao_s
+        self.sessoes = {}
+        self.lock = threading.Lock()
+
+    def obter(self, id_sessao, criar=True):
+        """Sessão existente, ou uma nova (None se não existe e criar=False)"""
+        self.limpar_inativas()
+        with self.lock:
+            sessao = self.sessoes.get(id_sessao)
+            if sessao is None and criar:
+                if len(self.sessoes) >= self.max_sessoes:
+                    raise RuntimeError(f"Limite de {self.max_sessoes} sessões contínuas atingido")
+                sessao = self.sessoes[id_sessao] = SessaoContinua(id_sessao)
+            return sessao
+
+    def encerrar(self, id_sessao):
+        """Remove uma sessão; retorna True se ela existia"""
+        with self.lock:
+            return self.sessoes.pop(id_sessao, None) is not None
+
+    def limpar_inativas(self):
+        """Remove as sessões sem blocos há mais de expiracao_s segundos"""
+        limite = time.time() - self.expiracao_s
+        with self.lock:
+            inativas = [id_sessao for id_sessao, sessao in self.sessoes.items() if sessao.ultimo_acesso < limite]
+            for id_sessao in inativas:
+                del self.sessoes[id_sessao]
+        return len(inativas)
+
+def formatar_evento_sse(evento, tipo='predicao'):
+    """Evento no formato Server-Sent Events"""
+    return f"event: {tipo}\ndata: {json.dumps(evento)}\n\n"
+
+def ler_amostras_texto(blocos_bytes):
+    """
+    Converte um fluxo de blocos de bytes (números separados por espaço, vírgula ou
+    quebra de linha) em arrays de amostras, emendando números cortados entre blocos
+
+    Tokens que não são números são ignorados, como no upload de arquivos .txt.
+    """
+    resto = b''
+    for bloco in blocos_bytes:
+        texto = (resto + bloco).replace(b',', b' ')
+        tokens = texto.split()
+        # O último token pode continuar no próximo bloco
+        if tokens and not texto[-1:].isspace():
+            resto = tokens.pop()
+        else:
+            resto = b''
+        yield _converter_tokens(tokens)
+    if resto:
+        yield _converter_tokens([resto])
+
+def _converter_tokens(tokens):
+    valores = []
+    for token in tokens:
+        try:
+            valores.append(float(token))
+        except ValueError:
+            continue
+    return np.array(valores, dtype=config.PIPELINE_DTYPE)
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Medidas de complexidade para sinais EEG
+
+- Complexidade de Lempel-Ziv (LZ76) sobre a sequência binária da dinâmica simbólica,
+  com as frases de todas as épocas resolvidas juntas
+- Entropia de permutação com códigos ordinais vetorizados
+- Entropia amostral com contagem de vizinhos em KD-tree (sem laços O(n²)) e, em
+  lote para épocas curtas, com contagem vetorizada por defasagem
+
+Benchmark: python benchmark_complexidade.py
+"""
+
+import math
+import numpy as np
+from scipy.spatial import cKDTree
+from config import config
+
+# Nomes das features de complexidade usadas pelo EEGClassifier
+NOMES_FEATURES_COMPLEXIDADE = [
+    'complexidade_lz',
+    'entropia_permutacao',
+    'entropia_amostral'
+]
+
+# Orçamento do laço vetorizado do LZ76 (elementos processados por amostra); frases
+# mais longas do que o laço alcança são resolvidas com busca em bytes
+LZ_ORCAMENTO_VETORIZADO = 64
+
+# Em linhas de até LZ_LINHA_CURTA amostras o laço vetorizado para no nível
+# LZ_NIVEIS_POR_BIT * log2(n); as frases mais longas seguem pela busca em bytes
+LZ_LINHA_CURTA = 4096
+LZ_NIVEIS_POR_BIT = 2
+
+# Entropia amostral em lote: contagem por defasagem até SAMPEN_LOTE_MAX_MODELOS modelos
+# por linha (o custo cresce com o quadrado do comprimento), em blocos de linhas com
+# cerca de SAMPEN_ELEMENTOS_BLOCO amostras
+SAMPEN_LOTE_MAX_MODELOS = 2048
+SAMPEN_ELEMENTOS_BLOCO = 1 << 16
+
+def _para_bits(sequencia):
+    """Converte uma sequência binária ('0'/'1', bool ou 0/1) em um array uint8"""
+    if isinstance(sequencia, str):
+        return (np.frombuffer(sequencia.encode('ascii'), dtype=np.uint8) == ord('1')).astype(np.uint8)
+    sequencia = np.asarray(sequencia)
+    if sequencia.dtype.kind in ('U', 'S', 'O'):
+        return (sequencia.astype(str) == '1').astype(np.uint8)
+    return (sequencia != 0).astype(np.uint8)
+
+def _comprimento_frase_longa(texto, inicio, minimo):
+    """
+    Comprimento da frase LZ76 que começa em `inicio` quando ela tem mais de `minimo` bits
+
+    Usa busca exponencial + binária: se texto[inicio:inicio+L] aparece antes, qualquer
+    prefixo menor também aparece, então a propriedade é monotônica em L.
+    """
+    n = len(texto)
+    restante = n - inicio
+
+    def ocorre(comprimento):
+        return texto.find(texto[inicio:inicio + comprimento], 0, inicio + comprimento - 1) != -1
+
+    baixo = minimo
+    alto = minimo * 2
+    while alto < restante and ocorre(alto):
+        baixo = alto
+        alto *= 2
+    if alto >= restante:
+        alto = restante
+        if ocorre(alto):
+            return restante  # Última frase: vai até o fim da sequência
+
+    while alto - baixo > 1:
+        meio = (baixo + alto) // 2
+        if ocorre(meio):
+            baixo = meio
+        else:
+            alto = meio
+    return alto
+
+def complexidade_lempel_ziv_lote(binario, normalizar=True):
+    """
+    Complexidade de Lempel-Ziv (LZ76, esquema de Kaspar-Schuster) de cada linha de uma
+    matriz binária (n_linhas, n_amostras)
+
+    A frase que começa em i tem o menor comprimento l em que a janela de l bits
+    iniciada em i ainda não apareceu antes na mesma linha. Os comprimentos são
+    resolvidos para todas as posições de todas as linhas ao mesmo tempo, um l por
+    vez: cada janela é identificada pelo grupo da janela de l-1 bits mais o próximo
+    bit (o grupo inicial é a própria linha, então janelas de linhas diferentes nunca
+    se confundem), a primeira aparição de cada grupo vem de np.minimum.at sobre a
+    ordem das posições e só continuam ativas as posições cujo grupo tem mais de um
+    membro, as únicas que ainda podem se repetir. A leitura das frases avança em
+    todas as linhas a cada l, e as linhas já lidas até o fim saem do laço.
+
+    É o mesmo empacotamento incremental de contar_palavras_lote (grupo * base + bit),
+    só que sem tamanho fixo: as frases do LZ76 têm comprimento variável, então as
+    palavras de m bits da dinâmica simbólica não bastam para identificá-las.
+
+    Args:
+        binario (np.array): Matriz (n_linhas, n_amostras) de bits (bool ou 0/1)
+        normalizar (bool): Se True, retorna c(n) * log2(n) / n
+
+    Returns:
+        np.array: Complexidade de cada linha (número de frases ou valor normalizado)
+    """
+    bits = np.atleast_2d(np.asarray(binario)) != 0
+    n_linhas, n = bits.shape
+    frases = np.zeros(n_linhas, dtype=np.int64)
+    if n_linhas == 0 or n == 0:
+        return frases.astype(np.float64)
+
+    # Cada linha termina com um separador (2): a janela que o alcança é única na linha,
+    # o que fecha a última frase sem tratamento especial
+    passo_linha = n + 1
+    simbolos = np.full((n_linhas, passo_linha), 2, dtype=np.uint8)
+    simbolos[:, :n] = bits
+    simbolos = simbolos.ravel()
+    comprimento = np.zeros(n_linhas * passo_linha, dtype=np.int64)
+    ativos = (np.arange(n_linhas, dtype=np.int64)[:, None] * passo_linha + np.arange(n)).ravel()
+    grupos = ativos // passo_linha
+    posicao = np.arange(n_linhas, dtype=np.int64) * passo_linha  # Início da próxima frase de cada linha
+    fim = posicao + n
+    lendo = np.arange(n_linhas)
+    orcamento = LZ_ORCAMENTO_VETORIZADO * n_linhas * n
+    l = 0
+
+    n_grupos = n_linhas
+    while len(ativos) and orcamento > 0:
+        l += 1
+        chaves = grupos * 3 + simbolos[ativos + l - 1]
+        ordem = np.arange(len(chaves))
+        primeiro = np.full(n_grupos * 3, len(chaves))
+        np.minimum.at(primeiro, chaves, ordem)
+        ineditas = ativos[primeiro[chaves] == ordem]
+        comprimento[ineditas[comprimento[ineditas] == 0]] = l
+        orcamento -= len(ativos)
+
+        # Próximo nível: só os grupos com mais de um membro, renumerados de 0 a n_grupos - 1
+        contagens = np.bincount(chaves, minlength=n_grupos * 3)
+        repetidos = contagens >= 2
+        n_grupos = int(np.count_nonzero(repetidos))
+        novos_grupos = np.cumsum(repetidos) - 1
+        manter = repetidos[chaves]
+        ativos, grupos = ativos[manter], novos_grupos[chaves[manter]]
+
+        # Avança a leitura enquanto as frases já estão resolvidas
+        while len(lendo):
+            passo = comprimento[posicao[lendo]]
+            if not passo.any():
+                break
+            avancam = lendo[passo > 0]
+            posicao[avancam] = np.minimum(posicao[avancam] + passo[passo > 0], fim[avancam])
+            frases[avancam] += 1
+            lendo = lendo[posicao[lendo] < fim[lendo]]
+
+        # Linhas lidas até o fim não precisam mais das suas janelas
+        if len(ativos) and len(lendo) < n_linhas:
+            abertas = posicao[ativos // passo_linha] < fim[ativos // passo_linha]
+            ativos, grupos = ativos[abertas], grupos[abertas]
+
+        # Em linhas curtas (épocas), frases bem mais longas que log2(n) são poucas e a
+        # busca em bytes as resolve mais barato do que manter as janelas longas ativas
+        if n <= LZ_LINHA_CURTA and l >= LZ_NIVEIS_POR_BIT * math.log2(n):
+            break
+
+    # Frases mais longas do que o laço alcançou: busca em bytes, linha a linha
+    for linha in lendo:
+        inicio = linha * passo_linha
+        texto = simbolos[inicio:inicio + n].tobytes()
+        atual = posicao[linha] - inicio
+        while atual < n:
+            if comprimento[inicio + atual]:
+                passo = min(comprimento[inicio + atual], n - atual)
+            elif atual + l >= n:
+                passo = n - atual
+            else:
+                passo = _comprimento_frase_longa(texto, atual, max(l, 1))
+            atual += passo
+            frases[linha] += 1
+
+    if not normalizar:
+        return frases.astype(np.float64)
+    if n < 2:
+        return np.zeros(n_linhas)
+    return frases * np.log2(n) / n
+
+def complexidade_lempel_ziv(sequencia, normalizar=True):
+    """
+    Complexidade de Lempel-Ziv (LZ76) de uma sequência (ver complexidade_lempel_ziv_lote)
+
+    Args:
+        sequencia: Sequência binária ('0'/'1', bool ou 0/1)
+        normalizar (bool): Se True, retorna c(n) * log2(n) / n
+
+    Returns:
+        float: Complexidade (número de frases ou valor normalizado)
+    """
+    return float(complexidade_lempel_ziv_lote(_para_bits(sequencia)[None, :], normalizar)[0])
+
+def entropia_permutacao_lote(matriz, ordem=3, atraso=1, normalizar=True):
+    """
+    Entropia de permutação de cada linha de uma matriz (n_linhas, n_amostras)
+
+    O padrão ordinal de cada janela é codificado pelo código de Lehmer (quantos
+    elementos à direita são menores), calculado com ordem² comparações vetorizadas.
+    """
+    matriz = np.atleast_2d(matriz)
+    n_linhas, n = matriz.shape
+    extensao = (ordem - 1) * atraso + 1
+    n_padroes = n - extensao + 1
+    if n_linhas == 0 or n_padroes <= 0:
+        return np.zeros(n_linhas)
+
+    janelas = np.lib.stride_tricks.sliding_window_view(matriz, extensao, axis=1)[:, :, ::atraso]
+    codigos = np.zeros((n_linhas, n_padroes), dtype=np.int64)
+    for i in range(ordem):
+        menores = np.zeros((n_linhas, n_padroes), dtype=np.int64)
+        for j in range(i + 1, ordem):
+            menores += janelas[:, :, j] < janelas[:, :, i]
+        codigos = codigos * (ordem - i) + menores
+
+    n_simbolos = math.factorial(ordem)
+    deslocamento = (np.arange(n_linhas, dtype=np.int64) * n_simbolos)[:, None]
+    contagens = np.bincount((codigos + deslocamento).ravel(), minlength=n_linhas * n_simbolos)
+    probabilidades = contagens.reshape(n_linhas, n_simbolos) / n_padroes
+    termos = np.where(probabilidades > 0, probabilidades * np.log(np.where(probabilidades > 0, probabilidades, 1.0)), 0.0)
+    entropia = -termos.sum(axis=1)
+    if normalizar:
+        entropia = entropia / np.log(n_simbolos)
+    return entropia
+
+def entropia_permutacao(valores, ordem=3, atraso=1, normalizar=True):
+    """Entropia de permutação (Bandt-Pompe) de um sinal, normalizada entre 0 e 1 por padrão"""
+    valores = np.asarray(valores, dtype=np.float64)
+    return float(entropia_permutacao_lote(valores[None, :], ordem, atraso, normalizar)[0])
+
+def _agrupar_modelos(valores, comprimento, n_modelos):
+    """
+    Modelos de um comprimento e o peso (repetições) de cada um
+
+    Sinais quantizados (valores inteiros do conversor A/D) repetem muitos modelos
+    idênticos, o que degrada a KD-tree; nesse caso cada modelo distinto entra uma
+    única vez com o número de repetições como peso.
+    """
+    modelos = np.lib.stride_tricks.sliding_window_view(valores, comprimento)[:n_modelos]
+    distintos, postos = np.unique(valores, return_inverse=True)
+    n_distintos = len(distintos)
+    if n_distintos > n_modelos // 2 or comprimento * math.log2(max(n_distintos, 2)) >= 62:
+        return modelos, None
+
+    codigos = np.zeros(n_modelos, dtype=np.int64)
+    for j in range(comprimento):
+        codigos = codigos * n_distintos + postos[j:j + n_modelos]
+    _, primeiros, repeticoes = np.unique(codigos, return_index=True, return_counts=True)
+    return modelos[primeiros], repeticoes.astype(np.float64)
+
+def _contar_pares_semelhantes(valores, comprimento, n_modelos, tolerancia, referencias=None):
+    """
+    Pares de modelos com distância de Chebyshev <= tolerância, contados na KD-tree
+
+    Sem referências conta os pares (i < j) de todos os modelos; com referências
+    (índices de um subconjunto) conta os pares (referência, qualquer outro modelo).
+    """
+    modelos, pesos = _agrupar_modelos(valores, comprimento, n_modelos)
+    arvore = cKDTree(modelos)
+    if referencias is None:
+        total = arvore.count_neighbors(arvore, tolerancia, p=np.inf, weights=(pesos, pesos))
+        return (int(round(total)) - n_modelos) // 2  # Remove os pares (i, i) e a contagem dupla
+
+    modelos_referencia = np.lib.stride_tricks.sliding_window_view(valores, comprimento)[referencias]
+    arvore_referencias = cKDTree(modelos_referencia)
+    total = arvore_referencias.count_neighbors(arvore, tolerancia, p=np.inf, weights=(None, pesos))
+    return int(round(total)) - len(referencias)  # Remove os pares (i, i)
+
+def entropia_amostral(valores, m=None, r=None, tolerancia=None, max_exato=None, n_referencias=None):
+    """
+    Entropia amostral (Richman & Moorman)
+
+    Até max_exato modelos, conta todos os pares. Em sinais mais longos, conta os
+    pares entre n_referencias modelos igualmente espaçados e todos os demais, o que
+    mantém o custo proporcional ao comprimento do sinal.
+
+    Args:
+        valores (np.array): Sinal
+        m (int): Comprimento dos modelos (padrão: config.SAMPEN_M)
+        r (float): Tolerância como fração do desvio padrão (padrão: config.SAMPEN_R)
+        tolerancia (float): Tolerância absoluta (se fornecida, ignora r)
+        max_exato (int): Máximo de modelos para o cálculo exato (padrão: config.SAMPEN_EXACT_MAX_TEMPLATES; 0 = sempre exato)
+        n_referencias (int): Modelos de referência nos sinais longos (padrão: config.SAMPEN_REFERENCE_TEMPLATES)
+
+    Returns:
+        float: -ln(A/B); quando não há pares de comprimento m+1, retorna o limite
+        superior ln((N-m)(N-m-1)/2) em vez de infinito
+    """
+    m = config.SAMPEN_M if m is None else m
+    r = config.SAMPEN_R if r is None else r
+    max_exato = config.SAMPEN_EXACT_MAX_TEMPLATES if max_exato is None else max_exato
+    n_referencias = config.SAMPEN_REFERENCE_TEMPLATES if n_referencias is None else n_referencias
+
+    valores = np.asarray(valores, dtype=np.float64)
+    n = len(valores)
+    if n <= m + 1:
+        return 0.0
+
+    tolerancia = r * np.std(valores) if tolerancia is None else tolerancia
+    if tolerancia <= 0:
+        return 0.0
+
+    # Mesmos N-m pontos de partida para os comprimentos m e m+1
+    n_modelos = n - m
+    referencias = None
+    if max_exato and n_referencias and n_modelos > max_exato:
+        referencias = np.unique(np.linspace(0, n_modelos - 1, n_referencias).astype(np.int64))
+
+    b = _contar_pares_semelhantes(valores, m, n_modelos, tolerancia, referencias)
+    a = _contar_pares_semelhantes(valores, m + 1, n_modelos, tolerancia, referencias)
+    if a == 0 or b == 0:
+        return float(np.log((n - m) * (n - m - 1) / 2))
+    return float(-np.log(a / b))
+
+def entropia_amostral_lote(matriz, m=None, r=None, tolerancias=None):
+    """
+    Entropia amostral de cada linha de uma matriz (n_linhas, n_amostras)
+
+    Em linhas curtas (épocas) os pares de modelos são contados por defasagem: para
+    cada k, |x[i] - x[i+k]| <= tolerância é calculado de uma vez em todas as linhas
+    de um bloco, e os pares de comprimento m e m+1 são os trechos de m e m+1
+    comparações consecutivas verdadeiras. O resultado é o mesmo do cálculo exato de
+    entropia_amostral; linhas com mais de SAMPEN_LOTE_MAX_MODELOS modelos (ou acima
+    do limite exato) usam entropia_amostral linha a linha.
+
+    Args:
+        matriz (np.array): Sinais de mesmo comprimento, um por linha
+        m (int): Comprimento dos modelos (padrão: config.SAMPEN_M)
+        r (float): Tolerância como fração do desvio padrão de cada linha (padrão: config.SAMPEN_R)
+        tolerancias (np.array): Tolerância absoluta de cada linha (se fornecida, ignora r)
+
+    Returns:
+        np.array: Entropia de cada linha, com as mesmas convenções de entropia_amostral
+    """
+    m = config.SAMPEN_M if m is None else m
+    r = config.SAMPEN_R if r is None else r
+    matriz = np.atleast_2d(np.asarray(matriz, dtype=np.float64))
+    n_linhas, n = matriz.shape
+    if n_linhas == 0 or n <= m + 1:
+        return np.zeros(n_linhas)
+
+    if tolerancias is None:
+        tolerancias = r * matriz.std(axis=1)
+    tolerancias = np.broadcast_to(np.asarray(tolerancias, dtype=np.float64), (n_linhas,))
+
+    n_modelos = n - m
+    max_exato = config.SAMPEN_EXACT_MAX_TEMPLATES
+    if n_modelos > SAMPEN_LOTE_MAX_MODELOS or (max_exato and n_modelos > max_exato):
+        return np.array([entropia_amostral(linha, m, tolerancia=tolerancia)
+                         for linha, tolerancia in zip(matriz, tolerancias)])
+
+    pares_m = np.zeros(n_linhas, dtype=np.int64)
+    pares_m1 = np.zeros(n_linhas, dtype=np.int64)
+    linhas_bloco = max(1, SAMPEN_ELEMENTOS_BLOCO // n)
+    for inicio in range(0, n_linhas, linhas_bloco):
+        bloco = matriz[inicio:inicio + linhas_bloco]
+        tolerancia = tolerancias[inicio:inicio + linhas_bloco, None]
+        for k in range(1, n_modelos):
+            # Pares (i, i + k) com i + k < N - m: os mesmos pontos de partida para m e m+1
+            n_pares = n_modelos - k
+            proximos = np.abs(bloco[:, :n - k] - bloco[:, k:]) <= tolerancia
+            semelhantes = proximos[:, :n_pares]
+            for j in range(1, m):
+                semelhantes = semelhantes & proximos[:, j:j + n_pares]
+            pares_m[inicio:inicio + linhas_bloco] += np.count_nonzero(semelhantes, axis=1)
+            pares_m1[inicio:inicio + linhas_bloco] += np.count_nonzero(semelhantes & proximos[:, m:m + n_pares], axis=1)
+
+    limite = np.log(n_modelos * (n_modelos - 1) / 2)
+    com_pares = (pares_m > 0) & (pares_m1 > 0)
+    entropias = np.where(com_pares, -np.log(np.where(com_pares, pares_m1, 1) / np.maximum(pares_m, 1)), limite)
+    return np.where(tolerancias > 0, entropias, 0.0)
+
+def calcular_features_complexidade(valores, sequencia_binaria=None):
+    """
+    Calcula as features de complexidade de um sinal
+
+    Args:
+        valores (np.array): Valores brutos do sinal
+        sequencia_binaria: Sequência binária já calculada (padrão: valores >= média)
+
+    Returns:
+        dict: Features na ordem de NOMES_FEATURES_COMPLEXIDADE
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if sequencia_binaria is None:
+        sequencia_binaria = valores >= valores.mean(dtype=np.float64)
+
+    return {
+        'complexidade_lz': complexidade_lempel_ziv(sequencia_binaria),
+        'entropia_permutacao': entropia_permutacao(valores, config.PERMUTATION_ORDER),
+        'entropia_amostral': entropia_amostral(valores)
+    }
@@ -29,12 +29,114 @@ class Config:
     
     # Configurações do Modelo ML
     MODEL_PATH = os.getenv('MODEL_PATH', 'modelo_eeg.pkl')
+    PREDICTION_CACHE_PATH = os.getenv('PREDICTION_CACHE_PATH', 'cache_predicoes.pkl')
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+    INFERENCE_BATCH_WINDOW_MS = float(os.getenv('INFERENCE_BATCH_WINDOW_MS', '5'))
+    INFERENCE_BATCH_MAX_ITEMS = int(os.getenv('INFERENCE_BATCH_MAX_ITEMS', '64'))
     MODEL_TYPE = os.getenv('MODEL_TYPE', 'random_forest')
+    DATASET_CACHE_DIR = os.getenv('DATASET_CACHE_DIR', 'cache_datasets')
+    DATASET_CACHE_MAX_FILES = int(os.getenv('DATASET_CACHE_MAX_FILES', '5'))
+    TRAINING_PROCESSES = int(os.getenv('TRAINING_PROCESSES', '0'))
+    TRAINING_THREADS_PER_PROCESS = int(os.getenv('TRAINING_THREADS_PER_PROCESS', '0'))
+    
+    # Configurações do Random Forest Incremental
+    RF_INCREMENTAL = os.getenv('RF_INCREMENTAL', 'True').lower() == 'true'
+    RF_INCREMENT_TREES = int(os.getenv('RF_INCREMENT_TREES', '20'))
+    RF_MAX_TREES = int(os.getenv('RF_MAX_TREES', '200'))
+    RF_RECENT_WINDOW = int(os.getenv('RF_RECENT_WINDOW', '200'))
+    RF_HOLDOUT_FRACTION = float(os.getenv('RF_HOLDOUT_FRACTION', '0.2'))
+    RF_FALLBACK_TOLERANCE = float(os.getenv('RF_FALLBACK_TOLERANCE', '0.05'))
+    
+    # Configurações da Busca de Hiperparâmetros
+    HYPERPARAMS_PATH = os.getenv('HYPERPARAMS_PATH', 'hiperparametros.json')
+    HYPERPARAM_CONFIGS = int(os.getenv('HYPERPARAM_CONFIGS', '9'))
+    HYPERPARAM_ETA = int(os.getenv('HYPERPARAM_ETA', '3'))
+    HYPERPARAM_MIN_BUDGET = float(os.getenv('HYPERPARAM_MIN_BUDGET', '0.111'))
+    HYPERPARAM_PROCESSES = int(os.getenv('HYPERPARAM_PROCESSES', '0'))
+    HYPERPARAM_MAX_EPOCHS = int(os.getenv('HYPERPARAM_MAX_EPOCHS', '200'))
+    
+    # Configurações da Validação Cruzada
+    CV_FOLDS = int(os.getenv('CV_FOLDS', '5'))
+    CV_REPEATS = int(os.getenv('CV_REPEATS', '2'))
+    CV_PROCESSES = int(os.getenv('CV_PROCESSES', '0'))
+    CV_CACHE_DIR = os.getenv('CV_CACHE_DIR', 'cache_validacao')
+    CV_CACHE_MAX_FILES = int(os.getenv('CV_CACHE_MAX_FILES', '200'))
+    CV_RESULTS_PATH = os.getenv('CV_RESULTS_PATH', 'validacao_cruzada.json')
+    
+    # Configurações da Fila de Tarefas Assíncronas
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_MAX_QUEUE = int(os.getenv('JOB_MAX_QUEUE', '32'))
+    JOB_RESULT_TTL_S = float(os.getenv('JOB_RESULT_TTL_S', '300'))
+    
+    # Configurações da Cascata de Inferência
+    CASCADE_BAND = float(os.getenv('CASCADE_BAND', '0.2'))
+    CASCADE_COMBINATION = os.getenv('CASCADE_COMBINATION', 'media')
+    CASCADE_TUNING_TOLERANCE = float(os.getenv('CASCADE_TUNING_TOLERANCE', '0.01'))
+    CASCADE_THRESHOLDS_PATH = os.getenv('CASCADE_THRESHOLDS_PATH', 'limiares_cascata.json')
+    
+    # Configurações do Aprendizado Online
+    ONLINE_LEARNING = os.getenv('ONLINE_LEARNING', 'True').lower() == 'true'
+    ONLINE_MODEL_TYPE = os.getenv('ONLINE_MODEL_TYPE', 'sgd')
+    ONLINE_MODEL_PATH = os.getenv('ONLINE_MODEL_PATH', 'modelo_online.pkl')
+    ONLINE_RETRAIN_EVERY = int(os.getenv('ONLINE_RETRAIN_EVERY', '50'))
+    ONLINE_DRIFT_WINDOW = int(os.getenv('ONLINE_DRIFT_WINDOW', '30'))
+    ONLINE_DRIFT_THRESHOLD = float(os.getenv('ONLINE_DRIFT_THRESHOLD', '0.15'))
     
     # Configurações de Dinâmica Simbólica
     SYMBOLIC_M = int(os.getenv('SYMBOLIC_M', '3'))
     SYMBOLIC_WINDOW_SIZE = int(os.getenv('SYMBOLIC_WINDOW_SIZE', '3'))
     
+    # Configurações Numéricas (dtype de sinais, features, scaler e entradas Keras)
+    PIPELINE_DTYPE = os.getenv('PIPELINE_DTYPE', 'float32')
+    
+    # Configurações do Pipeline tf.data (treino e avaliação Keras)
+    KERAS_BATCH_SIZE = int(os.getenv('KERAS_BATCH_SIZE', '8'))
+    TFDATA_SHUFFLE_BUFFER = int(os.getenv('TFDATA_SHUFFLE_BUFFER', '1024'))
+    TFDATA_READ_BLOCK = int(os.getenv('TFDATA_READ_BLOCK', '4096'))
+    TFDATA_CACHE = os.getenv('TFDATA_CACHE', '')
+    
+    # Configurações da CNN em Sinais Brutos ('cnn_bruto')
+    RAW_WINDOW_SIZE = int(os.getenv('RAW_WINDOW_SIZE', os.getenv('EPOCH_SIZE', '512')))
+    RAW_WINDOW_OVERLAP = float(os.getenv('RAW_WINDOW_OVERLAP', '0.5'))
+    RAW_BATCH_SIZE = int(os.getenv('RAW_BATCH_SIZE', '32'))
+    RAW_STORE_DIR = os.getenv('RAW_STORE_DIR', 'armazem_sinais')
+    RAW_MODEL_PATH = os.getenv('RAW_MODEL_PATH', 'modelo_cnn_bruto.pkl')
+    
+    # Configurações da Destilação (ensemble Keras -> estudante)
+    DISTILL_TEACHERS = os.getenv('DISTILL_TEACHERS', 'modelo_mlp_tabular.pkl,modelo_cnn.pkl,modelo_lstm.pkl,modelo_hybrid.pkl')
+    DISTILL_BLOCK = int(os.getenv('DISTILL_BLOCK', '200'))
+    DISTILL_TEST_FRACTION = float(os.getenv('DISTILL_TEST_FRACTION', '0.2'))
+    DISTILL_MODEL_PATH = os.getenv('DISTILL_MODEL_PATH', 'modelo_estudante.pkl')
+    DISTILL_REPORT_PATH = os.getenv('DISTILL_REPORT_PATH', 'destilacao.json')
+    
+    # Configurações do Perfil de Treinamento (telemetria em /status_retreinamento)
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'perfis_treino')
+    PROFILE_MAX_RUNS = int(os.getenv('PROFILE_MAX_RUNS', '50'))
+    
+    # Configurações de Épocas (sinais longos)
+    EPOCH_SIZE = int(os.getenv('EPOCH_SIZE', '512'))
+    EPOCH_OVERLAP = float(os.getenv('EPOCH_OVERLAP', '0.5'))
+    
+    # Configurações da Triagem de Qualidade
+    QUALITY_MIN_SAMPLES = int(os.getenv('QUALITY_MIN_SAMPLES', '256'))
+    QUALITY_MAX_FLAT_RUN = int(os.getenv('QUALITY_MAX_FLAT_RUN', '64'))
+    QUALITY_MAX_CLIP_FRACTION = float(os.getenv('QUALITY_MAX_CLIP_FRACTION', '0.05'))
+    
+    # Configurações da Classificação Contínua (streaming)
+    STREAM_WINDOW = int(os.getenv('STREAM_WINDOW', os.getenv('EPOCH_SIZE', '512')))
+    STREAM_HOP = int(os.getenv('STREAM_HOP', '128'))
+    STREAM_MAX_SESSIONS = int(os.getenv('STREAM_MAX_SESSIONS', '16'))
+    STREAM_SESSION_TTL_S = float(os.getenv('STREAM_SESSION_TTL_S', '300'))
+    
+    # Configurações das Medidas de Complexidade
+    PERMUTATION_ORDER = int(os.getenv('PERMUTATION_ORDER', '3'))
+    SAMPEN_M = int(os.getenv('SAMPEN_M', '2'))
+    SAMPEN_R = float(os.getenv('SAMPEN_R', '0.2'))
+    SAMPEN_EXACT_MAX_TEMPLATES = int(os.getenv('SAMPEN_EXACT_MAX_TEMPLATES', '20000'))
+    SAMPEN_REFERENCE_TEMPLATES = int(os.getenv('SAMPEN_REFERENCE_TEMPLATES', '1000'))
+    MSE_SCALES = int(os.getenv('MSE_SCALES', '5'))
+    MSE_METHOD = os.getenv('MSE_METHOD', 'simbolica')
+    
     # Configurações de Gráficos
     PLOT_WIDTH = int(os.getenv('PLOT_WIDTH', '12'))
     PLOT_HEIGHT = int(os.getenv('PLOT_HEIGHT', '6'))
@@ -62,6 +164,7 @@ class Config:
         print(f"🐛 Debug: {cls.FLASK_DEBUG}")
         print(f"📁 Modelo: {cls.MODEL_PATH}")
         print(f"🧮 Dinâmica Simbólica (m): {cls.SYMBOLIC_M}")
+        print(f"🔢 Dtype do Pipeline: {cls.PIPELINE_DTYPE}")
         print(f"📊 Tamanho Upload: {cls.MAX_CONTENT_LENGTH} bytes")
         print("=" * 50)
 
@@ -1,5 +1,6 @@
 import psycopg2
 from config import config
+from qualidade_sinal import garantir_coluna_qualidade
 
 def criar_banco():
     conn = psycopg2.connect(**config.get_db_connection_string())
@@ -23,6 +24,9 @@ def criar_banco():
     )
     """)
 
+    # Flags da triagem de qualidade (NULL = ainda não avaliado, 0 = válido)
+    garantir_coluna_qualidade(cursor)
+
     # Criação da tabela de valores dos sinais
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS valores_sinais (
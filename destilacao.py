@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Destilação do ensemble Keras em um modelo estudante rápido
+
+Os modelos Keras salvos (professores) rotulam todo o arquivo de sinais com a média
+das probabilidades; as features são extraídas uma vez por bloco de sinais e
+compartilhadas pelos professores. O estudante ('estudante': Random Forest raso,
+servido pela floresta compilada) aprende essas probabilidades suaves: cada sinal
+entra duas vezes, como positivo com peso p e como negativo com peso 1 - p, o que
+equivale a minimizar a entropia cruzada contra o alvo suave.
+
+O relatório compara estudante e professor nos sinais reservados: concordância das
+classes, erro absoluto médio das probabilidades, acurácia nos sinais rotulados e
+latência por sinal. Ele é gravado em config.DISTILL_REPORT_PATH e o estudante em
+config.DISTILL_MODEL_PATH.
+
+Uso: python destilacao.py
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+import numpy as np
+from ml_classifier import EEGClassifier, extrair_features_modelos, colunas_modelo
+from floresta_incremental import em_holdout
+from config import config
+
+def carregar_professores(caminhos=None):
+    """
+    Carrega os modelos Keras salvos que existirem entre os caminhos
+
+    Returns:
+        dict: {caminho: EEGClassifier}
+    """
+    caminhos = caminhos or [caminho.strip() for caminho in config.DISTILL_TEACHERS.split(',') if caminho.strip()]
+    professores = {}
+    for caminho in caminhos:
+        if not os.path.exists(caminho):
+            print(f"⚠️ Professor não encontrado: {caminho}")
+            continue
+        modelo = EEGClassifier()
+        if not modelo.carregar_modelo(caminho):
+            continue
+        if modelo.tipo_modelo_keras is None or modelo.usa_sinal_bruto:
+            print(f"⚠️ {caminho} não é um modelo Keras de features, fora do ensemble")
+            continue
+        professores[caminho] = modelo
+    return professores
+
+def listar_arquivo(classificador):
+    """
+    Todos os sinais aprovados na triagem, com a categoria real quando conhecida
+
+    Returns:
+        tuple: (ids dos sinais, rótulos 1/0 ou -1 sem categoria)
+    """
+    conexao = classificador.obter_conexao_db()
+    cursor = conexao.cursor()
+    cursor.execute("""
+        SELECT s.id, u.possui
+        FROM sinais s
+        LEFT JOIN usuarios u ON s.idusuario = u.id
+        WHERE COALESCE(s.flags_qualidade, 0) = 0
+        ORDER BY s.id
+    """)
+    linhas = cursor.fetchall()
+    cursor.close()
+    conexao.close()
+    ids = np.array([id_sinal for id_sinal, _ in linhas], dtype=np.int64)
+    rotulos = np.array([1 if possui == 'S' else 0 if possui == 'N' else -1 for _, possui in linhas], dtype=np.int64)
+    return ids, rotulos
+
+def rotular_com_professores(professores, ids_sinais, obter_valores, tamanho_bloco=None, log=print):
+    """
+    Probabilidades de cada professor para os sinais, em blocos
+
+    Args:
+        professores (dict): {nome: EEGClassifier}
+        obter_valores (callable): Recebe uma lista de IDs e retorna {id_sinal: valores}
+
+    Returns:
+        tuple: (nomes das features, IDs válidos, X (n, n_features), probabilidades (n, n_professores))
+    """
+    tamanho_bloco = tamanho_bloco or config.DISTILL_BLOCK
+    modelos = list(professores.values())
+    nomes, ids_validos, blocos_X, blocos_p = None, [], [], []
+    for inicio in range(0, len(ids_sinais), tamanho_bloco):
+        ids_bloco = [int(id_sinal) for id_sinal in ids_sinais[inicio:inicio + tamanho_bloco]]
+        nomes, ids_bloco, X = extrair_features_modelos(modelos, ids_bloco, obter_valores(ids_bloco))
+        if len(ids_bloco) == 0:
+            continue
+        blocos_p.append(np.column_stack([modelo.prever_matriz(X[:, colunas_modelo(nomes, modelo)])
+                                         for modelo in modelos]))
+        blocos_X.append(X)
+        ids_validos.extend(ids_bloco)
+        log(f"🏷️ {min(inicio + tamanho_bloco, len(ids_sinais))}/{len(ids_sinais)} sinais rotulados pelo ensemble")
+
+    if not blocos_X:
+        return nomes, np.empty(0, dtype=np.int64), None, None
+    return nomes, np.array(ids_validos, dtype=np.int64), np.concatenate(blocos_X), np.concatenate(blocos_p)
+
+def relatorio_concordancia(p_professor, p_estudante, rotulos=None):
+    """
+    Compara as probabilidades do estudante com as do professor
+
+    Args:
+        rotulos (np.array): Categoria real (1/0, -1 sem categoria), para a acurácia de cada um
+
+    Returns:
+        dict: Concordância das classes, erro absoluto médio, correlação e acurácias
+    """
+    p_professor, p_estudante = np.asarray(p_professor, dtype=float), np.asarray(p_estudante, dtype=float)
+    relatorio = {
+        'amostras': int(len(p_professor)),
+        'concordancia': float(np.mean((p_professor > 0.5) == (p_estudante > 0.5))),
+        'erro_absoluto_medio': float(np.mean(np.abs(p_professor - p_estudante))),
+        'correlacao': float(np.corrcoef(p_professor, p_estudante)[0, 1])
+                      if len(p_professor) > 1 and np.std(p_professor) > 0 and np.std(p_estudante) > 0 else None
+    }
+    if rotulos is not None:
+        rotulados = np.asarray(rotulos) >= 0
+        relatorio['rotulados'] = int(rotulados.sum())
+        if rotulados.any():
+            y = np.asarray(rotulos)[rotulados]
+            relatorio['acuracia_professor'] = float(np.mean((p_professor[rotulados] > 0.5) == y))
+            relatorio['acuracia_estudante'] = float(np.mean((p_estudante[rotulados] > 0.5) == y))
+    return relatorio
+
+def latencia_por_sinal(modelos, X, colunas, amostras=20):
+    """Mediana, em ms, de uma predição de um único sinal somando os modelos"""
+    tempos = []
+    for linha in X[:amostras]:
+        inicio = time.perf_counter()
+        for modelo, indices in zip(modelos, colunas):
+            modelo.prever_matriz(linha[np.newaxis, indices])
+        tempos.append((time.perf_counter() - inicio) * 1000.0)
+    return float(np.median(tempos)) if tempos else None
+
+def destilar(professores, ids_sinais, rotulos, obter_valores, hiperparametros=None, fracao_teste=None,
+             caminho_modelo=None, caminho_relatorio=None, log=print):
+    """
+    Rotula os sinais com o ensemble, treina o estudante e grava o modelo e o relatório
+
+    Returns:
+        dict: Relatório de concordância e latência, ou None sem dados
+    """
+    if not professores:
+        log("❌ Nenhum professor carregado para a destilação")
+        return None
+    inicio = time.time()
+    rotulos_por_id = dict(zip((int(id_sinal) for id_sinal in ids_sinais), (int(r) for r in rotulos)))
+    nomes, ids, X, p_cada = rotular_com_professores(professores, list(ids_sinais), obter_valores, log=log)
+    if X is None or len(X) < 4:
+        log("❌ Sinais insuficientes para a destilação")
+        return None
+    p_professor = p_cada.mean(axis=1)
+    rotulos_validos = np.array([rotulos_por_id.get(int(id_sinal), -1) for id_sinal in ids])
+
+    # Sinais reservados pelo hash do ID: o mesmo sinal fica sempre do mesmo lado
+    teste = em_holdout(ids, fracao_teste or config.DISTILL_TEST_FRACTION)
+    if teste.all() or not teste.any():
+        teste = np.arange(len(ids)) % 5 == 0
+    log(f"🎓 Treinando o estudante com {int((~teste).sum())} sinais ({int(teste.sum())} reservados)")
+
+    estudante = EEGClassifier()
+    estudante.criar_modelo('estudante', hiperparametros)
+    estudante.feature_names = list(nomes)
+    estudante.treinar_alvos_suaves(X[~teste], p_professor[~teste])
+    if not estudante.is_trained:
+        log("❌ Treino do estudante falhou")
+        return None
+    p_estudante = estudante.prever_matriz(X[teste])
+
+    modelos = list(professores.values())
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'professores': list(professores),
+        'sinais_rotulados_pelo_ensemble': int(len(ids)),
+        'feature_names': list(nomes),
+        'hiperparametros': estudante.hiperparametros,
+        **relatorio_concordancia(p_professor[teste], p_estudante, rotulos_validos[teste]),
+        'latencia_professor_ms': latencia_por_sinal(modelos, X[teste], [colunas_modelo(nomes, m) for m in modelos]),
+        'latencia_estudante_ms': latencia_por_sinal([estudante], X[teste], [list(range(len(nomes)))]),
+        'duracao_s': round(time.time() - inicio, 2)
+    }
+
+    caminho_modelo = caminho_modelo or config.DISTILL_MODEL_PATH
+    if not estudante.salvar_modelo(caminho_modelo):
+        log("❌ Erro ao salvar o estudante")
+        return None
+    relatorio['modelo'] = caminho_modelo
+    relatorio['versao'] = estudante.versao
+    salvar_relatorio(relatorio, caminho_relatorio)
+    log(f"✅ Estudante concorda com o ensemble em {relatorio['concordancia']:.1%} dos sinais reservados; "
+        f"latência {relatorio['latencia_estudante_ms']:.2f} ms vs {relatorio['latencia_professor_ms']:.2f} ms")
+    return relatorio
+
+def carregar_relatorio(caminho=None):
+    """Relatório da última destilação ({} se nunca houve)"""
+    caminho = caminho or config.DISTILL_REPORT_PATH
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Relatório de destilação ilegível em {caminho}: {e}")
+        return {}
+
+def salvar_relatorio(relatorio, caminho=None):
+    """Grava o relatório (escrita atômica)"""
+    caminho = caminho or config.DISTILL_REPORT_PATH
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+def destilar_do_banco(log=print, **kwargs):
+    """Destila os professores salvos usando todo o arquivo de sinais do banco"""
+    professores = carregar_professores()
+    classificador = EEGClassifier()
+    ids, rotulos = listar_arquivo(classificador)
+    log(f"📚 {len(ids)} sinais no arquivo, {len(professores)} professores")
+    return destilar(professores, ids, rotulos, classificador.obter_valores_sinais, log=log, **kwargs)
+
+if __name__ == "__main__":
+    destilar_do_banco()
@@ -20,6 +20,7 @@ import warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
 
 from config import config
+from complexidade import complexidade_lempel_ziv
 
 def obter_conexao_db():
     """Conecta ao banco de dados PostgreSQL"""
@@ -87,6 +88,49 @@ def calcular_entropia_shannon(frequencias):
         entropia_normalizada = 0.0
     return max(0.0, min(1.0, entropia_normalizada))
 
+def contar_palavras_lote(binario, m=3):
+    """
+    Conta as palavras binárias de tamanho m em cada linha de uma matriz de bits
+
+    Args:
+        binario (np.array): Matriz booleana (n_linhas, n_amostras)
+        m (int): Tamanho das palavras
+
+    Returns:
+        np.array: Contagens (n_linhas, 2**m) de cada palavra decimal
+    """
+    n_linhas, n_amostras = binario.shape
+    n_palavras = n_amostras - m + 1
+    n_simbolos = 2 ** m
+    if n_linhas == 0 or n_palavras <= 0:
+        return np.zeros((n_linhas, n_simbolos), dtype=np.int64)
+
+    # Código decimal de cada janela deslizante, bit mais significativo primeiro
+    palavras = np.zeros((n_linhas, n_palavras), dtype=np.int64)
+    for j in range(m):
+        palavras = (palavras << 1) | binario[:, j:j + n_palavras]
+
+    # Um único bincount para todas as linhas, deslocando cada linha em 2**m
+    deslocamento = (np.arange(n_linhas, dtype=np.int64) * n_simbolos)[:, None]
+    contagens = np.bincount((palavras + deslocamento).ravel(), minlength=n_linhas * n_simbolos)
+    return contagens.reshape(n_linhas, n_simbolos)
+
+def calcular_entropia_shannon_lote(frequencias):
+    """
+    Versão vetorizada de calcular_entropia_shannon para uma matriz (n_linhas, n_simbolos)
+    de frequências relativas, com as mesmas regras de filtragem e normalização
+    """
+    frequencias = np.asarray(frequencias, dtype=np.float64)
+    filtradas = np.where((frequencias > 0) & (frequencias < 1), frequencias, 0.0)
+    n_simbolos = np.count_nonzero(filtradas, axis=1)
+    soma = filtradas.sum(axis=1, keepdims=True)
+    probabilidades = np.divide(filtradas, soma, out=np.zeros_like(filtradas), where=soma > 0)
+    termos = np.where(probabilidades > 0, probabilidades * np.log(np.where(probabilidades > 0, probabilidades, 1.0)), 0.0)
+    entropia_bruta = -termos.sum(axis=1)
+    entropia_maxima = np.log(np.maximum(n_simbolos, 2))
+    entropia = np.where(n_simbolos > 1, entropia_bruta / entropia_maxima, 0.0)
+    return np.clip(entropia, 0.0, 1.0)
+
 def plotar_histograma(frequencias, nome_base):
     """Gera e salva o histograma com rótulos binários"""
     try:
@@ -180,6 +224,9 @@ def aplicar_dinamica_simbolica(id_sinal, m=3):
         
         # Calcula a entropia de Shannon
         entropia = calcular_entropia_shannon(frequencias)
+        
+        # Complexidade de Lempel-Ziv normalizada da sequência binária
+        complexidade = complexidade_lempel_ziv(sequencia_binaria)
 
         nome_base = f"sinal_{id_sinal}"
         
@@ -204,6 +251,7 @@ def aplicar_dinamica_simbolica(id_sinal, m=3):
             'palavras_decimais': palavras_decimais,
             'limiar': limiar,
             'entropia': entropia,
+            'complexidade': complexidade,
             'frequencias': frequencias
         }
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Entropia multiescala para sinais EEG
+
+Cada escala s substitui o sinal pelas médias de blocos consecutivos de s amostras
+(coarse graining). As médias saem de uma única soma acumulada por sinal, então cada
+escala custa O(n) sem laços sobre as amostras; a entropia simbólica de todas as
+linhas é calculada de uma vez com as funções em lote da dinâmica simbólica.
+"""
+
+import numpy as np
+from dinamica_simbolica import contar_palavras_lote, calcular_entropia_shannon_lote
+from complexidade import entropia_amostral_lote
+from config import config
+
+METODOS_MULTIESCALA = ('simbolica', 'amostral')
+
+def nomes_features_multiescala(n_escalas=None):
+    """Nomes das features de entropia multiescala (uma por escala)"""
+    n_escalas = n_escalas or config.MSE_SCALES
+    return [f'entropia_multiescala_{escala}' for escala in range(1, n_escalas + 1)]
+
+NOMES_FEATURES_MULTIESCALA = nomes_features_multiescala()
+
+def somas_acumuladas(matriz):
+    """Soma acumulada de cada linha com um zero à esquerda, acumulada em float64"""
+    matriz = np.atleast_2d(matriz)
+    somas = np.zeros((matriz.shape[0], matriz.shape[1] + 1))
+    np.cumsum(matriz, axis=1, dtype=np.float64, out=somas[:, 1:])
+    return somas
+
+def granular(somas, escala):
+    """
+    Sinal na escala s: médias dos blocos [k*s, (k+1)*s), a partir das somas acumuladas
+
+    Args:
+        somas (np.array): Saída de somas_acumuladas (n_linhas, n_amostras + 1)
+        escala (int): Tamanho dos blocos
+
+    Returns:
+        np.array: Matriz (n_linhas, n_amostras // escala)
+    """
+    n_blocos = (somas.shape[1] - 1) // escala
+    fins = np.arange(1, n_blocos + 1) * escala
+    return (somas[:, fins] - somas[:, fins - escala]) / escala
+
+def entropia_multiescala_lote(matriz, n_escalas=None, metodo=None, m=3):
+    """
+    Entropia em função da escala para cada linha de uma matriz (n_linhas, n_amostras)
+
+    Args:
+        matriz (np.array): Sinais de mesmo comprimento, um por linha
+        n_escalas (int): Escalas 1..S (padrão: config.MSE_SCALES)
+        metodo (str): 'simbolica' (entropia de Shannon das palavras de m bits, como na
+            dinâmica simbólica) ou 'amostral' (padrão: config.MSE_METHOD)
+        m (int): Tamanho das palavras da dinâmica simbólica
+
+    Returns:
+        np.array: Matriz (n_linhas, n_escalas); escalas sem amostras suficientes valem 0
+    """
+    n_escalas = n_escalas or config.MSE_SCALES
+    metodo = metodo or config.MSE_METHOD
+    if metodo not in METODOS_MULTIESCALA:
+        raise ValueError(f"Método de entropia multiescala inválido: {metodo}")
+
+    matriz = np.atleast_2d(np.asarray(matriz))
+    n_linhas = matriz.shape[0]
+    entropias = np.zeros((n_linhas, n_escalas))
+    if n_linhas == 0:
+        return entropias
+
+    somas = somas_acumuladas(matriz)
+    if metodo == 'amostral':
+        # Tolerância fixa pelo desvio padrão do sinal original em todas as escalas
+        tolerancias = config.SAMPEN_R * matriz.std(axis=1, dtype=np.float64)
+
+    for escala in range(1, n_escalas + 1):
+        granulado = granular(somas, escala)
+        if granulado.shape[1] < m + 1:
+            break
+
+        if metodo == 'simbolica':
+            binario = granulado >= granulado.mean(axis=1, keepdims=True)
+            contagens = contar_palavras_lote(binario, m)
+            frequencias = contagens / max(granulado.shape[1] - m + 1, 1)
+            entropias[:, escala - 1] = calcular_entropia_shannon_lote(frequencias)
+        else:
+            entropias[:, escala - 1] = entropia_amostral_lote(granulado, tolerancias=tolerancias)
+
+    return entropias
+
+def entropia_multiescala(valores, n_escalas=None, metodo=None, m=3):
+    """Curva de entropia por escala de um único sinal"""
+    return entropia_multiescala_lote(np.asarray(valores)[None, :], n_escalas, metodo, m)[0]
+
+def calcular_features_multiescala(valores, m=3):
+    """
+    Calcula as features de entropia multiescala de um sinal
+
+    Returns:
+        dict: Features na ordem de NOMES_FEATURES_MULTIESCALA
+    """
+    curva = entropia_multiescala(valores, len(NOMES_FEATURES_MULTIESCALA), m=m)
+    return {nome: float(valor) for nome, valor in zip(NOMES_FEATURES_MULTIESCALA, curva)}
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Extração vetorizada das features do EEGClassifier por épocas
+
+As épocas são views sobre o sinal original (np.lib.stride_tricks.sliding_window_view),
+então a divisão em janelas não copia dados; cada feature é calculada de uma vez
+ao longo do eixo das janelas.
+"""
+
+import numpy as np
+from dinamica_simbolica import contar_palavras_lote, calcular_entropia_shannon_lote
+from complexidade import (NOMES_FEATURES_COMPLEXIDADE, complexidade_lempel_ziv_lote, entropia_permutacao_lote,
+                          entropia_amostral_lote)
+from entropia_multiescala import NOMES_FEATURES_MULTIESCALA, entropia_multiescala_lote
+from config import config
+
+# Features da dinâmica simbólica e estatísticas, na ordem de EEGClassifier.extrair_features_sinal
+NOMES_FEATURES_BASICAS = [
+    'entropia_shannon',
+    'limiar',
+    'total_amostras',
+    'total_padroes',
+    'padroes_unicos',
+    'media_valores',
+    'desvio_padrao',
+    'variancia',
+    'skewness',
+    'kurtosis',
+    'amplitude',
+    'rms',
+    'proporcao_uns',
+    'transicoes',
+    'comprimento_sequencia',
+    'max_frequencia',
+    'min_frequencia',
+    'std_frequencias',
+    'entropia_frequencias'
+]
+
+# Conjunto completo: complexidade e entropia multiescala vêm depois das features básicas
+NOMES_FEATURES = NOMES_FEATURES_BASICAS + NOMES_FEATURES_COMPLEXIDADE + NOMES_FEATURES_MULTIESCALA
+
+# Incrementar quando o cálculo de alguma feature mudar (invalida os datasets em cache)
+VERSAO_EXTRATOR = 1
+
+def versao_extrator():
+    """
+    Identificação do extrator de features: versão do código, nomes das features e
+    parâmetros de configuração que alteram os valores calculados
+    """
+    return {
+        'versao': VERSAO_EXTRATOR,
+        'features': NOMES_FEATURES,
+        'dtype': str(np.dtype(config.PIPELINE_DTYPE)),
+        'quality': [config.QUALITY_MIN_SAMPLES, config.QUALITY_MAX_FLAT_RUN, config.QUALITY_MAX_CLIP_FRACTION],
+        'permutation_order': config.PERMUTATION_ORDER,
+        'sampen': [config.SAMPEN_M, config.SAMPEN_R, config.SAMPEN_EXACT_MAX_TEMPLATES, config.SAMPEN_REFERENCE_TEMPLATES],
+        'mse': [config.MSE_SCALES, config.MSE_METHOD]
+    }
+
+def calcular_passo(tamanho_epoca, sobreposicao):
+    """Converte a fração de sobreposição (0 <= s < 1) no passo entre épocas"""
+    if not 0 <= sobreposicao < 1:
+        raise ValueError("A sobreposição deve estar no intervalo [0, 1)")
+    return max(1, int(round(tamanho_epoca * (1 - sobreposicao))))
+
+def janelas_epocas(valores, tamanho_epoca, sobreposicao=0.5):
+    """
+    Divide o sinal em épocas de tamanho fixo com sobreposição, sem copiar os dados
+
+    Args:
+        valores (np.array): Sinal unidimensional
+        tamanho_epoca (int): Número de amostras por época
+        sobreposicao (float): Fração de sobreposição entre épocas consecutivas
+
+    Returns:
+        tuple: (épocas (n_epocas, tamanho_epoca) como view, índices de início de cada época)
+    """
+    valores = np.asarray(valores)
+    passo = calcular_passo(tamanho_epoca, sobreposicao)
+    if tamanho_epoca <= 0 or len(valores) < tamanho_epoca:
+        return np.empty((0, max(tamanho_epoca, 0)), dtype=valores.dtype), np.empty(0, dtype=np.int64)
+
+    epocas = np.lib.stride_tricks.sliding_window_view(valores, tamanho_epoca)[::passo]
+    inicios = np.arange(epocas.shape[0], dtype=np.int64) * passo
+    return epocas, inicios
+
+def calcular_features_matriz(epocas, m=3, dtype=None, nomes=None):
+    """
+    Calcula as features do EEGClassifier para cada linha de uma matriz de épocas
+
+    Os cálculos elemento a elemento são feitos no dtype do pipeline; as reduções
+    (médias, somas de potências) acumulam em float64. As medidas de complexidade e
+    a entropia multiescala só são calculadas quando pedidas em `nomes` (modelos
+    antigos usam apenas as features básicas).
+
+    Args:
+        epocas (np.array): Matriz (n_epocas, tamanho_epoca)
+        m (int): Tamanho das palavras da dinâmica simbólica
+        dtype: dtype do pipeline (padrão: config.PIPELINE_DTYPE)
+        nomes (list): Features a retornar, nesta ordem (padrão: NOMES_FEATURES)
+
+    Returns:
+        np.array: Matriz (n_epocas, len(nomes)) na ordem de `nomes`
+    """
+    dtype = np.dtype(dtype or config.PIPELINE_DTYPE)
+    nomes = list(nomes or NOMES_FEATURES)
+    desconhecidas = [nome for nome in nomes if nome not in NOMES_FEATURES]
+    if desconhecidas:
+        raise ValueError(f"Features desconhecidas: {', '.join(desconhecidas)}")
+
+    n_epocas, n = epocas.shape
+    if n_epocas == 0 or n == 0:
+        return np.empty((0, len(nomes)), dtype=dtype)
+
+    # Converte só se necessário (mantém a view quando o sinal já está no dtype do pipeline)
+    epocas = epocas.astype(dtype, copy=False)
+
+    # Estatísticas dos valores brutos
+    media = epocas.mean(axis=1, dtype=np.float64)
+    desvios = epocas - media.astype(dtype)[:, None]
+    variancia = np.mean(np.square(desvios), axis=1, dtype=np.float64)
+    desvio_padrao = np.sqrt(variancia)
+    amplitude = epocas.max(axis=1).astype(np.float64) - epocas.min(axis=1)
+    rms = np.sqrt(np.mean(np.square(epocas), axis=1, dtype=np.float64))
+
+    # Skewness e kurtosis com as mesmas correções de _calcular_skewness/_calcular_kurtosis
+    std_seguro = np.where(desvio_padrao > 0, desvio_padrao, 1.0).astype(dtype)
+    padronizados = desvios / std_seguro[:, None]
+    if n >= 3:
+        skewness = (n / ((n - 1) * (n - 2))) * np.sum(padronizados ** 3, axis=1, dtype=np.float64)
+    else:
+        skewness = np.zeros(n_epocas)
+    if n >= 4:
+        kurtosis = ((n * (n + 1) / ((n - 1) * (n - 2) * (n - 3))) * np.sum(padronizados ** 4, axis=1, dtype=np.float64)
+                    - (3 * (n - 1) ** 2 / ((n - 2) * (n - 3))))
+    else:
+        kurtosis = np.zeros(n_epocas)
+    skewness = np.where(desvio_padrao > 0, skewness, 0.0)
+    kurtosis = np.where(desvio_padrao > 0, kurtosis, 0.0)
+
+    # Dinâmica simbólica: limiar = média de cada época
+    binario = epocas >= media.astype(dtype)[:, None]
+    proporcao_uns = binario.mean(axis=1)
+    transicoes = np.count_nonzero(binario[:, 1:] != binario[:, :-1], axis=1)
+
+    total_padroes = max(n - m + 1, 0)
+    contagens = contar_palavras_lote(binario, m)
+    frequencias = contagens / max(total_padroes, 1)
+    presentes = contagens > 0
+    padroes_unicos = presentes.sum(axis=1)
+    n_presentes = np.maximum(padroes_unicos, 1)
+
+    max_frequencia = frequencias.max(axis=1)
+    min_frequencia = np.where(presentes, frequencias, np.inf).min(axis=1)
+    min_frequencia = np.where(padroes_unicos > 0, min_frequencia, 0.0)
+    media_frequencias = np.where(presentes, frequencias, 0.0).sum(axis=1) / n_presentes
+    std_frequencias = np.sqrt(
+        np.where(presentes, (frequencias - media_frequencias[:, None]) ** 2, 0.0).sum(axis=1) / n_presentes
+    )
+
+    # Entropia log2 das frequências (mesma regra de _calcular_entropia_shannon)
+    soma_frequencias = frequencias.sum(axis=1, keepdims=True)
+    probabilidades = np.divide(frequencias, soma_frequencias,
+                               out=np.zeros_like(frequencias), where=soma_frequencias > 0)
+    log_probabilidades = np.log2(np.where(probabilidades > 0, probabilidades, 1.0))
+    entropia_frequencias = -np.sum(probabilidades * log_probabilidades, axis=1)
+
+    entropia_shannon = calcular_entropia_shannon_lote(frequencias)
+
+    colunas = {
+        'entropia_shannon': entropia_shannon,
+        'limiar': media,
+        'total_amostras': np.full(n_epocas, n),
+        'total_padroes': np.full(n_epocas, total_padroes),
+        'padroes_unicos': padroes_unicos,
+        'media_valores': media,
+        'desvio_padrao': desvio_padrao,
+        'variancia': variancia,
+        'skewness': skewness,
+        'kurtosis': kurtosis,
+        'amplitude': amplitude,
+        'rms': rms,
+        'proporcao_uns': proporcao_uns,
+        'transicoes': transicoes,
+        'comprimento_sequencia': np.full(n_epocas, n),
+        'max_frequencia': max_frequencia,
+        'min_frequencia': min_frequencia,
+        'std_frequencias': std_frequencias,
+        'entropia_frequencias': entropia_frequencias
+    }
+
+    # Complexidade de todas as épocas de uma vez (LZ76 sobre a mesma matriz binária
+    # da dinâmica simbólica)
+    if 'entropia_permutacao' in nomes:
+        colunas['entropia_permutacao'] = entropia_permutacao_lote(epocas, config.PERMUTATION_ORDER)
+    if 'complexidade_lz' in nomes:
+        colunas['complexidade_lz'] = complexidade_lempel_ziv_lote(binario)
+    if 'entropia_amostral' in nomes:
+        colunas['entropia_amostral'] = entropia_amostral_lote(epocas)
+
+    # Entropia multiescala de todas as épocas de uma vez
+    escalas_pedidas = [nome for nome in NOMES_FEATURES_MULTIESCALA if nome in nomes]
+    if escalas_pedidas:
+        curvas = entropia_multiescala_lote(epocas, len(NOMES_FEATURES_MULTIESCALA), m=m)
+        for escala, nome in enumerate(NOMES_FEATURES_MULTIESCALA):
+            colunas[nome] = curvas[:, escala]
+
+    return np.column_stack([colunas[nome] for nome in nomes]).astype(dtype)
+
+def extrair_features_epocas(valores, tamanho_epoca, sobreposicao=0.5, m=3, dtype=None, nomes=None):
+    """
+    Extrai a matriz de features por época de um sinal longo
+
+    Args:
+        valores (np.array): Sinal unidimensional
+        tamanho_epoca (int): Número de amostras por época
+        sobreposicao (float): Fração de sobreposição entre épocas
+        m (int): Tamanho das palavras da dinâmica simbólica
+        dtype: dtype do pipeline (padrão: config.PIPELINE_DTYPE)
+        nomes (list): Features a extrair (padrão: NOMES_FEATURES)
+
+    Returns:
+        tuple: (matriz (n_epocas, n_features), índices de início de cada época)
+    """
+    dtype = np.dtype(dtype or config.PIPELINE_DTYPE)
+    epocas, inicios = janelas_epocas(np.asarray(valores, dtype=dtype), tamanho_epoca, sobreposicao)
+    return calcular_features_matriz(epocas, m, dtype, nomes), inicios
+
+def extrair_features_valores(valores, m=3, dtype=None, nomes=None):
+    """
+    Extrai as features do sinal inteiro (uma única época) a partir dos valores em memória
+
+    Returns:
+        dict: Features na mesma ordem de EEGClassifier.extrair_features_sinal, ou None
+    """
+    dtype = np.dtype(dtype or config.PIPELINE_DTYPE)
+    nomes = list(nomes or NOMES_FEATURES)
+    valores = np.asarray(valores, dtype=dtype)
+    if len(valores) < m:
+        return None
+    matriz = calcular_features_matriz(valores[None, :], m, dtype, nomes)
+    return {nome: float(valor) for nome, valor in zip(nomes, matriz[0])}
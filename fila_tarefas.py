@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Fila de tarefas assíncronas com consulta do resultado
+
+Os endpoints colocam o trabalho em um pool limitado de threads e devolvem um ID na
+hora; o resultado é consultado depois em /jobs/<id>. A fila tem profundidade
+máxima (config.JOB_MAX_QUEUE): quando cheia, submeter levanta FilaCheia e a rota
+responde 429. Resultados de tarefas terminadas expiram depois de
+config.JOB_RESULT_TTL_S segundos.
+"""
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+ERRO = 'erro'
+
+class FilaCheia(Exception):
+    """A fila de tarefas atingiu a profundidade máxima"""
+
+class FilaTarefas:
+    """Pool limitado de threads com registro de status e resultado por tarefa"""
+
+    def __init__(self, max_trabalhadores=None, max_fila=None, expiracao_s=None):
+        """
+        Args:
+            max_trabalhadores (int): Threads de trabalho
+            max_fila (int): Máximo de tarefas pendentes ou em execução
+            expiracao_s (float): Tempo que o resultado de uma tarefa terminada fica disponível
+        """
+        self.max_trabalhadores = max_trabalhadores or config.JOB_WORKERS
+        self.max_fila = max_fila or config.JOB_MAX_QUEUE
+        self.expiracao_s = config.JOB_RESULT_TTL_S if expiracao_s is None else expiracao_s
+        self.executor = ThreadPoolExecutor(max_workers=self.max_trabalhadores, thread_name_prefix="fila_tarefas")
+        self.tarefas = {}
+        self.lock = threading.Lock()
+        self.ativas = 0
+        self.rejeitadas = 0
+        self.concluidas = 0
+        self.com_erro = 0
+
+    def submeter(self, tipo, funcao, *args, **kwargs):
+        """
+        Coloca uma tarefa na fila
+
+        Returns:
+            str: ID da tarefa
+
+        Raises:
+            FilaCheia: Quando já há max_fila tarefas pendentes ou em execução
+        """
+        self.limpar_expiradas()
+        with self.lock:
+            if self.ativas >= self.max_fila:
+                self.rejeitadas += 1
+                raise FilaCheia(f"Fila de tarefas cheia ({self.max_fila} tarefas)")
+            id_tarefa = uuid.uuid4().hex
+            self.tarefas[id_tarefa] = {
+                'id': id_tarefa,
+                'tipo': tipo,
+                'status': PENDENTE,
+                'criada': time.time(),
+                'iniciada': None,
+                'terminada': None,
+                'resultado': None,
+                'erro': None
+            }
+            self.ativas += 1
+
+        self.executor.submit(self._executar, id_tarefa, funcao, args, kwargs)
+        return id_tarefa
+
+    def _executar(self, id_tarefa, funcao, args, kwargs):
+        """Executa a tarefa na thread do pool e registra o resultado"""
+        with self.lock:
+            self.tarefas[id_tarefa]['status'] = EXECUTANDO
+            self.tarefas[id_tarefa]['iniciada'] = time.time()
+
+        try:
+            resultado, erro = funcao(*args, **kwargs), None
+        except Exception as e:
+            resultado, erro = None, str(e)
+
+        with self.lock:
+            tarefa = self.tarefas[id_tarefa]
+            tarefa['status'] = CONCLUIDA if erro is None else ERRO
+            tarefa['resultado'] = resultado
+            tarefa['erro'] = erro
+            tarefa['terminada'] = time.time()
+            self.ativas -= 1
+            if erro is None:
+                self.concluidas += 1
+            else:
+                self.com_erro += 1
+
+    def obter(self, id_tarefa):
+        """Status e resultado de uma tarefa, ou None se não existe ou já expirou"""
+        self.limpar_expiradas()
+        with self.lock:
+            tarefa = self.tarefas.get(id_tarefa)
+            if tarefa is None:
+                return None
+            resposta = dict(tarefa)
+
+        # Tempos relativos para quem consulta
+        resposta['espera_s'] = round((resposta['iniciada'] or time.time()) - resposta['criada'], 4)
+        if resposta['terminada']:
+            resposta['duracao_s'] = round(resposta['terminada'] - resposta['iniciada'], 4)
+            resposta['expira_em_s'] = round(max(resposta['terminada'] + self.expiracao_s - time.time(), 0.0), 1)
+        return resposta
+
+    def limpar_expiradas(self):
+        """Descarta as tarefas terminadas há mais de expiracao_s segundos"""
+        limite = time.time() - self.expiracao_s
+        with self.lock:
+            expiradas = [id_tarefa for id_tarefa, tarefa in self.tarefas.items()
+                         if tarefa['terminada'] is not None and tarefa['terminada'] < limite]
+            for id_tarefa in expiradas:
+                del self.tarefas[id_tarefa]
+        return len(expiradas)
+
+    def estatisticas(self):
+        """Profundidade da fila, capacidade e contadores"""
+        with self.lock:
+            return {
+                'ativas': self.ativas,
+                'guardadas': len(self.tarefas),
+                'max_fila': self.max_fila,
+                'trabalhadores': self.max_trabalhadores,
+                'concluidas': self.concluidas,
+                'com_erro': self.com_erro,
+                'rejeitadas': self.rejeitadas,
+                'expiracao_s': self.expiracao_s
+            }
+
+    def encerrar(self, esperar=True):
+        """Encerra o pool de threads"""
+        self.executor.shutdown(wait=esperar)
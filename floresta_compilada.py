@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Random Forest compilada em arrays numpy
+
+Os nós de todas as árvores de um RandomForestClassifier treinado são concatenados em
+arrays contíguos (feature, limiar, filhos e probabilidades das folhas). A predição
+percorre todas as árvores ao mesmo tempo, um nível por iteração, para um lote de
+linhas, sem a validação e o despacho do joblib que o sklearn faz a cada chamada.
+
+O resultado é idêntico ao predict_proba do sklearn: as entradas são convertidas
+para float32 antes da comparação com os limiares (como o sklearn faz) e as
+probabilidades das árvores são acumuladas em sequência, na ordem das árvores.
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+FOLHA = -1  # Valor de children_left/children_right nas folhas do sklearn
+
+class FlorestaCompilada:
+    """Floresta achatada em arrays para predição vetorizada"""
+
+    def __init__(self, features, limiares, esquerda, direita, probabilidades, raizes, profundidade,
+                 n_features, classes):
+        self.features = features
+        self.limiares = limiares
+        self.esquerda = esquerda
+        self.direita = direita
+        self.probabilidades = probabilidades
+        self.raizes = raizes
+        self.profundidade = profundidade
+        self.n_features = n_features
+        self.classes_ = classes
+
+    @property
+    def n_arvores(self):
+        return len(self.raizes)
+
+    def folhas(self, X):
+        """Índice (global) da folha alcançada por cada linha em cada árvore: (n_linhas, n_arvores)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Esperado X com {self.n_features} features, recebido {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("X contém NaN ou infinito")
+
+        # A comparação é feita em float64, com o valor float32 promovido (como no sklearn)
+        X = X.astype(np.float64)
+        linhas = np.arange(X.shape[0])[:, None]
+        nos = np.broadcast_to(self.raizes, (X.shape[0], self.n_arvores))
+        for _ in range(self.profundidade):
+            para_esquerda = X[linhas, self.features[nos]] <= self.limiares[nos]
+            nos = np.where(para_esquerda, self.esquerda[nos], self.direita[nos])
+        return nos
+
+    def predict_proba(self, X):
+        """Probabilidades por classe, iguais às de RandomForestClassifier.predict_proba"""
+        folhas = self.folhas(X)
+        if folhas.shape[0] == 0:
+            return np.empty((0, len(self.classes_)))
+
+        # cumsum soma as árvores em sequência (a mesma ordem de soma do sklearn)
+        soma = np.cumsum(self.probabilidades[folhas], axis=1)[:, -1]
+        return soma / self.n_arvores
+
+    def predict(self, X):
+        """Classe com maior probabilidade"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def compilar_floresta(floresta):
+    """
+    Achata um RandomForestClassifier treinado (uma saída) em uma FlorestaCompilada
+
+    Nas folhas, os dois filhos apontam para a própria folha, então percorrer a
+    profundidade máxima da floresta leva todas as linhas até as folhas sem máscaras.
+    """
+    if not isinstance(floresta, RandomForestClassifier) or not hasattr(floresta, 'estimators_'):
+        raise ValueError("É necessário um RandomForestClassifier treinado")
+    if floresta.n_outputs_ != 1:
+        raise ValueError("Apenas florestas com uma saída são suportadas")
+
+    features, limiares, esquerda, direita, probabilidades, raizes = [], [], [], [], [], []
+    deslocamento = 0
+    profundidade = 0
+    for estimador in floresta.estimators_:
+        arvore = estimador.tree_
+        indices = np.arange(arvore.node_count)
+        folha = arvore.children_left == FOLHA
+
+        features.append(np.where(folha, 0, arvore.feature))
+        limiares.append(np.where(folha, 0.0, arvore.threshold))
+        esquerda.append(np.where(folha, indices, arvore.children_left) + deslocamento)
+        direita.append(np.where(folha, indices, arvore.children_right) + deslocamento)
+
+        # Mesma normalização de DecisionTreeClassifier.predict_proba
+        valores = arvore.value[:, 0, :].astype(np.float64)
+        normalizador = valores.sum(axis=1, keepdims=True)
+        normalizador[normalizador == 0.0] = 1.0
+        probabilidades.append(valores / normalizador)
+
+        raizes.append(deslocamento)
+        deslocamento += arvore.node_count
+        profundidade = max(profundidade, arvore.max_depth)
+
+    return FlorestaCompilada(
+        features=np.concatenate(features).astype(np.intp),
+        limiares=np.concatenate(limiares).astype(np.float64),
+        esquerda=np.concatenate(esquerda).astype(np.intp),
+        direita=np.concatenate(direita).astype(np.intp),
+        probabilidades=np.concatenate(probabilidades),
+        raizes=np.array(raizes, dtype=np.intp),
+        profundidade=profundidade,
+        n_features=floresta.n_features_in_,
+        classes=floresta.classes_
+    )
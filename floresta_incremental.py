@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Crescimento incremental do Random Forest
+
+Em vez de refazer as 100 árvores a cada retreinamento, o modo incremental usa
+warm_start para ajustar um lote de árvores novas na janela dos sinais rotulados
+mais recentes e aposenta as árvores mais antigas quando a floresta passa do
+tamanho máximo (janela deslizante de árvores). O custo depende dos sinais novos,
+não do total rotulado.
+
+Um holdout estável (cada sinal cai sempre do mesmo lado, pelo hash do ID) mede a
+acurácia depois de cada crescimento; se ela cai mais que a tolerância abaixo da
+acurácia do último ajuste completo, o chamador refaz a floresta do zero.
+"""
+
+import numpy as np
+
+def em_holdout(ids_sinais, fracao):
+    """
+    Máscara do holdout pelo hash multiplicativo do ID do sinal
+
+    Returns:
+        np.array: bool, True para os sinais reservados à avaliação
+    """
+    ids_sinais = np.asarray(ids_sinais, dtype=np.uint64).reshape(-1)
+    hash_ids = (ids_sinais * np.uint64(2654435761)) % np.uint64(2 ** 32)
+    return hash_ids < np.uint64(int(fracao * 2 ** 32))
+
+def crescer_floresta(floresta, X, y, n_arvores, max_arvores, rodada=0):
+    """
+    Adiciona n_arvores ajustadas em (X, y) e aposenta as mais antigas além de max_arvores
+
+    Com a floresta cheia, len(estimators_) fica sempre em max_arvores e o warm_start
+    sortearia as mesmas sementes para as árvores novas em todo crescimento; com um
+    random_state inteiro, a semente base é deslocada pela rodada durante o ajuste.
+
+    Args:
+        floresta (RandomForestClassifier): Floresta já treinada
+        X (np.array): Features já escaladas da janela recente
+        y (np.array): Rótulos (precisa ter as duas classes)
+        rodada (int): Número do crescimento desde o último ajuste completo
+
+    Returns:
+        int: Número de árvores aposentadas
+    """
+    semente = floresta.random_state
+    if isinstance(semente, (int, np.integer)):
+        floresta.set_params(random_state=int(semente) + rodada)
+    floresta.set_params(warm_start=True, n_estimators=len(floresta.estimators_) + n_arvores)
+    try:
+        floresta.fit(X, y)
+    finally:
+        floresta.set_params(random_state=semente)
+
+    aposentadas = max(len(floresta.estimators_) - max_arvores, 0)
+    if aposentadas:
+        floresta.estimators_ = floresta.estimators_[aposentadas:]
+        floresta.n_estimators = len(floresta.estimators_)
+    return aposentadas
+
+def estado_inicial(X, y, ids_sinais, holdout, janela, acuracia):
+    """
+    Estado do modo incremental depois de um ajuste completo
+
+    Args:
+        holdout (np.array): Máscara do holdout (em_holdout)
+        janela (int): Máximo de amostras de treino recentes guardadas
+        acuracia (float): Acurácia no holdout do ajuste completo (referência)
+    """
+    # Janela em ordem de chegada (IDs crescentes), não na ordem das categorias
+    ordem = np.argsort(np.asarray(ids_sinais), kind='stable')
+    X, y, holdout = X[ordem], y[ordem], holdout[ordem]
+    treino = ~holdout
+    return {
+        'ids': set(int(id_sinal) for id_sinal in ids_sinais),
+        'X_janela': X[treino][-janela:],
+        'y_janela': y[treino][-janela:],
+        'X_holdout': X[holdout],
+        'y_holdout': y[holdout],
+        'acuracia_referencia': acuracia,
+        'rodadas': 0,
+        'historico': []
+    }
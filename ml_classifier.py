@@ -8,12 +8,28 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neural_network import MLPClassifier
+from sklearn.linear_model import SGDClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
 import matplotlib.pyplot as plt
 import seaborn as sns
 from dinamica_simbolica import aplicar_dinamica_simbolica
+from extracao_features import NOMES_FEATURES, extrair_features_epocas, calcular_features_matriz
+from complexidade import calcular_features_complexidade
+from entropia_multiescala import calcular_features_multiescala
+from qualidade_sinal import avaliar_qualidade
+from cache_predicoes import calcular_versao
+from cache_datasets import chave_dataset, carregar_dataset, salvar_dataset
+from floresta_compilada import compilar_floresta
+from floresta_incremental import em_holdout, crescer_floresta, estado_inicial
+from busca_hiperparametros import melhores_hiperparametros
+from mlp_numpy import MLPNumpy
+import pipeline_dados
+import sinais_brutos
 import os
+import time
+import uuid
 import pickle
+from contextlib import nullcontext
 from config import config
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
@@ -30,6 +46,16 @@ class EEGClassifier:
         self.feature_names = []
         self.is_trained = False
         self.tipo_modelo_keras = None  # Para criar modelo dinamicamente
+        self.versao = None  # Hash do arquivo salvo/carregado (chave do cache de predições)
+        self.floresta_compilada = None  # Random Forest em arrays numpy para predição rápida
+        self.mlp_numpy = None  # mlp_tabular exportado para numpy (predição sem TensorFlow)
+        self.dataset_do_cache = None  # Se o último criar_dataset veio do cache
+        self.ids_dataset = None  # IDs dos sinais de cada linha do último criar_dataset
+        self.estado_incremental = None  # Holdout e janela recente do Random Forest incremental
+        self.ids_treino = None  # IDs dos sinais vistos no ajuste (predições fora deles são de validação)
+        self.callbacks_treino = []  # Callbacks Keras extras (progresso, telemetria)
+        self.hiperparametros = {}  # Hiperparâmetros do criar_modelo (padrão: os da última busca)
+        self.perfil = None  # PerfilTreino da execução em andamento (tempo e recursos por fase)
         
     def obter_conexao_db(self):
         """Conecta ao banco de dados PostgreSQL"""
@@ -46,8 +72,21 @@ class EEGClassifier:
             dict: Dicionário com as features extraídas
         """
         try:
+            # Valores brutos primeiro: a triagem de qualidade evita a dinâmica simbólica e os gráficos
+            valores_brutos = self.obter_valores_sinal(id_sinal)
+            
+            # Verifica se há dados válidos
+            if len(valores_brutos) == 0:
+                print(f"Sinal {id_sinal}: valores brutos vazios")
+                return None
+            
+            qualidade = avaliar_qualidade(valores_brutos)
+            if not qualidade['valido']:
+                print(f"Sinal {id_sinal}: reprovado na triagem de qualidade ({', '.join(qualidade['motivos'])})")
+                return None
+            
             # Aplica dinâmica simbólica
-            resultado = aplicar_dinamica_simbolica(id_sinal, m=3)
+            resultado = aplicar_dinamica_simbolica(id_sinal, m=config.SYMBOLIC_M)
             
             # Verifica se o resultado é válido
             if not resultado or len(resultado['sequencia_binaria']) == 0:
@@ -63,28 +102,15 @@ class EEGClassifier:
                 'padroes_unicos': len(resultado['frequencias'])
             }
             
-            # Estatísticas dos valores brutos (precisamos buscar novamente)
-            conexao = self.obter_conexao_db()
-            cursor = conexao.cursor()
-            cursor.execute("SELECT valor FROM valores_sinais WHERE idsinal = %s", (id_sinal,))
-            valores_brutos = np.array([row[0] for row in cursor.fetchall()])
-            cursor.close()
-            conexao.close()
-            
-            # Verifica se há dados válidos
-            if len(valores_brutos) == 0:
-                print(f"Sinal {id_sinal}: valores brutos vazios")
-                return None
-            
-            # Features estatísticas dos valores brutos
+            # Features estatísticas dos valores brutos (reduções acumulam em float64)
             features.update({
-                'media_valores': np.mean(valores_brutos),
-                'desvio_padrao': np.std(valores_brutos),
-                'variancia': np.var(valores_brutos),
+                'media_valores': np.mean(valores_brutos, dtype=np.float64),
+                'desvio_padrao': np.std(valores_brutos, dtype=np.float64),
+                'variancia': np.var(valores_brutos, dtype=np.float64),
                 'skewness': self._calcular_skewness(valores_brutos),
                 'kurtosis': self._calcular_kurtosis(valores_brutos),
-                'amplitude': np.max(valores_brutos) - np.min(valores_brutos),
-                'rms': np.sqrt(np.mean(valores_brutos**2))
+                'amplitude': float(np.max(valores_brutos)) - float(np.min(valores_brutos)),
+                'rms': np.sqrt(np.mean(np.square(valores_brutos), dtype=np.float64))
             })
             
             # Features da sequência binária
@@ -108,24 +134,119 @@ class EEGClassifier:
                 'entropia_frequencias': self._calcular_entropia_shannon(freq_values)
             })
             
+            # Medidas de complexidade (LZ sobre a mesma sequência binária)
+            features.update(calcular_features_complexidade(valores_brutos, sequencia_binaria))
+            features.update(calcular_features_multiescala(valores_brutos, m=config.SYMBOLIC_M))
+            
             return features
             
         except Exception as e:
             print(f"Erro ao extrair features do sinal {id_sinal}: {str(e)}")
             return None
     
+    def obter_valores_sinal(self, id_sinal):
+        """Busca os valores brutos de um sinal no banco"""
+        conexao = self.obter_conexao_db()
+        cursor = conexao.cursor()
+        cursor.execute("SELECT valor FROM valores_sinais WHERE idsinal = %s ORDER BY id", (id_sinal,))
+        valores = np.array([row[0] for row in cursor.fetchall()], dtype=config.PIPELINE_DTYPE)
+        cursor.close()
+        conexao.close()
+        return valores
+    
+    def obter_valores_sinais(self, ids_sinais):
+        """
+        Busca os valores brutos de vários sinais com uma única consulta
+        
+        Returns:
+            dict: {id_sinal: np.array} (sinais sem valores ficam de fora)
+        """
+        if not ids_sinais:
+            return {}
+        
+        conexao = self.obter_conexao_db()
+        cursor = conexao.cursor()
+        cursor.execute("""
+            SELECT idsinal, array_agg(valor ORDER BY id)
+            FROM valores_sinais
+            WHERE idsinal = ANY(%s)
+            GROUP BY idsinal
+        """, (list(ids_sinais),))
+        valores = {id_sinal: np.array(linha, dtype=config.PIPELINE_DTYPE) for id_sinal, linha in cursor.fetchall()}
+        cursor.close()
+        conexao.close()
+        return valores
+    
+    def extrair_features_lote(self, valores_por_id, nomes=None):
+        """
+        Extrai as features de vários sinais já em memória
+        
+        Sinais reprovados na triagem de qualidade ficam de fora; sinais de mesmo
+        comprimento são empilhados e processados juntos em calcular_features_matriz.
+        
+        Args:
+            valores_por_id (dict): {id_sinal: valores brutos}
+            nomes (list): Features a extrair (padrão: as do modelo, ou NOMES_FEATURES)
+            
+        Returns:
+            tuple: (ids na ordem das linhas, matriz (n_sinais, n_features))
+        """
+        nomes = list(nomes or self.feature_names or NOMES_FEATURES)
+        
+        por_comprimento = {}
+        for id_sinal, valores in valores_por_id.items():
+            if len(valores) < config.SYMBOLIC_M:
+                print(f"Sinal {id_sinal}: valores brutos insuficientes")
+                continue
+            qualidade = avaliar_qualidade(valores)
+            if not qualidade['valido']:
+                print(f"Sinal {id_sinal}: reprovado na triagem de qualidade ({', '.join(qualidade['motivos'])})")
+                continue
+            por_comprimento.setdefault(len(valores), []).append(id_sinal)
+        
+        ids_ordenados = []
+        blocos = []
+        for ids_grupo in por_comprimento.values():
+            matriz = np.stack([valores_por_id[id_sinal] for id_sinal in ids_grupo])
+            blocos.append(calcular_features_matriz(matriz, m=config.SYMBOLIC_M, nomes=nomes))
+            ids_ordenados.extend(ids_grupo)
+        
+        if not blocos:
+            return [], np.empty((0, len(nomes)), dtype=config.PIPELINE_DTYPE)
+        return ids_ordenados, np.concatenate(blocos)
+    
+    def extrair_features_epocas(self, valores, tamanho_epoca=None, sobreposicao=None):
+        """
+        Extrai as features de cada época de um sinal longo
+        
+        Args:
+            valores (np.array): Valores brutos do sinal
+            tamanho_epoca (int): Amostras por época (padrão: config.EPOCH_SIZE)
+            sobreposicao (float): Fração de sobreposição (padrão: config.EPOCH_OVERLAP)
+            
+        Returns:
+            tuple: (matriz (n_epocas, n_features), índices de início de cada época)
+        """
+        tamanho_epoca = tamanho_epoca or config.EPOCH_SIZE
+        sobreposicao = config.EPOCH_OVERLAP if sobreposicao is None else sobreposicao
+        
+        # Apenas as features que o modelo carregado conhece, na ordem do treino
+        matriz, inicios = extrair_features_epocas(valores, tamanho_epoca, sobreposicao, m=config.SYMBOLIC_M,
+                                                  nomes=self.feature_names or None)
+        return matriz, inicios
+    
     def _calcular_skewness(self, data):
         """Calcula o skewness (assimetria) dos dados"""
         n = len(data)
         if n < 3:
             return 0.0
         
-        mean = np.mean(data)
-        std = np.std(data)
+        mean = np.mean(data, dtype=np.float64)
+        std = np.std(data, dtype=np.float64)
         if std == 0:
             return 0.0
         
-        skewness = (n / ((n-1) * (n-2))) * np.sum(((data - mean) / std) ** 3)
+        skewness = (n / ((n-1) * (n-2))) * np.sum(((data - mean) / std) ** 3, dtype=np.float64)
         return skewness
     
     def _calcular_kurtosis(self, data):
@@ -134,12 +255,12 @@ class EEGClassifier:
         if n < 4:
             return 0.0
         
-        mean = np.mean(data)
-        std = np.std(data)
+        mean = np.mean(data, dtype=np.float64)
+        std = np.std(data, dtype=np.float64)
         if std == 0:
             return 0.0
         
-        kurtosis = (n * (n+1) / ((n-1) * (n-2) * (n-3))) * np.sum(((data - mean) / std) ** 4) - (3 * (n-1)**2 / ((n-2) * (n-3)))
+        kurtosis = (n * (n+1) / ((n-1) * (n-2) * (n-3))) * np.sum(((data - mean) / std) ** 4, dtype=np.float64) - (3 * (n-1)**2 / ((n-2) * (n-3)))
         return kurtosis
     
     def _contar_transicoes(self, sequencia):
@@ -174,16 +295,37 @@ class EEGClassifier:
         
         return entropia
     
+    def _fase(self, nome, amostras=None):
+        """Fase do perfil de treino em andamento (sem perfil, um contexto vazio)"""
+        if self.perfil is None:
+            return nullcontext({})
+        tipo = self.tipo_modelo_keras or (type(self.model).__name__ if self.model is not None else None)
+        return self.perfil.fase(nome, tipo, amostras)
+    
+    def _callbacks_perfil(self, amostras_por_epoca):
+        """Callback de telemetria por época do perfil em andamento (lista vazia sem perfil)"""
+        if self.perfil is None:
+            return []
+        return [self.perfil.callback_keras(self.tipo_modelo_keras, amostras_por_epoca)]
+    
     def criar_dataset(self, limite=10):
         """
         Cria dataset de treinamento balanceado a partir dos dados do banco
         
         Args:
-            limite (int): Número máximo de sinais por categoria
+            limite (int): Número máximo de sinais por categoria (None = todos)
             
         Returns:
             tuple: (X, y, feature_names)
         """
+        with self._fase('dataset') as registro:
+            X, y, feature_names = self._criar_dataset(limite)
+            registro['amostras'] = len(X) if X is not None else None
+            registro['cache'] = self.dataset_do_cache
+        return X, y, feature_names
+    
+    def _criar_dataset(self, limite):
+        """Corpo de criar_dataset (busca os sinais, usa o cache ou extrai as features)"""
         try:
             conexao = self.obter_conexao_db()
             cursor = conexao.cursor()
@@ -196,6 +338,8 @@ class EEGClassifier:
                     FROM sinais s
                     JOIN usuarios u ON s.idusuario = u.id
                     WHERE u.possui = %s
+                      AND COALESCE(s.flags_qualidade, 0) = 0
+                    ORDER BY s.id
                     LIMIT %s
                 """, (categoria, limite))
                 
@@ -209,8 +353,19 @@ class EEGClassifier:
                 print("Nenhum sinal encontrado no banco de dados")
                 return None, None, None
             
+            # Mesmos sinais, rótulos e extrator: reutiliza o dataset sem extrair de novo
+            chave = chave_dataset(sinais)
+            em_cache = carregar_dataset(chave)
+            self.dataset_do_cache = em_cache is not None
+            if em_cache is not None:
+                X, y, self.feature_names, self.ids_dataset = em_cache
+                print(f"♻️ Dataset carregado do cache ({chave}): {X.shape[0]} amostras, {X.shape[1]} features")
+                return X, y, self.feature_names
+            print(f"🆕 Dataset fora do cache ({chave}): extraindo features")
+            
             features_list = []
             labels = []
+            ids_validos = []
             
             for id_sinal, nome, possui in sinais:
                 print(f"Processando sinal {id_sinal}: {nome}")
@@ -221,13 +376,14 @@ class EEGClassifier:
                 
                 features_list.append(features)
                 labels.append(1 if possui == 'S' else 0)
+                ids_validos.append(id_sinal)
             
             if not features_list:
                 print("Nenhuma feature válida extraída")
                 return None, None, None
             
             # Converte para arrays
-            X = np.array([list(features.values()) for features in features_list])
+            X = np.array([list(features.values()) for features in features_list], dtype=config.PIPELINE_DTYPE)
             y = np.array(labels)
             
             # Guarda nomes das features
@@ -235,6 +391,8 @@ class EEGClassifier:
             
             print(f"Dataset criado: {X.shape[0]} amostras, {X.shape[1]} features")
             print(f"Distribuição das classes: {np.bincount(y)}")
+            self.ids_dataset = np.array(ids_validos, dtype=np.int64)
+            salvar_dataset(chave, X, y, self.feature_names, ids_sinais=self.ids_dataset)
             
             return X, y, self.feature_names
             
@@ -242,39 +400,136 @@ class EEGClassifier:
             print(f"Erro ao criar dataset: {str(e)}")
             return None, None, None
     
-    def criar_modelo(self, tipo_modelo='random_forest'):
+    def criar_armazem_sinais(self, diretorio=None, limite=None):
+        """
+        Grava os sinais rotulados do banco em um armazém em disco para o 'cnn_bruto'
+        
+        Os valores são buscados em blocos de sinais e escritos direto no arquivo, sem
+        manter o arquivo inteiro na memória.
+        
+        Args:
+            diretorio (str): Diretório do armazém (padrão: config.RAW_STORE_DIR)
+            limite (int): Número máximo de sinais por categoria (None = todos)
+            
+        Returns:
+            ArmazemSinais: O armazém gravado, ou None em caso de erro
+        """
+        try:
+            conexao = self.obter_conexao_db()
+            cursor = conexao.cursor()
+            rotulos = {}
+            for categoria in ['S', 'N']:
+                cursor.execute("""
+                    SELECT s.id
+                    FROM sinais s
+                    JOIN usuarios u ON s.idusuario = u.id
+                    WHERE u.possui = %s
+                      AND COALESCE(s.flags_qualidade, 0) = 0
+                    ORDER BY s.id
+                    LIMIT %s
+                """, (categoria, limite))
+                rotulos.update({id_sinal: 1 if categoria == 'S' else 0 for (id_sinal,) in cursor.fetchall()})
+            cursor.close()
+            conexao.close()
+            
+            def sinais():
+                ids = sorted(rotulos)
+                for inicio in range(0, len(ids), 50):
+                    valores = self.obter_valores_sinais(ids[inicio:inicio + 50])
+                    for id_sinal in ids[inicio:inicio + 50]:
+                        if id_sinal in valores:
+                            yield id_sinal, valores[id_sinal], rotulos[id_sinal]
+            
+            armazem = sinais_brutos.salvar_armazem_sinais(diretorio or config.RAW_STORE_DIR, sinais())
+            print(f"💾 Armazém de sinais brutos: {len(armazem)} sinais, {len(armazem.valores)} amostras")
+            return armazem
+            
+        except Exception as e:
+            print(f"❌ Erro ao criar o armazém de sinais: {str(e)}")
+            return None
+    
+    def criar_modelo(self, tipo_modelo='random_forest', hiperparametros=None):
         """
         Cria o modelo de classificação
         
         Args:
-            tipo_modelo (str): 'random_forest', 'mlp', 'cnn', 'lstm', 'hybrid', ou 'mlp_tabular'
+            tipo_modelo (str): 'random_forest', 'mlp', 'sgd', 'mlp_online', 'cnn', 'lstm', 'hybrid', 'mlp_tabular'
+                               ou 'cnn_bruto' (CNN nas janelas do sinal bruto, treinada com um ArmazemSinais);
+                               'estudante' é o Random Forest raso da destilação (treinar_alvos_suaves)
+            hiperparametros (dict): Substituem os valores padrão (padrão: a melhor configuração
+                                    da busca de hiperparâmetros para o tipo, se houver)
         """
         print(f"🧠 Criando modelo: {tipo_modelo}")
+        self.floresta_compilada = None
+        self.mlp_numpy = None
+        self.estado_incremental = None
+        self.hiperparametros = dict(melhores_hiperparametros(tipo_modelo) if hiperparametros is None else hiperparametros)
+        if self.hiperparametros:
+            print(f"🎛️ Hiperparâmetros: {self.hiperparametros}")
+        hp = self.hiperparametros
+        if 'hidden_layer_sizes' in hp:
+            hp['hidden_layer_sizes'] = tuple(hp['hidden_layer_sizes'])  # Lista no JSON
         
         if tipo_modelo == 'random_forest':
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42,
-                n_jobs=-1
-            )
+            self.model = RandomForestClassifier(**{
+                'n_estimators': 100,
+                'max_depth': 10,
+                'random_state': 42,
+                'n_jobs': -1,
+                **hp
+            })
         elif tipo_modelo == 'mlp':
-            self.model = MLPClassifier(
-                hidden_layer_sizes=(64, 32, 16),
-                max_iter=500,
-                random_state=42,
-                early_stopping=True,
-                validation_fraction=0.2
-            )
-        elif tipo_modelo in ['cnn', 'lstm', 'hybrid', 'mlp_tabular']:
+            self.model = MLPClassifier(**{
+                'hidden_layer_sizes': (64, 32, 16),
+                'max_iter': 500,
+                'random_state': 42,
+                'early_stopping': True,
+                'validation_fraction': 0.2,
+                **hp
+            })
+        elif tipo_modelo == 'estudante':
+            # Estudante da destilação: floresta rasa, com a latência do Random Forest compilado
+            self.model = RandomForestClassifier(**{
+                'n_estimators': 50,
+                'max_depth': 8,
+                'min_samples_leaf': 2,
+                'random_state': 42,
+                'n_jobs': -1,
+                **hp
+            })
+        elif tipo_modelo == 'sgd':
+            # Regressão logística por SGD: atualizável com partial_fit (aprendizado online)
+            self.model = SGDClassifier(**{
+                'loss': 'log_loss',
+                'alpha': 1e-4,
+                'random_state': 42,
+                **hp
+            })
+        elif tipo_modelo == 'mlp_online':
+            # MLP sklearn sem early stopping, que o partial_fit não aceita
+            self.model = MLPClassifier(**{
+                'hidden_layer_sizes': (32, 16),
+                'max_iter': 500,
+                'random_state': 42,
+                **hp
+            })
+        elif tipo_modelo in ['cnn', 'lstm', 'hybrid', 'mlp_tabular', 'cnn_bruto']:
             # Para modelos TensorFlow/Keras - criaremos dinamicamente no treino
             self.tipo_modelo_keras = tipo_modelo
             self.model = None  # Será criado no treino com input shape correto
         else:
-            raise ValueError("Tipo de modelo deve ser 'random_forest', 'mlp', 'cnn', 'lstm', 'hybrid', ou 'mlp_tabular'")
+            raise ValueError("Tipo de modelo deve ser 'random_forest', 'estudante', 'mlp', 'sgd', 'mlp_online', 'cnn', 'lstm', 'hybrid', 'mlp_tabular' ou 'cnn_bruto'")
         
         print("✅ Modelo criado com sucesso!")
     
+    def _dropout(self, taxa_padrao):
+        """Taxa de Dropout: a dos hiperparâmetros, se definida, substitui a padrão da camada"""
+        return self.hiperparametros.get('dropout', taxa_padrao)
+    
+    def _otimizador(self):
+        """Adam com a taxa de aprendizado dos hiperparâmetros (padrão 3e-4)"""
+        return Adam(learning_rate=self.hiperparametros.get('learning_rate', 3e-4))
+    
     def _criar_modelo_keras(self, tipo_modelo, n_features):
         """
         Cria modelos usando TensorFlow/Keras com input shape dinâmico
@@ -287,6 +542,8 @@ class EEGClassifier:
             return self._criar_hybrid(n_features)
         elif tipo_modelo == 'mlp_tabular':
             return self._criar_mlp_tabular(n_features)
+        elif tipo_modelo == 'cnn_bruto':
+            return self._criar_cnn_bruto(n_features)
     
     def _criar_mlp_tabular(self, n_features):
         """
@@ -296,16 +553,16 @@ class EEGClassifier:
             Input(shape=(n_features,)),
             Dense(64, activation='relu'),
             BatchNormalization(),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             Dense(32, activation='relu'),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             Dense(16, activation='relu'),
-            Dropout(0.2),
+            Dropout(self._dropout(0.2)),
             Dense(1, activation='sigmoid')
         ])
         
         model.compile(
-            optimizer=Adam(learning_rate=3e-4),
+            optimizer=self._otimizador(),
             loss='binary_crossentropy',
             metrics=['accuracy', tf.keras.metrics.AUC(name='auc')]
         )
@@ -322,20 +579,20 @@ class EEGClassifier:
             Conv1D(32, 3, activation='relu', padding='same'),
             BatchNormalization(),
             MaxPooling1D(2),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             
             Conv1D(64, 3, activation='relu', padding='same'),
             BatchNormalization(),
             GlobalAveragePooling1D(),
-            Dropout(0.4),
+            Dropout(self._dropout(0.4)),
             
             Dense(32, activation='relu', kernel_regularizer=tf.keras.regularizers.l2(1e-4)),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             Dense(1, activation='sigmoid')
         ])
         
         model.compile(
-            optimizer=Adam(learning_rate=3e-4),
+            optimizer=self._otimizador(),
             loss='binary_crossentropy',
             metrics=['accuracy', tf.keras.metrics.AUC(name='auc')]
         )
@@ -349,14 +606,14 @@ class EEGClassifier:
         model = Sequential([
             Input(shape=(n_features, 1)),
             LSTM(32, return_sequences=False),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             Dense(32, activation='relu'),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             Dense(1, activation='sigmoid')
         ])
         
         model.compile(
-            optimizer=Adam(learning_rate=3e-4),
+            optimizer=self._otimizador(),
             loss='binary_crossentropy',
             metrics=['accuracy', tf.keras.metrics.AUC(name='auc')]
         )
@@ -377,43 +634,90 @@ class EEGClassifier:
             
             # Camada LSTM para processamento temporal
             LSTM(64, return_sequences=True),
-            Dropout(0.2),
+            Dropout(self._dropout(0.2)),
             LSTM(32, return_sequences=False),
-            Dropout(0.2),
+            Dropout(self._dropout(0.2)),
             
             # Camadas densas para classificação
             Dense(64, activation='relu'),
-            Dropout(0.3),
+            Dropout(self._dropout(0.3)),
             Dense(32, activation='relu'),
             Dense(1, activation='sigmoid')
         ])
         
         model.compile(
-            optimizer=Adam(learning_rate=3e-4),
+            optimizer=self._otimizador(),
             loss='binary_crossentropy',
             metrics=['accuracy', tf.keras.metrics.AUC(name='auc')]
         )
         
         return model
     
+    def _criar_cnn_bruto(self, tamanho_janela):
+        """
+        Cria uma CNN 1D para janelas do sinal bruto (tamanho_janela amostras normalizadas)
+        """
+        model = Sequential([
+            Input(shape=(tamanho_janela, 1)),
+            # Filtros largos e stride no início: a janela tem centenas de amostras
+            Conv1D(16, 7, strides=2, activation='relu', padding='same'),
+            BatchNormalization(),
+            MaxPooling1D(2),
+            Dropout(self._dropout(0.2)),
+            
+            Conv1D(32, 5, activation='relu', padding='same'),
+            BatchNormalization(),
+            MaxPooling1D(2),
+            Dropout(self._dropout(0.2)),
+            
+            Conv1D(64, 3, activation='relu', padding='same'),
+            BatchNormalization(),
+            GlobalAveragePooling1D(),
+            Dropout(self._dropout(0.3)),
+            
+            Dense(32, activation='relu', kernel_regularizer=tf.keras.regularizers.l2(1e-4)),
+            Dense(1, activation='sigmoid')
+        ])
+        
+        model.compile(
+            optimizer=self._otimizador(),
+            loss='binary_crossentropy',
+            metrics=['accuracy', tf.keras.metrics.AUC(name='auc')]
+        )
+        
+        return model
+    
+    @property
+    def usa_sinal_bruto(self):
+        """Se o modelo classifica janelas do sinal bruto em vez da matriz de features"""
+        return self.tipo_modelo_keras == 'cnn_bruto'
+    
     def treinar_modelo(self, X, y, validation_split=0.2):
         """
         Treina o modelo com os dados fornecidos
         
         Args:
-            X (np.array): Features de entrada
+            X (np.array): Features de entrada (ArmazemSinais no 'cnn_bruto')
             y (np.array): Labels de saída
             validation_split (float): Proporção para validação
         """
+        if self.usa_sinal_bruto:
+            if not isinstance(X, sinais_brutos.ArmazemSinais):
+                print("❌ O modelo cnn_bruto treina com um ArmazemSinais (criar_armazem_sinais)")
+                return
+            self.versao = None
+            return self._treinar_sinais_brutos(X, validation_split)
+        
         if X is None or y is None or len(X) == 0:
             print("❌ Dados de treinamento inválidos")
             return
         
         print(f"🚀 Iniciando treinamento com {len(X)} amostras...")
+        self.versao = None  # Modelo novo: a versão é definida ao salvar
         
         # Verifica se é modelo sklearn ou keras
         if self.tipo_modelo_keras is not None:  # Modelo Keras
-            self._treinar_keras(X, y, validation_split)
+            return self._treinar_keras(X, y, validation_split)
         else:  # Modelo sklearn
             self._treinar_sklearn(X, y, validation_split)
     
@@ -430,7 +734,8 @@ class EEGClassifier:
                 return
             
             # Escala os dados
-            X_scaled = self.scaler.fit_transform(X)
+            with self._fase('escala', len(X)):
+                X_scaled = self._escalar(X, ajustar=True)
             
             # Split treino/validação (sem stratify se apenas uma classe)
             if len(unique_classes) >= 2:
@@ -445,11 +750,13 @@ class EEGClassifier:
             print(f"📊 Treinando com {len(X_train)} amostras, validando com {len(X_val)}")
             
             # Treina o modelo
-            self.model.fit(X_train, y_train)
+            with self._fase('ajuste', len(X_train)):
+                self.model.fit(X_train, y_train)
             
             # Avalia
-            y_pred = self.model.predict(X_val)
-            y_pred_proba = self.model.predict_proba(X_val)[:, 1]
+            with self._fase('avaliacao', len(X_val)):
+                y_pred = self.model.predict(X_val)
+                y_pred_proba = self.model.predict_proba(X_val)[:, 1]
             
             # Métricas
             acc = accuracy_score(y_val, y_pred)
@@ -464,6 +771,7 @@ class EEGClassifier:
             print(f"   F1-Score: {f1:.4f}")
             
             self.is_trained = True
+            self._compilar_floresta()
             print("✅ Modelo sklearn treinado com sucesso!")
             
         except Exception as e:
@@ -474,6 +782,7 @@ class EEGClassifier:
         """
         Treina modelos Keras (CNN, LSTM, MLP Tabular)
         """
+        prefixo_cache = None
         try:
             # Verifica se há pelo menos 2 classes
             unique_classes = np.unique(y)
@@ -482,36 +791,40 @@ class EEGClassifier:
                 self.is_trained = False
                 return
             
-            y = y.astype('float32')
+            y = np.asarray(y).astype('float32')
             n_samples, n_features = X.shape
+            canal = self.tipo_modelo_keras != 'mlp_tabular'  # CNN/LSTM/Hybrid: (samples, features, 1)
             
             print(f"📊 Treinando modelo Keras: {n_samples} amostras, {n_features} features")
             
-            # Escala os dados
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # Reshape baseado no tipo de modelo
-            if self.tipo_modelo_keras == 'mlp_tabular':
-                # MLP tabular usa features diretamente
-                X_reshaped = X_scaled
-            else:
-                # CNN/LSTM/Hybrid usa (samples, timesteps, features)
-                X_reshaped = X_scaled.reshape(n_samples, n_features, 1)
-            
             # Cria modelo com input shape correto
             if self.model is None:
                 self.model = self._criar_modelo_keras(self.tipo_modelo_keras, n_features)
-                print(f"✅ Modelo {self.tipo_modelo_keras} criado com input shape: {X_reshaped.shape}")
+                formato = (n_features, 1) if canal else (n_features,)
+                print(f"✅ Modelo {self.tipo_modelo_keras} criado com input shape: {formato}")
             
-            # Split treino/validação (sem stratify se apenas uma classe)
-            if len(unique_classes) >= 2:
-                X_train, X_val, y_train, y_val = train_test_split(
-                    X_reshaped, y, test_size=validation_split, random_state=42, stratify=y
-                )
-            else:
-                X_train, X_val, y_train, y_val = train_test_split(
-                    X_reshaped, y, test_size=validation_split, random_state=42
-                )
+            # Split treino/validação por índice: armazéns em disco não são copiados
+            idx_train, idx_val = train_test_split(
+                np.arange(n_samples), test_size=validation_split, random_state=42, stratify=y
+            )
+            
+            # Scaler ajustado nas amostras (em blocos se X está em disco); a escala é aplicada no pipeline
+            with self._fase('escala', n_samples):
+                pipeline_dados.ajustar_scaler(self.scaler, X)
+            batch_size = self.hiperparametros.get('batch_size', config.KERAS_BATCH_SIZE)
+            # Cache em arquivo com prefixo próprio deste ajuste: treinos em paralelo não apagam
+            # nem leem os arquivos uns dos outros
+            if config.TFDATA_CACHE:
+                prefixo_cache = f"{config.TFDATA_CACHE}_{self.tipo_modelo_keras}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+            cache_treino = f"{prefixo_cache}_treino" if prefixo_cache else True
+            cache_val = f"{prefixo_cache}_validacao" if prefixo_cache else True
+            dados_train = pipeline_dados.criar_pipeline(
+                X, y, idx_train, self.scaler, canal, batch_size, embaralhar=True, cache=cache_treino
+            )
+            dados_val = pipeline_dados.criar_pipeline(
+                X, y, idx_val, self.scaler, canal, batch_size, cache=cache_val
+            )
+            y_val = y[idx_val]
             
             # Callbacks para otimização
             early_stopping = EarlyStopping(
@@ -529,19 +842,21 @@ class EEGClassifier:
             )
             
             # Treina o modelo
-            history = self.model.fit(
-                X_train, y_train,
-                epochs=200,
-                batch_size=8,  # Batch menor para dataset pequeno
-                validation_data=(X_val, y_val),
-                callbacks=[early_stopping, reduce_lr],
-                verbose=1
-            )
+            with self._fase('ajuste', len(idx_train)):
+                history = self.model.fit(
+                    dados_train,
+                    epochs=self.hiperparametros.get('epochs', 200),
+                    validation_data=dados_val,
+                    callbacks=[early_stopping, reduce_lr, *self.callbacks_treino, *self._callbacks_perfil(len(idx_train))],
+                    verbose=1
+                )
             
             self.is_trained = True
+            self._exportar_mlp_numpy()
             
             # Avalia o modelo
-            y_pred_proba = self.model.predict(X_val).ravel()
+            with self._fase('avaliacao', len(idx_val)):
+                y_pred_proba = self.model.predict(dados_val, verbose=0).ravel()
             y_pred = (y_pred_proba > 0.5).astype(int)
             
             acc = accuracy_score(y_val, y_pred)
@@ -558,10 +873,325 @@ class EEGClassifier:
             print(f"   Val Loss final: {history.history['val_loss'][-1]:.4f}")
             
             print(f"✅ Modelo {self.tipo_modelo_keras} treinado com sucesso!")
+            return {'history': history.history, 'accuracy': acc, 'precision': precision, 'recall': recall, 'f1': f1}
             
         except Exception as e:
             print(f"❌ Erro no treinamento Keras: {str(e)}")
             self.is_trained = False
+        finally:
+            if prefixo_cache:
+                pipeline_dados.remover_cache(prefixo_cache)
+    
+    def treinar_alvos_suaves(self, X, probabilidades):
+        """
+        Treina um modelo sklearn com probabilidades (alvos suaves) em vez de classes
+        
+        Cada amostra entra como positiva com peso p e como negativa com peso 1 - p,
+        o que minimiza a entropia cruzada contra as probabilidades do professor.
+        
+        Args:
+            X (np.array): Features
+            probabilidades (np.array): Probabilidade da classe positiva de cada amostra
+        """
+        try:
+            probabilidades = np.clip(np.asarray(probabilidades, dtype=np.float64), 0.0, 1.0)
+            with self._fase('escala', len(X)):
+                X_scaled = self._escalar(X, ajustar=True)
+            n = len(X_scaled)
+            
+            with self._fase('ajuste', n):
+                self.model.fit(
+                    np.concatenate([X_scaled, X_scaled]),
+                    np.concatenate([np.ones(n, dtype=int), np.zeros(n, dtype=int)]),
+                    sample_weight=np.concatenate([probabilidades, 1.0 - probabilidades])
+                )
+            self.versao = None
+            self.is_trained = True
+            self._compilar_floresta()
+            print(f"✅ Modelo treinado com alvos suaves em {n} amostras")
+            
+        except Exception as e:
+            print(f"❌ Erro no treinamento com alvos suaves: {str(e)}")
+            self.is_trained = False
+    
+    def _treinar_sinais_brutos(self, armazem, validation_split=0.2):
+        """
+        Treina a CNN de sinais brutos com janelas geradas do armazém em disco
+        
+        A divisão treino/validação é por sinal; as métricas finais são por sinal
+        (média das probabilidades das janelas de cada sinal de validação).
+        """
+        try:
+            tamanho = int(self.hiperparametros.get('tamanho_janela', config.RAW_WINDOW_SIZE))
+            batch_size = int(self.hiperparametros.get('batch_size', config.RAW_BATCH_SIZE))
+            elegiveis = sinais_brutos.indices_elegiveis(armazem, np.arange(len(armazem)), tamanho)
+            rotulos = armazem.rotulos[elegiveis]
+            
+            unique_classes = np.unique(rotulos)
+            if len(unique_classes) < 2:
+                print(f"❌ Sinais com janela de {tamanho} amostras têm apenas uma classe: {unique_classes}")
+                self.is_trained = False
+                return
+            
+            idx_train, idx_val = train_test_split(
+                elegiveis, test_size=validation_split, random_state=42, stratify=rotulos
+            )
+            passos = int(self.hiperparametros.get(
+                'passos_por_epoca', sinais_brutos.passos_por_epoca(armazem, idx_train, tamanho, batch_size)))
+            print(f"📊 Treinando cnn_bruto: {len(idx_train)} sinais de treino, {len(idx_val)} de validação, "
+                  f"janelas de {tamanho} amostras, {passos} lotes de {batch_size} por época")
+            
+            if self.model is None:
+                self.model = self._criar_modelo_keras('cnn_bruto', tamanho)
+            self.feature_names = []
+            
+            dados_train = sinais_brutos.dataset_janelas(
+                lambda: sinais_brutos.gerar_lotes_aleatorios(armazem, idx_train, tamanho, batch_size), tamanho)
+            # Validação finita com cardinalidade conhecida: o Keras percorre todos os lotes a
+            # cada época, sem o aviso de dados esgotados
+            dados_val = sinais_brutos.dataset_janelas(
+                lambda: sinais_brutos.gerar_lotes_fixos(armazem, idx_val, tamanho, config.RAW_WINDOW_OVERLAP, batch_size),
+                tamanho,
+                sinais_brutos.lotes_fixos(armazem, idx_val, tamanho, config.RAW_WINDOW_OVERLAP, batch_size))
+            
+            with self._fase('ajuste', passos * batch_size):
+                history = self.model.fit(
+                    dados_train,
+                    steps_per_epoch=passos,
+                    epochs=self.hiperparametros.get('epochs', 200),
+                    validation_data=dados_val,
+                    callbacks=[
+                        EarlyStopping(monitor='val_loss', patience=15, restore_best_weights=True, min_delta=0.001),
+                        ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-7, verbose=1),
+                        *self.callbacks_treino,
+                        *self._callbacks_perfil(passos * batch_size)
+                    ],
+                    verbose=1
+                )
+            self.is_trained = True
+            
+            # Métricas por sinal
+            y_val = armazem.rotulos[idx_val]
+            with self._fase('avaliacao', len(idx_val)):
+                y_pred_proba = np.array([
+                    sinais_brutos.prever_janelas(self.model, armazem.sinal(i), tamanho, config.RAW_WINDOW_OVERLAP)
+                    for i in idx_val
+                ])
+            y_pred = (y_pred_proba > 0.5).astype(int)
+            acc = accuracy_score(y_val, y_pred)
+            precision = precision_score(y_val, y_pred, zero_division=0)
+            recall = recall_score(y_val, y_pred, zero_division=0)
+            f1 = f1_score(y_val, y_pred, zero_division=0)
+            
+            print("\n📊 RESULTADOS DO TREINAMENTO (CNN SINAIS BRUTOS, POR SINAL):")
+            print(f"   Acurácia: {acc:.4f}")
+            print(f"   Precisão: {precision:.4f}")
+            print(f"   Recall: {recall:.4f}")
+            print(f"   F1-Score: {f1:.4f}")
+            print(f"   Épocas: {len(history.history['loss'])}")
+            
+            print("✅ Modelo cnn_bruto treinado com sucesso!")
+            return {'history': history.history, 'accuracy': acc, 'precision': precision, 'recall': recall, 'f1': f1}
+            
+        except Exception as e:
+            print(f"❌ Erro no treinamento cnn_bruto: {str(e)}")
+            self.is_trained = False
+    
+    @property
+    def suporta_online(self):
+        """Se o modelo aceita atualização incremental (partial_fit)"""
+        return self.tipo_modelo_keras is None and hasattr(self.model, 'partial_fit')
+    
+    def atualizar_online(self, X, y):
+        """
+        Atualiza o modelo com novas amostras rotuladas, sem retreinar do zero
+        
+        O StandardScaler é atualizado com partial_fit (médias e variâncias acumuladas)
+        antes do passo de partial_fit do modelo.
+        
+        Args:
+            X (np.array): Features (n_amostras, n_features) na ordem de self.feature_names
+            y (np.array): Rótulos (1 = 'Sim', 0 = 'Não')
+        """
+        if not self.suporta_online:
+            raise ValueError("O modelo atual não suporta atualização online (partial_fit)")
+        
+        X = np.asarray(X, dtype=config.PIPELINE_DTYPE)
+        self.scaler.partial_fit(X)
+        self.model.partial_fit(self._escalar(X), np.asarray(y), classes=np.array([0, 1]))
+        self.is_trained = True
+        self.versao = None  # Modelo alterado: a versão é definida ao salvar
+    
+    def _acuracia_holdout(self):
+        """Acurácia do Random Forest no holdout do modo incremental (None sem holdout)"""
+        estado = self.estado_incremental
+        if estado is None or len(estado['y_holdout']) == 0:
+            return None
+        probabilidades = self.prever_matriz(estado['X_holdout'])
+        return float(accuracy_score(estado['y_holdout'], (probabilidades >= 0.5).astype(int)))
+    
+    def treinar_floresta_completa(self, X, y, ids_sinais):
+        """
+        Ajusta o Random Forest do zero fora do holdout e inicia o estado incremental
+        
+        Args:
+            X (np.array): Features de todos os sinais rotulados
+            y (np.array): Rótulos
+            ids_sinais (np.array): ID do sinal de cada linha
+            
+        Returns:
+            dict: Registro do ajuste ('modo', 'arvores', 'acuracia_holdout'), ou None se falhou
+        """
+        inicio = time.time()
+        holdout = em_holdout(ids_sinais, config.RF_HOLDOUT_FRACTION)
+        self.criar_modelo('random_forest')
+        self.treinar_modelo(X[~holdout], y[~holdout])
+        if not self.is_trained:
+            return None
+        
+        self.estado_incremental = estado_inicial(X, y, ids_sinais, holdout, config.RF_RECENT_WINDOW, None)
+        self.ids_treino = set(int(id_sinal) for id_sinal in np.asarray(ids_sinais)[~holdout])
+        acuracia = self._acuracia_holdout()
+        self.estado_incremental['acuracia_referencia'] = acuracia
+        registro = {
+            'modo': 'completo',
+            'amostras': int(len(X)),
+            'arvores': len(self.model.estimators_),
+            'acuracia_holdout': acuracia,
+            'duracao_s': round(time.time() - inicio, 3)
+        }
+        self.estado_incremental['historico'].append(registro)
+        return registro
+    
+    def crescer_floresta_incremental(self, X_novos, y_novos, ids_novos):
+        """
+        Cresce o Random Forest com os sinais rotulados novos (warm_start)
+        
+        Os sinais novos do holdout só entram na avaliação; os de treino entram na janela
+        recente, onde são ajustadas config.RF_INCREMENT_TREES árvores novas. As árvores
+        mais antigas além de config.RF_MAX_TREES são aposentadas. O StandardScaler não é
+        reajustado (as árvores antigas dependem dele).
+        
+        Returns:
+            dict: Registro com 'modo' ('incremental') e 'requer_completo' quando a acurácia
+                  no holdout cai mais que config.RF_FALLBACK_TOLERANCE abaixo da referência
+        """
+        estado = self.estado_incremental
+        if estado is None or not isinstance(self.model, RandomForestClassifier) or not self.is_trained:
+            raise ValueError("Random Forest incremental sem ajuste completo anterior")
+        
+        inicio = time.time()
+        X_novos = np.asarray(X_novos, dtype=config.PIPELINE_DTYPE)
+        y_novos = np.asarray(y_novos)
+        ordem = np.argsort(np.asarray(ids_novos), kind='stable')
+        X_novos, y_novos, ids_novos = X_novos[ordem], y_novos[ordem], np.asarray(ids_novos)[ordem]
+        holdout = em_holdout(ids_novos, config.RF_HOLDOUT_FRACTION)
+        
+        estado['X_holdout'] = np.concatenate((estado['X_holdout'], X_novos[holdout]))
+        estado['y_holdout'] = np.concatenate((estado['y_holdout'], y_novos[holdout]))
+        estado['X_janela'] = np.concatenate((estado['X_janela'], X_novos[~holdout]))[-config.RF_RECENT_WINDOW:]
+        estado['y_janela'] = np.concatenate((estado['y_janela'], y_novos[~holdout]))[-config.RF_RECENT_WINDOW:]
+        estado['ids'].update(int(id_sinal) for id_sinal in ids_novos)
+        if self.ids_treino is not None:
+            self.ids_treino.update(int(id_sinal) for id_sinal in ids_novos[~holdout])
+        
+        aposentadas = 0
+        novas_arvores = 0
+        if (~holdout).any() and len(np.unique(estado['y_janela'])) == 2:
+            estado['rodadas'] = estado.get('rodadas', 0) + 1
+            with self._fase('crescimento', len(estado['y_janela'])):
+                aposentadas = crescer_floresta(self.model, self._escalar(estado['X_janela']), estado['y_janela'],
+                                               config.RF_INCREMENT_TREES, config.RF_MAX_TREES, estado['rodadas'])
+            novas_arvores = config.RF_INCREMENT_TREES
+            self.versao = None
+            self._compilar_floresta()
+        
+        acuracia = self._acuracia_holdout()
+        referencia = estado['acuracia_referencia']
+        registro = {
+            'modo': 'incremental',
+            'novos': int(len(ids_novos)),
+            'novos_holdout': int(holdout.sum()),
+            'amostras_janela': int(len(estado['y_janela'])),
+            'arvores_novas': novas_arvores,
+            'arvores_aposentadas': aposentadas,
+            'arvores': len(self.model.estimators_),
+            'acuracia_holdout': acuracia,
+            'acuracia_referencia': referencia,
+            'requer_completo': (acuracia is not None and referencia is not None
+                                and acuracia < referencia - config.RF_FALLBACK_TOLERANCE),
+            'duracao_s': round(time.time() - inicio, 3)
+        }
+        estado['historico'].append(registro)
+        return registro
+    
+    def buscar_sinais_rotulados(self):
+        """IDs e categorias reais ('S'/'N') dos sinais aprovados na triagem de qualidade"""
+        conexao = self.obter_conexao_db()
+        cursor = conexao.cursor()
+        cursor.execute("""
+            SELECT s.id, u.possui
+            FROM sinais s
+            JOIN usuarios u ON s.idusuario = u.id
+            WHERE u.possui IN ('S', 'N')
+              AND COALESCE(s.flags_qualidade, 0) = 0
+        """)
+        rotulados = cursor.fetchall()
+        cursor.close()
+        conexao.close()
+        return rotulados
+    
+    def retreinar_floresta(self, completo=False, log=print):
+        """
+        Retreina o Random Forest no modo incremental: só os sinais rotulados que o modelo
+        ainda não viu têm as features extraídas e viram árvores novas. Sem estado
+        incremental (modelo antigo), com completo=True ou quando a acurácia no holdout
+        cai, a floresta é refeita do zero com todos os sinais rotulados. Sinais já vistos
+        que mudaram de categoria real só entram no próximo ajuste completo.
+        
+        Returns:
+            dict: Registro do retreino, ou None se falhou
+        """
+        try:
+            registro = None
+            if not completo and self.estado_incremental is not None and self.is_trained:
+                novos = {id_sinal: possui for id_sinal, possui in self.buscar_sinais_rotulados()
+                         if id_sinal not in self.estado_incremental['ids']}
+                if not novos:
+                    log("✅ Nenhum sinal rotulado novo: Random Forest mantido")
+                    return {'modo': 'sem_novos', 'arvores': len(self.model.estimators_),
+                            'acuracia_holdout': self._acuracia_holdout()}
+                
+                log(f"🌱 {len(novos)} sinais rotulados novos: extraindo features")
+                with self._fase('features', len(novos)):
+                    ids_validos, X_novos = self.extrair_features_lote(self.obter_valores_sinais(list(novos)))
+                # Reprovados na extração também contam como vistos (não são reprocessados)
+                self.estado_incremental['ids'].update(novos)
+                if not ids_validos:
+                    log("⚠️ Nenhum sinal novo aprovado na extração: Random Forest mantido")
+                    return {'modo': 'sem_novos', 'arvores': len(self.model.estimators_),
+                            'acuracia_holdout': self._acuracia_holdout()}
+                y_novos = np.array([1 if novos[id_sinal] == 'S' else 0 for id_sinal in ids_validos])
+                registro = self.crescer_floresta_incremental(X_novos, y_novos, ids_validos)
+                log(f"🌲 +{registro['arvores_novas']} árvores, -{registro['arvores_aposentadas']} aposentadas "
+                    f"({registro['arvores']} no total), acurácia no holdout {registro['acuracia_holdout']}")
+                if not registro['requer_completo']:
+                    return registro
+                log(f"⚠️ Acurácia no holdout caiu abaixo de {registro['acuracia_referencia']:.4f}: refazendo a floresta")
+            
+            X, y, _ = self.criar_dataset(limite=None)
+            if X is None or self.ids_dataset is None:
+                log("❌ Dataset de treinamento indisponível")
+                return None
+            completo_registro = self.treinar_floresta_completa(X, y, self.ids_dataset)
+            if completo_registro is not None:
+                completo_registro['motivo'] = 'queda_holdout' if registro else ('pedido' if completo else 'sem_estado')
+                log(f"🌳 Random Forest refeito com {completo_registro['amostras']} sinais, "
+                    f"acurácia no holdout {completo_registro['acuracia_holdout']}")
+            return completo_registro
+        except Exception as e:
+            log(f"❌ Erro no retreino incremental do Random Forest: {e}")
+            return None
     
     def avaliar_modelo(self, X, y):
         """
@@ -574,9 +1204,8 @@ class EEGClassifier:
         if not self.is_trained:
             raise ValueError("Modelo não foi treinado ainda!")
         
-        X_scaled = self.scaler.transform(X)
-        y_pred = self.model.predict(X_scaled)
-        y_pred_proba = self.model.predict_proba(X_scaled)[:, 1]  # Probabilidade da classe positiva
+        y_pred_proba = self.prever_matriz(X)  # Probabilidade da classe positiva (sklearn ou pipeline Keras)
+        y_pred = (y_pred_proba > 0.5).astype(int)
         
         print("\n🎯 AVALIAÇÃO DO MODELO:")
         print(f"Acurácia: {accuracy_score(y, y_pred):.4f}")
@@ -609,6 +1238,9 @@ class EEGClassifier:
         Faz predição para um sinal específico
         """
         try:
+            if self.usa_sinal_bruto:
+                return self.prever_valores_lote({id_sinal: self.obter_valores_sinal(id_sinal)})[id_sinal]
+            
             # Extrair features do sinal
             features = self.extrair_features_sinal(id_sinal)
             if features is None:
@@ -620,6 +1252,201 @@ class EEGClassifier:
             print(f"❌ Erro na predição do sinal {id_sinal}: {e}")
             return None
 
+    def _compilar_floresta(self):
+        """Compila o Random Forest em arrays numpy (outros modelos usam o caminho normal)"""
+        self.floresta_compilada = None
+        if isinstance(self.model, RandomForestClassifier):
+            try:
+                self.floresta_compilada = compilar_floresta(self.model)
+            except Exception as e:
+                print(f"⚠️ Não foi possível compilar o Random Forest: {e}")
+    
+    def _exportar_mlp_numpy(self):
+        """Exporta o mlp_tabular para o motor numpy (outros modelos usam o caminho normal)"""
+        self.mlp_numpy = None
+        if self.tipo_modelo_keras == 'mlp_tabular' and self.model is not None:
+            try:
+                self.mlp_numpy = MLPNumpy.de_modelo(self.model, self.scaler, self.feature_names)
+            except Exception as e:
+                print(f"⚠️ Não foi possível exportar o MLP Tabular para numpy: {e}")
+    
+    def _escalar(self, X, ajustar=False):
+        """
+        Aplica o StandardScaler no dtype do pipeline (config.PIPELINE_DTYPE), evitando
+        conversões implícitas para float64 e de volta para float32 no Keras
+        """
+        X = np.asarray(X, dtype=config.PIPELINE_DTYPE)
+        X_scaled = self.scaler.fit_transform(X) if ajustar else self.scaler.transform(X)
+        return X_scaled.astype(config.PIPELINE_DTYPE, copy=False)
+    
+    def prever_matriz(self, X):
+        """
+        Calcula a probabilidade da classe positiva para cada linha de uma matriz de features
+        com uma única chamada ao modelo
+        
+        Args:
+            X (np.array): Matriz (n_amostras, n_features)
+            
+        Returns:
+            np.array: Probabilidades (n_amostras,)
+        """
+        if len(X) == 0:
+            return np.empty(0)
+        if self.usa_sinal_bruto:
+            raise ValueError("O modelo cnn_bruto classifica sinais brutos (prever_valores_lote), não features")
+        
+        # mlp_tabular exportado: scaler e forward pass em numpy, sem chamar o TensorFlow
+        if self.mlp_numpy is not None and not pipeline_dados.em_disco(X):
+            return self.mlp_numpy.prever_matriz(X)
+        
+        # Armazém em disco: lotes lidos do memmap e escalados no pipeline tf.data
+        if self.tipo_modelo_keras is not None and pipeline_dados.em_disco(X):
+            dados = pipeline_dados.criar_pipeline(
+                X, scaler=self.scaler, canal=self.tipo_modelo_keras != 'mlp_tabular',
+                batch_size=config.TFDATA_READ_BLOCK, cache=False
+            )
+            return self.model.predict(dados, verbose=0).ravel()
+        
+        X_scaled = self._escalar(X)
+        
+        if self.tipo_modelo_keras is not None:
+            if self.tipo_modelo_keras == 'mlp_tabular':
+                # MLP Tabular: usar shape (n_samples, n_features)
+                X_reshaped = X_scaled
+            else:
+                # CNN/LSTM/Hybrid: usar shape (n_samples, n_features, 1)
+                X_reshaped = X_scaled.reshape(X_scaled.shape[0], X_scaled.shape[1], 1)
+            
+            return self.model.predict(X_reshaped, verbose=0).ravel()
+        
+        if self.floresta_compilada is not None:
+            return self.floresta_compilada.predict_proba(X_scaled)[:, 1]
+        
+        return self.model.predict_proba(X_scaled)[:, 1]
+    
+    def prever_lote(self, ids_sinais):
+        """
+        Faz a predição de vários sinais com uma consulta ao banco, um transform do
+        scaler e uma única chamada ao modelo
+        
+        Args:
+            ids_sinais (list): IDs dos sinais
+            
+        Returns:
+            dict: {id_sinal: predição no formato de prever_sinal, ou None}
+        """
+        resultados = {id_sinal: None for id_sinal in ids_sinais}
+        try:
+            if not self.is_trained:
+                print("⚠️ Modelo não está treinado")
+                return resultados
+            
+            valores = self.obter_valores_sinais(ids_sinais)
+            if self.usa_sinal_bruto:
+                resultados.update(self.prever_valores_lote(valores))
+                return resultados
+            ids_validos, X = self.extrair_features_lote(valores)
+            resultados.update(self.prever_features_lote(ids_validos, X))
+            return resultados
+            
+        except Exception as e:
+            print(f"❌ Erro na predição em lote: {e}")
+            return resultados
+    
+    def prever_features_lote(self, ids_sinais, X):
+        """
+        Faz a predição de uma matriz de features já extraída (colunas na ordem de
+        self.feature_names) com uma única chamada ao modelo
+        
+        Returns:
+            dict: {id_sinal: predição no formato de prever_sinal}
+        """
+        if len(ids_sinais) == 0:
+            return {}
+        
+        nomes = self.feature_names or NOMES_FEATURES
+        probabilidades = self.prever_matriz(X)
+        return {
+            id_sinal: {
+                'classe_predita': 'Sim' if probabilidade >= 0.5 else 'Não',
+                'probabilidade': float(probabilidade),
+                'features': {nome: float(valor) for nome, valor in zip(nomes, linha)}
+            }
+            for id_sinal, linha, probabilidade in zip(ids_sinais, X, probabilidades)
+        }
+    
+    def prever_valores_lote(self, valores_por_id):
+        """
+        Faz a predição do 'cnn_bruto' a partir dos valores brutos: média das janelas de cada sinal
+        
+        Returns:
+            dict: {id_sinal: predição no formato de prever_sinal, ou None (triagem ou sinal curto)}
+        """
+        tamanho = int(self.hiperparametros.get('tamanho_janela', config.RAW_WINDOW_SIZE))
+        resultados = {}
+        for id_sinal, valores in valores_por_id.items():
+            resultados[id_sinal] = None
+            qualidade = avaliar_qualidade(valores)
+            if not qualidade['valido']:
+                print(f"Sinal {id_sinal}: reprovado na triagem de qualidade ({', '.join(qualidade['motivos'])})")
+                continue
+            probabilidade = sinais_brutos.prever_janelas(self.model, valores, tamanho, config.RAW_WINDOW_OVERLAP)
+            if probabilidade is None:
+                print(f"Sinal {id_sinal}: menor que a janela de {tamanho} amostras")
+                continue
+            resultados[id_sinal] = {
+                'classe_predita': 'Sim' if probabilidade >= 0.5 else 'Não',
+                'probabilidade': probabilidade,
+                'features': {}
+            }
+        return resultados
+    
+    def prever_epocas(self, valores, tamanho_epoca=None, sobreposicao=None):
+        """
+        Classifica cada época de um sinal longo, gerando uma linha do tempo de predições
+        
+        Returns:
+            dict: Início de cada época, probabilidades e classes preditas, ou None
+        """
+        try:
+            if not self.is_trained:
+                print("⚠️ Modelo não está treinado")
+                return None
+            
+            tamanho_epoca = tamanho_epoca or config.EPOCH_SIZE
+            sobreposicao = config.EPOCH_OVERLAP if sobreposicao is None else sobreposicao
+            
+            matriz, inicios = self.extrair_features_epocas(valores, tamanho_epoca, sobreposicao)
+            probabilidades = self.prever_matriz(matriz)
+            
+            return {
+                'tamanho_epoca': int(tamanho_epoca),
+                'sobreposicao': float(sobreposicao),
+                'inicios': inicios.tolist(),
+                'probabilidades': [float(p) for p in probabilidades],
+                'classes_preditas': ['Sim' if p >= 0.5 else 'Não' for p in probabilidades]
+            }
+            
+        except Exception as e:
+            print(f"❌ Erro na predição por épocas: {e}")
+            return None
+    
+    def prever_epocas_sinal(self, id_sinal, tamanho_epoca=None, sobreposicao=None):
+        """
+        Faz a predição por épocas de um sinal do banco
+        """
+        try:
+            valores = self.obter_valores_sinal(id_sinal)
+            if len(valores) == 0:
+                print(f"Sinal {id_sinal}: valores brutos vazios")
+                return None
+            
+            return self.prever_epocas(valores, tamanho_epoca, sobreposicao)
+            
+        except Exception as e:
+            print(f"❌ Erro na predição por épocas do sinal {id_sinal}: {e}")
+            return None
+
     def prever_com_features(self, features):
         """
         Faz predição usando features já extraídas
@@ -629,25 +1456,13 @@ class EEGClassifier:
                 print("⚠️ Modelo não está treinado")
                 return None
             
-            # Preparar dados para predição
-            x = np.array([list(features.values())])
-            
-            if self.tipo_modelo_keras is not None:
-                # Modelo Keras
-                x_scaled = self.scaler.transform(x)
-                
-                if self.tipo_modelo_keras == 'mlp_tabular':
-                    # MLP Tabular: usar shape (n_samples, n_features)
-                    X_reshaped = x_scaled
-                else:
-                    # CNN/LSTM/Hybrid: usar shape (n_samples, n_features, 1)
-                    X_reshaped = x_scaled.reshape(1, x_scaled.shape[1], 1)
-                
-                probabilidade = float(self.model.predict(X_reshaped)[0, 0])
+            # Preparar dados para predição na ordem do treino (modelos antigos não usam
+            # as features de complexidade)
+            if self.feature_names:
+                x = np.array([[features[nome] for nome in self.feature_names]])
             else:
-                # Modelo sklearn
-                x_scaled = self.scaler.transform(x)
-                probabilidade = float(self.model.predict_proba(x_scaled)[0, 1])
+                x = np.array([list(features.values())])
+            probabilidade = float(self.prever_matriz(x)[0])
             
             # Determinar classe
             classe_predita = 'Sim' if probabilidade >= 0.5 else 'Não'
@@ -680,13 +1495,25 @@ class EEGClassifier:
                 'scaler': self.scaler,
                 'feature_names': self.feature_names,
                 'is_trained': self.is_trained,
-                'tipo_modelo_keras': self.tipo_modelo_keras
+                'tipo_modelo_keras': self.tipo_modelo_keras,
+                'estado_incremental': self.estado_incremental,
+                'ids_treino': self.ids_treino,
+                'hiperparametros': self.hiperparametros
             }
             
-            with open(caminho_arquivo, 'wb') as f:
-                pickle.dump(modelo_info, f)
+            # Escrita atômica: quem carrega o arquivo nunca vê um modelo pela metade
+            dados = pickle.dumps(modelo_info)
+            temporario = f"{caminho_arquivo}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(dados)
+            os.replace(temporario, caminho_arquivo)
+            self.versao = calcular_versao(dados)
             
-            print(f"✅ Modelo salvo em: {caminho_arquivo}")
+            # Pesos em .npz para servir o mlp_tabular sem TensorFlow
+            if self.mlp_numpy is not None:
+                self.mlp_numpy.salvar(os.path.splitext(caminho_arquivo)[0] + '.npz')
+            
+            print(f"✅ Modelo salvo em: {caminho_arquivo} (versão {self.versao})")
             return True
             
         except Exception as e:
@@ -709,21 +1536,99 @@ class EEGClassifier:
                 return False
             
             with open(caminho_arquivo, 'rb') as f:
-                modelo_info = pickle.load(f)
+                dados = f.read()
+            modelo_info = pickle.loads(dados)
             
             self.model = modelo_info['model']
             self.scaler = modelo_info['scaler']
             self.feature_names = modelo_info['feature_names']
             self.is_trained = modelo_info['is_trained']
             self.tipo_modelo_keras = modelo_info.get('tipo_modelo_keras')
-            
-            print(f"✅ Modelo carregado de: {caminho_arquivo}")
+            self.estado_incremental = modelo_info.get('estado_incremental')
+            self.ids_treino = modelo_info.get('ids_treino')
+            self.hiperparametros = modelo_info.get('hiperparametros', self.hiperparametros)
+            self.versao = calcular_versao(dados)
+            self._compilar_floresta()
+            self._exportar_mlp_numpy()
+            
+            print(f"✅ Modelo carregado de: {caminho_arquivo} (versão {self.versao})")
             return True
             
         except Exception as e:
             print(f"❌ Erro ao carregar modelo: {str(e)}")
             return False
 
+def extrair_features_modelos(modelos, ids_sinais, valores_por_id=None):
+    """
+    Busca os valores e extrai, uma única vez, a união das features de vários modelos
+    
+    Args:
+        modelos (iterable): EEGClassifier treinados
+        ids_sinais (list): IDs dos sinais
+        valores_por_id (dict): Valores já em memória {id_sinal: valores}; sem eles, o banco é consultado
+        
+    Returns:
+        tuple: (nomes das colunas na ordem de NOMES_FEATURES, IDs válidos, matriz X)
+    """
+    modelos = list(modelos)
+    necessarias = set()
+    for modelo in modelos:
+        necessarias.update(modelo.feature_names or NOMES_FEATURES)
+    nomes = [nome for nome in NOMES_FEATURES if nome in necessarias]
+    
+    if valores_por_id is None:
+        valores_por_id = modelos[0].obter_valores_sinais(ids_sinais)
+    ids_validos, X = modelos[0].extrair_features_lote(valores_por_id, nomes)
+    return nomes, ids_validos, X
+
+def colunas_modelo(nomes, modelo):
+    """Índices, em uma matriz com as colunas `nomes`, das features que o modelo conhece"""
+    return [nomes.index(nome) for nome in (modelo.feature_names or NOMES_FEATURES)]
+
+def prever_lote_modelos(modelos, ids_sinais, valores_por_id=None):
+    """
+    Faz a predição de vários modelos para os mesmos sinais, buscando os valores e
+    extraindo as features uma única vez; cada modelo recebe as colunas que conhece
+    
+    Args:
+        modelos (dict): {nome do modelo: EEGClassifier}
+        ids_sinais (list): IDs dos sinais
+        valores_por_id (dict): Valores já em memória (ex.: sinal recém-enviado), sem consultar o banco
+        
+    Returns:
+        dict: {nome do modelo: {id_sinal: predição ou None}} (apenas modelos treinados)
+    """
+    treinados = {nome: modelo for nome, modelo in modelos.items() if modelo and modelo.is_trained}
+    resultados = {nome: {id_sinal: None for id_sinal in ids_sinais} for nome in treinados}
+    if not treinados or not ids_sinais:
+        return resultados
+    
+    if valores_por_id is None:
+        valores_por_id = next(iter(treinados.values())).obter_valores_sinais(ids_sinais)
+    
+    # cnn_bruto: janelas dos valores brutos, sem features
+    por_features = {}
+    for nome_modelo, modelo in treinados.items():
+        if not modelo.usa_sinal_bruto:
+            por_features[nome_modelo] = modelo
+            continue
+        try:
+            resultados[nome_modelo].update(modelo.prever_valores_lote(valores_por_id))
+        except Exception as e:
+            print(f"❌ Erro na predição em lote do modelo {nome_modelo}: {e}")
+    if not por_features:
+        return resultados
+    
+    nomes, ids_validos, X = extrair_features_modelos(por_features.values(), ids_sinais, valores_por_id)
+    
+    for nome_modelo, modelo in por_features.items():
+        try:
+            resultados[nome_modelo].update(modelo.prever_features_lote(ids_validos, X[:, colunas_modelo(nomes, modelo)]))
+        except Exception as e:
+            print(f"❌ Erro na predição em lote do modelo {nome_modelo}: {e}")
+    
+    return resultados
+
 def main():
     """Função principal para treinar e testar o classificador"""
     print("🧠 SISTEMA DE CLASSIFICAÇÃO EEG")
@@ -738,6 +1643,7 @@ def main():
         classifier.criar_modelo(tipo_modelo='random_forest')
         
         resultados = classifier.treinar_modelo(X, y)
+        classifier.ids_treino = set(int(id_sinal) for id_sinal in classifier.ids_dataset)
         
         classifier.avaliar_modelo(X, y)
         
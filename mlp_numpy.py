@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Inferência em numpy puro para o modelo mlp_tabular
+
+exportar_mlp extrai os pesos das camadas Dense e BatchNormalization de um modelo
+Keras sequencial e dobra cada BatchNormalization em uma camada Dense vizinha. No
+mlp_tabular a BatchNormalization vem depois de Dense+relu, então ela é dobrada na
+Dense SEGUINTE (o Dropout é a identidade na inferência): bn(h) = a*h + c, logo
+bn(h) @ W + b = h @ (a[:, None] * W) + (c @ W + b).
+
+O arquivo .npz salvo também leva o scaler e os nomes das features, então um
+processo de serviço pode pontuar com MLPNumpy sem importar o TensorFlow.
+"""
+
+import json
+import numpy as np
+
+def _softmax(z):
+    exponenciais = np.exp(z - z.max(axis=1, keepdims=True))
+    return exponenciais / exponenciais.sum(axis=1, keepdims=True)
+
+ATIVACOES = {
+    'linear': lambda z: z,
+    'relu': lambda z: np.maximum(z, 0.0),
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-z)),
+    'tanh': np.tanh,
+    'softmax': _softmax
+}
+
+# Camadas que não fazem nada na inferência
+CAMADAS_IDENTIDADE = ('Dropout', 'InputLayer', 'GaussianNoise', 'GaussianDropout')
+
+def _afim_batch_normalization(camada):
+    """Converte uma BatchNormalization no par (a, c) de bn(h) = a*h + c"""
+    configuracao = camada.get_config()
+    pesos = camada.get_weights()
+    # Ordem dos pesos: [gamma], [beta], média móvel, variância móvel
+    indice = 0
+    gamma = beta = None
+    if configuracao.get('scale', True):
+        gamma = pesos[indice]
+        indice += 1
+    if configuracao.get('center', True):
+        beta = pesos[indice]
+        indice += 1
+    media, variancia = pesos[indice], pesos[indice + 1]
+
+    a = 1.0 / np.sqrt(variancia.astype(np.float64) + configuracao.get('epsilon', 1e-3))
+    if gamma is not None:
+        a = a * gamma
+    c = -media * a
+    if beta is not None:
+        c = c + beta
+    return a.astype(np.float64), c.astype(np.float64)
+
+def exportar_mlp(modelo):
+    """
+    Extrai as camadas de um modelo Keras sequencial de Dense/BatchNormalization/Dropout
+
+    Returns:
+        list: Camadas (pesos, bias, ativação) com as BatchNormalization já dobradas
+    """
+    camadas = []
+    afim_pendente = None  # BN depois de uma ativação não linear: dobra na próxima Dense
+
+    for camada in modelo.layers:
+        tipo = camada.__class__.__name__
+        if tipo in CAMADAS_IDENTIDADE:
+            continue
+
+        if tipo == 'Dense':
+            configuracao = camada.get_config()
+            pesos = camada.get_weights()
+            W = pesos[0].astype(np.float64)
+            b = pesos[1].astype(np.float64) if configuracao.get('use_bias', True) else np.zeros(W.shape[1])
+            if afim_pendente is not None:
+                a, c = afim_pendente
+                b = c @ W + b
+                W = a[:, None] * W
+                afim_pendente = None
+            camadas.append([W, b, configuracao.get('activation', 'linear')])
+
+        elif tipo == 'BatchNormalization':
+            a, c = _afim_batch_normalization(camada)
+            if afim_pendente is not None:
+                a_anterior, c_anterior = afim_pendente
+                afim_pendente = (a_anterior * a, c_anterior * a + c)
+            elif camadas and camadas[-1][2] == 'linear':
+                # Dense sem ativação logo antes: dobra na Dense anterior
+                camadas[-1][0] = camadas[-1][0] * a[None, :]
+                camadas[-1][1] = camadas[-1][1] * a + c
+            else:
+                afim_pendente = (a, c)
+
+        else:
+            raise ValueError(f"Camada {tipo} não suportada na exportação para numpy")
+
+    if afim_pendente is not None:
+        # BN no final da rede: vira uma camada diagonal linear
+        a, c = afim_pendente
+        camadas.append([np.diag(a), c, 'linear'])
+
+    for _, _, ativacao in camadas:
+        if ativacao not in ATIVACOES:
+            raise ValueError(f"Ativação {ativacao} não suportada na exportação para numpy")
+    return [tuple(camada) for camada in camadas]
+
+class MLPNumpy:
+    """Forward pass do mlp_tabular em numpy, com o StandardScaler embutido"""
+
+    def __init__(self, camadas, media=None, escala=None, feature_names=None):
+        self.camadas = camadas
+        self.media = media
+        self.escala = escala
+        self.feature_names = list(feature_names or [])
+
+    @classmethod
+    def de_modelo(cls, modelo, scaler=None, feature_names=None):
+        """Cria o motor numpy a partir do modelo Keras e do scaler já ajustado"""
+        media = getattr(scaler, 'mean_', None) if scaler is not None else None
+        escala = getattr(scaler, 'scale_', None) if scaler is not None else None
+        return cls(exportar_mlp(modelo), media, escala, feature_names)
+
+    def escalar(self, X):
+        """Aplica o StandardScaler (mesma fórmula de StandardScaler.transform)"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.media is not None:
+            X = X - self.media
+        if self.escala is not None:
+            X = X / self.escala
+        return X
+
+    def forward(self, X_escalado):
+        """Saída da rede para entradas já escaladas: (n_amostras, n_saidas)"""
+        h = np.asarray(X_escalado, dtype=np.float64)
+        for W, b, ativacao in self.camadas:
+            h = ATIVACOES[ativacao](h @ W + b)
+        return h
+
+    def prever_matriz(self, X):
+        """Probabilidade da classe positiva para cada linha de features brutas"""
+        if len(X) == 0:
+            return np.empty(0)
+        return self.forward(self.escalar(X)).ravel()
+
+    def salvar(self, caminho_arquivo):
+        """Salva pesos, scaler e nomes das features em um .npz"""
+        arrays = {}
+        for i, (W, b, _) in enumerate(self.camadas):
+            arrays[f'W{i}'] = W
+            arrays[f'b{i}'] = b
+        if self.media is not None:
+            arrays['media'] = self.media
+        if self.escala is not None:
+            arrays['escala'] = self.escala
+        metadados = {
+            'ativacoes': [ativacao for _, _, ativacao in self.camadas],
+            'feature_names': self.feature_names
+        }
+        arrays['metadados'] = np.array(json.dumps(metadados))
+        np.savez(caminho_arquivo, **arrays)
+
+    @classmethod
+    def carregar(cls, caminho_arquivo):
+        """Carrega um motor salvo por salvar (não importa o TensorFlow)"""
+        with np.load(caminho_arquivo) as dados:
+            metadados = json.loads(str(dados['metadados']))
+            camadas = [(dados[f'W{i}'], dados[f'b{i}'], ativacao)
+                       for i, ativacao in enumerate(metadados['ativacoes'])]
+            media = dados['media'] if 'media' in dados else None
+            escala = dados['escala'] if 'escala' in dados else None
+        return cls(camadas, media, escala, metadados['feature_names'])
@@ -3,7 +3,6 @@
 Comparador de modelos de rede neural para classificação EEG
 """
 
-import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -53,7 +52,7 @@ class ModeloComparador:
                 self.resultados[nome] = resultado
                 
                 # Salvar histórico se for modelo Keras
-                if 'history' in resultado:
+                if resultado and 'history' in resultado:
                     self.historico_treinos[nome] = resultado['history']
                     
                 print(f"✅ {nome} treinado com sucesso!")
@@ -80,25 +79,9 @@ class ModeloComparador:
                 continue
                 
             try:
-                # Fazer predições
-                if hasattr(modelo.model, 'predict_proba'):
-                    # Modelo scikit-learn
-                    X_scaled = modelo.scaler.transform(X_teste)
-                    y_pred = modelo.model.predict(X_scaled)
-                    y_pred_proba = modelo.model.predict_proba(X_scaled)[:, 1]
-                else:
-                    # Modelo Keras
-                    target_length = 100
-                    X_reshaped = np.zeros((X_teste.shape[0], target_length, 1))
-                    
-                    for i in range(X_teste.shape[0]):
-                        if X_teste.shape[1] >= target_length:
-                            X_reshaped[i] = X_teste[i, :target_length].reshape(-1, 1)
-                        else:
-                            X_reshaped[i, :X_teste.shape[1], 0] = X_teste[i]
-                    
-                    y_pred_proba = modelo.model.predict(X_reshaped).flatten()
-                    y_pred = (y_pred_proba > 0.5).astype(int)
+                # Fazer predições: scaler e formato de entrada de cada modelo (pipeline tf.data no Keras)
+                y_pred_proba = modelo.prever_matriz(X_teste)
+                y_pred = (y_pred_proba > 0.5).astype(int)
                 
                 # Calcular métricas
                 metricas[nome] = {
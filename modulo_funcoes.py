@@ -3,6 +3,7 @@ import psycopg2
 import plotly.graph_objs as go
 import plotly.io as pio
 from config import config
+from qualidade_sinal import avaliar_qualidade
 
 # Configurações do banco
 def obter_conexao_db():
@@ -20,12 +21,12 @@ def inserir_usuario(possui):
             return cur.fetchone()[0]
 
 # Inserir sinal
-def inserir_sinal(nome, id_usuario):
+def inserir_sinal(nome, id_usuario, flags_qualidade=None):
     with obter_conexao_db() as conn:
         with conn.cursor() as cur:
             cur.execute(
-                "INSERT INTO sinais (nome, idusuario) VALUES (%s, %s) RETURNING id",
-                (nome, id_usuario)
+                "INSERT INTO sinais (nome, idusuario, flags_qualidade) VALUES (%s, %s, %s) RETURNING id",
+                (nome, id_usuario, flags_qualidade)
             )
             return cur.fetchone()[0]
 
@@ -58,12 +59,16 @@ def processar_arquivos():
                 with open(caminho, "r", encoding="utf-8") as f:
                     dados = f.read()
 
-                id_usuario = inserir_usuario('S' if categoria == "sim" else 'N')
-                id_sinal = inserir_sinal(arquivo_nome, id_usuario)
                 valores = [float(val) for val in dados.split()]
+                qualidade = avaliar_qualidade(valores)
+
+                id_usuario = inserir_usuario('S' if categoria == "sim" else 'N')
+                id_sinal = inserir_sinal(arquivo_nome, id_usuario, qualidade['flags'])
                 inserir_valores_sinal(id_sinal, valores)
 
                 print(f"[OK] Inserido: {arquivo_nome} - Categoria: {categoria.upper()}")
+                if not qualidade['valido']:
+                    print(f"[AVISO] {arquivo_nome} reprovado na triagem: {', '.join(qualidade['motivos'])}")
 
             except Exception as e:
                 print(f"[ERRO] Falha ao inserir {arquivo_nome}: {str(e)}")
@@ -6,7 +6,6 @@ Script de otimizações de performance para o sistema EEG
 import os
 import sys
 import psycopg2
-import pickle
 from datetime import datetime
 from config import config
 
@@ -19,7 +18,7 @@ def limpar_cache_antigo():
     print("🧹 Limpando cache antigo...")
     
     cache_files = [
-        'cache_predicoes.pkl',
+        config.PREDICTION_CACHE_PATH,
         'static/graph_cache_*.html'
     ]
     
@@ -103,11 +102,11 @@ warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
     print("✅ Configuração do Matplotlib salva!")
 
 def criar_cache_predicoes():
-    """Cria cache inicial de predições"""
+    """Cria o cache inicial de predições do modelo principal (versionado pelo arquivo do modelo)"""
     print("💾 Criando cache de predições...")
     
     try:
-        from app import classifier, obter_conexao_db
+        from app import classifier, cache_predicoes, prever_lote_cache, obter_conexao_db
         
         if not classifier or not classifier.is_trained:
             print("   ⚠️ Modelo não treinado, pulando cache de predições")
@@ -117,35 +116,19 @@ def criar_cache_predicoes():
         cursor = conexao.cursor()
         
         # Buscar todos os sinais
-        cursor.execute("SELECT id FROM sinais ORDER BY id")
-        sinais = cursor.fetchall()
+        cursor.execute("SELECT id FROM sinais WHERE COALESCE(flags_qualidade, 0) = 0 ORDER BY id")
+        ids_sinais = [sinal_id for (sinal_id,) in cursor.fetchall()]
         
-        cache = {}
-        total = len(sinais)
-        
-        print(f"   📊 Processando {total} sinais...")
-        
-        for i, (sinal_id,) in enumerate(sinais, 1):
-            try:
-                if i % 10 == 0:
-                    print(f"   📈 Progresso: {i}/{total} ({i/total*100:.1f}%)")
-                
-                predicao = classifier.prever_sinal(sinal_id)
-                if predicao:
-                    cache[sinal_id] = predicao
-                    
-            except Exception as e:
-                print(f"   ⚠️ Erro no sinal {sinal_id}: {e}")
-                continue
+        cursor.close()
+        conexao.close()
         
-        # Salvar cache
-        with open('cache_predicoes.pkl', 'wb') as f:
-            pickle.dump(cache, f)
+        print(f"   📊 Processando {len(ids_sinais)} sinais...")
         
-        print(f"✅ Cache criado com {len(cache)} predições!")
+        predicoes = prever_lote_cache('principal', classifier, ids_sinais)
+        cache_predicoes.salvar()
         
-        cursor.close()
-        conexao.close()
+        print(f"✅ Cache criado com {sum(1 for p in predicoes.values() if p)} predições!")
+        print(f"   📈 Estatísticas: {cache_predicoes.estatisticas()}")
         
     except Exception as e:
         print(f"❌ Erro ao criar cache: {e}")
@@ -234,7 +217,16 @@ def main():
     criar_script_inicio_rapido()
     print()
     
-    # 6. Criar cache de predições (opcional)
+    # 6. Avaliar a qualidade dos sinais ainda não triados
+    try:
+        from qualidade_sinal import atualizar_flags_banco
+        print("🔬 Avaliando qualidade dos sinais...")
+        atualizar_flags_banco(apenas_pendentes=True)
+    except Exception as e:
+        print(f"⚠️ Triagem de qualidade não executada: {e}")
+    print()
+    
+    # 7. Criar cache de predições (opcional)
     try:
         criar_cache_predicoes()
     except:
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Perfil dos treinamentos: tempo e recursos por fase e por época
+
+Um PerfilTreino acompanha uma execução de retreinamento. Cada fase (criação do
+dataset, escala, ajuste, avaliação) registra duração, amostras/s, tempo de CPU,
+utilização da CPU (tempo de CPU / (duração x núcleos)), RSS e pico de RSS do
+processo; os modelos Keras acrescentam as mesmas medidas por época com o callback
+de callback_keras. Os treinos em outros processos enviam o próprio resumo, que é
+anexado com anexar().
+
+O psutil é opcional: sem ele, o RSS vem de /proc (Linux) ou do pico do `resource`,
+e o tempo de CPU de time.process_time(). Cada execução é gravada em JSON em
+config.PROFILE_DIR, mantendo as config.PROFILE_MAX_RUNS mais recentes.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from config import config
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _rss_atual_mb():
+    """RSS atual do processo em MB (None se não houver como medir)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2 ** 20
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _pico_rss_mb():
+    """Pico de RSS do processo desde o início, em MB (None se não houver como medir)"""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss em KB no Linux e em bytes no macOS
+        return pico / 2 ** 20 if sys.platform == 'darwin' else pico / 2 ** 10
+    if psutil is not None:
+        memoria = psutil.Process().memory_info()
+        return getattr(memoria, 'peak_wset', memoria.rss) / 2 ** 20
+    return None
+
+def _tempo_cpu():
+    """Tempo de CPU (usuário + sistema) de todas as threads do processo, em segundos"""
+    if psutil is not None:
+        tempos = psutil.Process().cpu_times()
+        return tempos.user + tempos.system
+    return time.process_time()
+
+def medir():
+    """Leitura instantânea: relógio, CPU e memória"""
+    return {'relogio': time.perf_counter(), 'cpu': _tempo_cpu(), 'rss_mb': _rss_atual_mb()}
+
+def medidas_intervalo(inicio, fim, amostras=None):
+    """
+    Medidas entre duas leituras de medir()
+
+    Returns:
+        dict: duracao_s, cpu_s, utilizacao_cpu (0-1 dos núcleos), rss/pico em MB e amostras/s
+    """
+    duracao = max(fim['relogio'] - inicio['relogio'], 1e-9)
+    cpu = fim['cpu'] - inicio['cpu']
+    pico = _pico_rss_mb()
+    medidas = {
+        'duracao_s': round(duracao, 4),
+        'cpu_s': round(cpu, 4),
+        'utilizacao_cpu': round(cpu / (duracao * (os.cpu_count() or 1)), 4),
+        'rss_mb': round(fim['rss_mb'], 1) if fim['rss_mb'] is not None else None,
+        'pico_rss_mb': round(pico, 1) if pico is not None else None
+    }
+    if amostras:
+        medidas['amostras'] = int(amostras)
+        medidas['amostras_por_s'] = round(amostras / duracao, 2)
+    return medidas
+
+class PerfilTreino:
+    """Fases e épocas de uma execução de treinamento"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{nome}"
+        self.data = datetime.now().isoformat(timespec='seconds')
+        self.inicio = medir()
+        self.fases = []
+        self.epocas = {}
+        self.externos = {}
+        self.status = 'running'
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def fase(self, nome, modelo=None, amostras=None):
+        """
+        Mede o bloco como uma fase
+
+        Args:
+            nome (str): 'dataset', 'escala', 'ajuste', 'avaliacao', ...
+            modelo (str): Tipo do modelo da fase (None para fases comuns)
+            amostras (int): Amostras processadas (para amostras/s)
+
+        Yields:
+            dict: Extras do registro; o bloco pode definir 'amostras' quando só as
+                  conhece no fim (ex.: tamanho do dataset criado)
+        """
+        extras = {}
+        inicio = medir()
+        try:
+            yield extras
+        finally:
+            amostras = extras.pop('amostras', amostras)
+            registro = {'fase': nome, 'modelo': modelo, **medidas_intervalo(inicio, medir(), amostras), **extras}
+            with self.lock:
+                self.fases.append(registro)
+
+    def registrar_epoca(self, modelo, registro):
+        """Acrescenta o registro de uma época do modelo"""
+        with self.lock:
+            self.epocas.setdefault(modelo, []).append(registro)
+
+    def callback_keras(self, modelo, amostras_por_epoca=None):
+        """
+        Callback Keras que registra duração, amostras/s, CPU, RSS e métricas de cada época
+
+        Args:
+            modelo (str): Tipo do modelo
+            amostras_por_epoca (int): Amostras de treino por época (para amostras/s)
+        """
+        import tensorflow as tf
+        perfil = self
+
+        class CallbackPerfil(tf.keras.callbacks.Callback):
+            def on_epoch_begin(self, epoca, logs=None):
+                self.inicio_epoca = medir()
+
+            def on_epoch_end(self, epoca, logs=None):
+                metricas = {chave: round(float(valor), 6) for chave, valor in (logs or {}).items()
+                            if chave in ('loss', 'val_loss', 'accuracy', 'val_accuracy')}
+                perfil.registrar_epoca(modelo, {'epoca': epoca + 1,
+                                                **medidas_intervalo(self.inicio_epoca, medir(), amostras_por_epoca),
+                                                **metricas})
+
+        return CallbackPerfil()
+
+    def anexar(self, nome, resumo):
+        """Anexa o resumo de um treino feito em outro processo"""
+        with self.lock:
+            self.externos[nome] = resumo
+
+    def finalizar(self, status):
+        """Marca o fim da execução com o status final (os de /status_retreinamento: 'completed', 'error', ...)"""
+        self.status = status
+        self.fim = medir()
+
+    def resumo(self):
+        """Execução em um dict serializável em JSON"""
+        with self.lock:
+            return {
+                'id': self.id,
+                'nome': self.nome,
+                'data': self.data,
+                'status': self.status,
+                'total': medidas_intervalo(self.inicio, getattr(self, 'fim', None) or medir()),
+                'fases': list(self.fases),
+                'epocas': {modelo: list(registros) for modelo, registros in self.epocas.items()},
+                'processos': dict(self.externos),
+                'ambiente': {'nucleos': os.cpu_count(), 'psutil': psutil is not None, 'pid': os.getpid()}
+            }
+
+def salvar_perfil(perfil, diretorio=None, max_execucoes=None):
+    """
+    Grava o resumo da execução e apaga as mais antigas além de max_execucoes
+
+    Returns:
+        str: Caminho do arquivo gravado
+    """
+    diretorio = diretorio or config.PROFILE_DIR
+    max_execucoes = max_execucoes or config.PROFILE_MAX_RUNS
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, f"perfil_{perfil.id}.json")
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(perfil.resumo(), f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+    arquivos = sorted(nome for nome in os.listdir(diretorio) if nome.startswith('perfil_') and nome.endswith('.json'))
+    for nome in arquivos[:-max_execucoes]:
+        os.remove(os.path.join(diretorio, nome))
+    return caminho
+
+def listar_perfis(diretorio=None, limite=None):
+    """Resumos gravados, do mais recente para o mais antigo"""
+    diretorio = diretorio or config.PROFILE_DIR
+    if not os.path.isdir(diretorio):
+        return []
+    arquivos = sorted((nome for nome in os.listdir(diretorio) if nome.startswith('perfil_') and nome.endswith('.json')),
+                      reverse=True)
+    perfis = []
+    for nome in arquivos[:limite]:
+        try:
+            with open(os.path.join(diretorio, nome), 'r', encoding='utf-8') as f:
+                perfis.append(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Perfil de treino ilegível ({nome}): {e}")
+    return perfis
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pipelines tf.data para treinar e avaliar os modelos Keras
+
+As entradas passam pelo StandardScaler e pelo formato do modelo ((n, f) no
+mlp_tabular, (n, f, 1) nas redes convolucionais/recorrentes) dentro do pipeline,
+que faz cache, embaralhamento, lotes de tamanho configurável e prefetch, então o
+preparo do próximo lote roda em paralelo com o passo de treino.
+
+Matrizes em memória entram com from_tensor_slices e ficam em cache depois de
+escaladas. Armazéns em disco (np.memmap, criados por salvar_armazem ou
+EscritorArmazem) não são carregados na RAM: o pipeline embaralha só os índices e
+lê cada lote do arquivo com leituras paralelas (tf.numpy_function).
+"""
+
+import os
+import glob
+import json
+import numpy as np
+import tensorflow as tf
+from config import config
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+def em_disco(X):
+    """Se X é um armazém em disco (np.memmap), que não deve ser carregado inteiro"""
+    return isinstance(X, np.memmap)
+
+def ajustar_scaler(scaler, X, tamanho_bloco=None):
+    """
+    Ajusta o StandardScaler; armazéns em disco são lidos em blocos (partial_fit)
+
+    Returns:
+        StandardScaler: O próprio scaler, ajustado
+    """
+    if not em_disco(X):
+        return scaler.fit(np.asarray(X, dtype=config.PIPELINE_DTYPE))
+    tamanho_bloco = tamanho_bloco or config.TFDATA_READ_BLOCK
+    for inicio in range(0, len(X), tamanho_bloco):
+        scaler.partial_fit(np.asarray(X[inicio:inicio + tamanho_bloco], dtype=config.PIPELINE_DTYPE))
+    return scaler
+
+def _transformacao(scaler, canal):
+    """Função tf que aplica o scaler e o formato de entrada do modelo"""
+    dtype = tf.as_dtype(config.PIPELINE_DTYPE)
+    media = tf.constant(scaler.mean_, dtype=dtype) if getattr(scaler, 'mean_', None) is not None else None
+    escala = tf.constant(scaler.scale_, dtype=dtype) if getattr(scaler, 'scale_', None) is not None else None
+
+    def transformar(x):
+        x = tf.cast(x, dtype)
+        if media is not None:
+            x = x - media
+        if escala is not None:
+            x = x / escala
+        return tf.expand_dims(x, -1) if canal else x
+    return transformar
+
+def criar_pipeline(X, y=None, indices=None, scaler=None, canal=False, batch_size=None,
+                   embaralhar=False, cache=True, semente=42):
+    """
+    Cria o tf.data.Dataset de treino, validação ou predição
+
+    Args:
+        X (np.array | np.memmap): Matriz (n_amostras, n_features)
+        y (np.array): Rótulos (None na predição)
+        indices (np.array): Linhas usadas (padrão: todas)
+        scaler (StandardScaler): Scaler já ajustado (None = sem escala)
+        canal (bool): Acrescenta o eixo de canal: (n, f, 1) para CNN/LSTM
+        batch_size (int): Tamanho do lote (padrão: config.KERAS_BATCH_SIZE)
+        embaralhar (bool): Embaralha a cada época (treino)
+        cache (bool | str): Cache em memória (True) ou em arquivo (prefixo do caminho); em
+                            armazéns em disco só o cache em arquivo é usado
+
+    Returns:
+        tf.data.Dataset: Lotes (x, y), ou só x na predição
+    """
+    batch_size = batch_size or config.KERAS_BATCH_SIZE
+    indices = np.arange(len(X)) if indices is None else np.asarray(indices)
+    transformar = _transformacao(scaler, canal)
+    y_indices = None if y is None else np.asarray(y)[indices].astype('float32')
+
+    if not em_disco(X):
+        # Em memória: escala uma vez, guarda em cache e embaralha as amostras já prontas
+        dados = np.asarray(X)[indices]
+        dataset = tf.data.Dataset.from_tensor_slices(dados if y is None else (dados, y_indices))
+        dataset = dataset.map(transformar if y is None else (lambda x, rotulo: (transformar(x), rotulo)),
+                              num_parallel_calls=AUTOTUNE)
+        if isinstance(cache, str) and cache:
+            remover_cache(cache)
+            dataset = dataset.cache(cache)
+        elif cache:
+            dataset = dataset.cache()
+        if embaralhar:
+            dataset = dataset.shuffle(min(len(indices), config.TFDATA_SHUFFLE_BUFFER), seed=semente,
+                                      reshuffle_each_iteration=True)
+        return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+    # Em disco: lê lotes do memmap em paralelo, em ordem crescente de linha
+    n_features = X.shape[1]
+    dtype = tf.as_dtype(config.PIPELINE_DTYPE)
+    em_arquivo = isinstance(cache, str) and bool(cache)
+    posicoes = tf.data.Dataset.range(len(indices))
+    if embaralhar and not em_arquivo:
+        # Sem cache: embaralha só as posições, sem carregar as amostras
+        posicoes = posicoes.shuffle(len(indices), seed=semente, reshuffle_each_iteration=True)
+    posicoes = posicoes.batch(batch_size)
+
+    def ler_lote(posicoes_lote):
+        linhas = indices[posicoes_lote]
+        ordem = np.argsort(linhas)
+        lote = np.empty((len(linhas), n_features), dtype=config.PIPELINE_DTYPE)
+        lote[ordem] = X[linhas[ordem]]
+        if y_indices is None:
+            return lote
+        return lote, y_indices[posicoes_lote]
+
+    def ler(p):
+        if y_indices is None:
+            return tf.ensure_shape(tf.numpy_function(ler_lote, [p], dtype), [None, n_features])
+        x, rotulo = tf.numpy_function(ler_lote, [p], (dtype, tf.float32))
+        return tf.ensure_shape(x, [None, n_features]), tf.ensure_shape(rotulo, [None])
+
+    dataset = posicoes.map(ler, num_parallel_calls=AUTOTUNE, deterministic=not embaralhar or em_arquivo)
+    dataset = dataset.map(transformar if y is None else (lambda x, rotulo: (transformar(x), rotulo)),
+                          num_parallel_calls=AUTOTUNE)
+    if em_arquivo:
+        # Cache em arquivo das amostras já escaladas; o embaralhamento vem depois dele
+        remover_cache(cache)
+        dataset = dataset.unbatch().cache(cache)
+        if embaralhar:
+            dataset = dataset.shuffle(min(len(indices), config.TFDATA_SHUFFLE_BUFFER), seed=semente,
+                                      reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+    return dataset.prefetch(AUTOTUNE)
+
+def remover_cache(prefixo):
+    """Apaga os arquivos de um cache tf.data anterior (o TensorFlow reutilizaria dados antigos)"""
+    for caminho in glob.glob(glob.escape(prefixo) + '*'):
+        if os.path.isfile(caminho):
+            os.remove(caminho)
+
+def salvar_armazem(diretorio, X, y=None, feature_names=None):
+    """
+    Grava um armazém em disco (X.npy, y.npy e metadados) para leitura com memmap
+
+    Returns:
+        str: O diretório do armazém
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    np.save(os.path.join(diretorio, 'X.npy'), np.asarray(X, dtype=config.PIPELINE_DTYPE))
+    if y is not None:
+        np.save(os.path.join(diretorio, 'y.npy'), np.asarray(y))
+    with open(os.path.join(diretorio, 'metadados.json'), 'w', encoding='utf-8') as f:
+        json.dump({'feature_names': list(feature_names or [])}, f, ensure_ascii=False)
+    return diretorio
+
+class EscritorArmazem:
+    """Escreve um armazém em disco em blocos, sem manter a matriz inteira na memória"""
+
+    def __init__(self, diretorio, n_linhas, n_colunas, feature_names=None):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.X = np.lib.format.open_memmap(os.path.join(diretorio, 'X.npy'), mode='w+',
+                                           dtype=config.PIPELINE_DTYPE, shape=(n_linhas, n_colunas))
+        self.y = np.lib.format.open_memmap(os.path.join(diretorio, 'y.npy'), mode='w+',
+                                           dtype=np.int64, shape=(n_linhas,))
+        self.feature_names = list(feature_names or [])
+        self.posicao = 0
+
+    def escrever(self, X_bloco, y_bloco):
+        """Acrescenta um bloco de linhas"""
+        n = len(X_bloco)
+        self.X[self.posicao:self.posicao + n] = X_bloco
+        self.y[self.posicao:self.posicao + n] = y_bloco
+        self.posicao += n
+
+    def fechar(self):
+        """Grava os dados pendentes e os metadados"""
+        self.X.flush()
+        self.y.flush()
+        with open(os.path.join(self.diretorio, 'metadados.json'), 'w', encoding='utf-8') as f:
+            json.dump({'feature_names': self.feature_names, 'linhas': self.posicao}, f, ensure_ascii=False)
+        del self.X, self.y
+        return self.diretorio
+
+def abrir_armazem(diretorio):
+    """
+    Abre um armazém sem carregá-lo na memória
+
+    Returns:
+        tuple: (X memmap, y (memmap ou None), feature_names)
+    """
+    X = np.load(os.path.join(diretorio, 'X.npy'), mmap_mode='r')
+    caminho_y = os.path.join(diretorio, 'y.npy')
+    y = np.load(caminho_y, mmap_mode='r') if os.path.exists(caminho_y) else None
+    feature_names = []
+    caminho_metadados = os.path.join(diretorio, 'metadados.json')
+    if os.path.exists(caminho_metadados):
+        with open(caminho_metadados, 'r', encoding='utf-8') as f:
+            metadados = json.load(f)
+        feature_names = metadados.get('feature_names', [])
+        if 'linhas' in metadados:
+            X = X[:metadados['linhas']]
+            y = y[:metadados['linhas']] if y is not None else None
+    return X, y, feature_names
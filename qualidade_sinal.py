@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Triagem de qualidade dos sinais EEG
+
+Verificações baratas (poucas reduções numpy) executadas na ingestão e antes da
+predição, para que sinais planos, saturados ou corrompidos não passem pela
+dinâmica simbólica, pelos gráficos e pela extração de features.
+"""
+
+import numpy as np
+import psycopg2
+from config import config
+
+# Flags de qualidade (bitmask salvo em sinais.flags_qualidade; 0 = sinal válido)
+FLAG_NAO_FINITO = 1
+FLAG_LINHA_PLANA = 2
+FLAG_CLIPPING = 4
+FLAG_CURTO = 8
+
+DESCRICOES_FLAGS = {
+    FLAG_NAO_FINITO: 'Valores NaN ou infinitos',
+    FLAG_LINHA_PLANA: 'Trecho plano (valores constantes)',
+    FLAG_CLIPPING: 'Saturação nos valores extremos (clipping)',
+    FLAG_CURTO: 'Sinal curto demais'
+}
+
+def obter_conexao_db():
+    """Conecta ao banco de dados PostgreSQL"""
+    return psycopg2.connect(**config.get_db_connection_string())
+
+def maior_trecho_constante(valores):
+    """Retorna o comprimento (em amostras) do maior trecho de valores consecutivos iguais"""
+    if len(valores) == 0:
+        return 0
+
+    iguais = np.concatenate(([False], valores[1:] == valores[:-1], [False]))
+    bordas = np.diff(iguais.astype(np.int8))
+    inicios = np.flatnonzero(bordas == 1)
+    fins = np.flatnonzero(bordas == -1)
+    if len(inicios) == 0:
+        return 1
+    return int((fins - inicios).max()) + 1
+
+def avaliar_qualidade(valores, min_amostras=None, max_trecho_plano=None, max_fracao_clipping=None):
+    """
+    Avalia a qualidade de um sinal
+
+    Args:
+        valores (np.array): Valores brutos do sinal
+        min_amostras (int): Comprimento mínimo aceito (padrão: config.QUALITY_MIN_SAMPLES)
+        max_trecho_plano (int): Maior trecho constante aceito (padrão: config.QUALITY_MAX_FLAT_RUN)
+        max_fracao_clipping (float): Fração máxima de amostras nos extremos (padrão: config.QUALITY_MAX_CLIP_FRACTION)
+
+    Returns:
+        dict: flags (bitmask), valido, motivos e as métricas calculadas
+    """
+    min_amostras = config.QUALITY_MIN_SAMPLES if min_amostras is None else min_amostras
+    max_trecho_plano = config.QUALITY_MAX_FLAT_RUN if max_trecho_plano is None else max_trecho_plano
+    max_fracao_clipping = config.QUALITY_MAX_CLIP_FRACTION if max_fracao_clipping is None else max_fracao_clipping
+
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    n = len(valores)
+    flags = 0
+    trecho_plano = 0
+    fracao_clipping = 0.0
+
+    if n < min_amostras:
+        flags |= FLAG_CURTO
+
+    if n > 0 and not np.isfinite(valores).all():
+        flags |= FLAG_NAO_FINITO
+    elif n > 0:
+        trecho_plano = maior_trecho_constante(valores)
+        if trecho_plano > max_trecho_plano:
+            flags |= FLAG_LINHA_PLANA
+
+        minimo, maximo = valores.min(), valores.max()
+        if maximo > minimo:
+            no_trilho = np.count_nonzero(valores == maximo) + np.count_nonzero(valores == minimo)
+            fracao_clipping = no_trilho / n
+            if fracao_clipping > max_fracao_clipping:
+                flags |= FLAG_CLIPPING
+
+    return {
+        'flags': flags,
+        'valido': flags == 0,
+        'motivos': descrever_flags(flags),
+        'total_amostras': n,
+        'maior_trecho_plano': trecho_plano,
+        'fracao_clipping': float(fracao_clipping)
+    }
+
+def descrever_flags(flags):
+    """Converte o bitmask de qualidade em uma lista de descrições"""
+    if not flags:
+        return []
+    return [descricao for flag, descricao in DESCRICOES_FLAGS.items() if flags & flag]
+
+def garantir_coluna_qualidade(cursor):
+    """Cria a coluna sinais.flags_qualidade em bancos antigos (NULL = ainda não avaliado)"""
+    cursor.execute("ALTER TABLE sinais ADD COLUMN IF NOT EXISTS flags_qualidade INTEGER")
+
+def atualizar_flags_banco(apenas_pendentes=True):
+    """
+    Avalia os sinais do banco e grava as flags de qualidade
+
+    Args:
+        apenas_pendentes (bool): Se True, avalia apenas sinais ainda sem flags
+
+    Returns:
+        dict: Total de sinais avaliados e quantos foram rejeitados
+    """
+    conexao = obter_conexao_db()
+    cursor = conexao.cursor()
+    try:
+        garantir_coluna_qualidade(cursor)
+
+        filtro = "WHERE s.flags_qualidade IS NULL" if apenas_pendentes else ""
+        cursor.execute(f"""
+            SELECT s.id, array_agg(vs.valor ORDER BY vs.id)
+            FROM sinais s
+            JOIN valores_sinais vs ON s.id = vs.idsinal
+            {filtro}
+            GROUP BY s.id
+        """)
+
+        atualizacoes = []
+        for id_sinal, valores in cursor.fetchall():
+            qualidade = avaliar_qualidade(np.array(valores, dtype=np.float64))
+            atualizacoes.append((qualidade['flags'], id_sinal))
+
+        cursor.executemany("UPDATE sinais SET flags_qualidade = %s WHERE id = %s", atualizacoes)
+        conexao.commit()
+
+        rejeitados = sum(1 for flags, _ in atualizacoes if flags)
+        print(f"✅ Qualidade avaliada: {len(atualizacoes)} sinais, {rejeitados} rejeitados")
+        return {'avaliados': len(atualizacoes), 'rejeitados': rejeitados}
+
+    finally:
+        cursor.close()
+        conexao.close()
+
+if __name__ == "__main__":
+    atualizar_flags_banco(apenas_pendentes=False)
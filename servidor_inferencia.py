@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Micro-lotes de inferência para requisições concorrentes
+
+As requisições entram em uma fila; uma thread de trabalho junta tudo o que chega
+dentro de uma janela curta (config.INFERENCE_BATCH_WINDOW_MS) ou até
+config.INFERENCE_BATCH_MAX_ITEMS itens, faz uma única predição em lote e resolve o
+Future de cada chamador. Todas as chamadas ao modelo saem da mesma thread.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config import config
+
+class LoteadorInferencia:
+    """Agrupa pedidos de predição concorrentes em micro-lotes"""
+
+    def __init__(self, funcao_lote, janela_ms=None, max_itens=None):
+        """
+        Args:
+            funcao_lote (callable): Recebe uma lista de IDs e retorna {id: resultado}
+            janela_ms (float): Tempo máximo de espera para completar um lote
+            max_itens (int): Tamanho máximo de um lote
+        """
+        self.funcao_lote = funcao_lote
+        self.janela = (config.INFERENCE_BATCH_WINDOW_MS if janela_ms is None else janela_ms) / 1000.0
+        self.max_itens = max_itens or config.INFERENCE_BATCH_MAX_ITEMS
+        self.fila = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.ativo = False
+        self.total_lotes = 0
+        self.total_itens = 0
+        self.maior_lote = 0
+
+    def iniciar(self):
+        """Inicia a thread de trabalho (chamado automaticamente no primeiro pedido)"""
+        with self.lock:
+            if self.ativo:
+                return
+            self.ativo = True
+            self.thread = threading.Thread(target=self._executar, name="loteador_inferencia", daemon=True)
+            self.thread.start()
+
+    def parar(self, timeout=1.0):
+        """Encerra a thread de trabalho depois de processar o que já está na fila"""
+        with self.lock:
+            if not self.ativo:
+                return
+            self.ativo = False
+        self.fila.put(None)
+        self.thread.join(timeout)
+
+    def submeter(self, id_item):
+        """Coloca um pedido na fila e retorna o Future com o resultado"""
+        self.iniciar()
+        futuro = Future()
+        self.fila.put((id_item, futuro))
+        return futuro
+
+    def prever(self, id_item, timeout=None):
+        """Pedido síncrono: espera o lote que contém o item e retorna o resultado"""
+        return self.submeter(id_item).result(timeout)
+
+    def _coletar_lote(self, primeiro):
+        """Junta pedidos até a janela expirar ou o lote encher"""
+        lote = [primeiro]
+        limite = time.perf_counter() + self.janela
+        while len(lote) < self.max_itens:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                pedido = self.fila.get(timeout=restante)
+            except queue.Empty:
+                break
+            if pedido is None:
+                self.fila.put(None)  # Reenvia o sinal de parada para depois do lote
+                break
+            lote.append(pedido)
+        return lote
+
+    def _executar(self):
+        """Laço da thread de trabalho"""
+        while True:
+            pedido = self.fila.get()
+            if pedido is None:
+                if not self.ativo:
+                    return
+                continue
+
+            lote = self._coletar_lote(pedido)
+            ids = list(dict.fromkeys(id_item for id_item, _ in lote))  # Pedidos repetidos em uma única predição
+
+            try:
+                resultados = self.funcao_lote(ids)
+                for id_item, futuro in lote:
+                    futuro.set_result(resultados.get(id_item))
+            except Exception as e:
+                for _, futuro in lote:
+                    futuro.set_exception(e)
+
+            with self.lock:
+                self.total_lotes += 1
+                self.total_itens += len(lote)
+                self.maior_lote = max(self.maior_lote, len(lote))
+
+    def estatisticas(self):
+        """Número de lotes, itens atendidos e tamanho médio dos lotes"""
+        with self.lock:
+            return {
+                'lotes': self.total_lotes,
+                'itens': self.total_itens,
+                'maior_lote': self.maior_lote,
+                'tamanho_medio': round(self.total_itens / self.total_lotes, 2) if self.total_lotes else 0.0,
+                'janela_ms': self.janela * 1000.0,
+                'max_itens': self.max_itens
+            }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Armazém de sinais brutos e janelas para a CNN fim a fim ('cnn_bruto')
+
+Os sinais ficam concatenados em um único arquivo binário lido com np.memmap, com
+um índice (.npz) de IDs, posição inicial, comprimento e rótulo de cada sinal. O
+treino não materializa o conjunto de janelas: o gerador sorteia a classe (classes
+balanceadas), um sinal dessa classe e um deslocamento aleatório, e copia só as
+janelas do lote. A validação e a inferência percorrem as janelas com sobreposição
+como views (janelas_epocas), normalizando um bloco de cada vez.
+
+Cada janela é normalizada pela própria média e desvio padrão, então a rede vê a
+forma de onda e não a amplitude absoluta do sinal.
+"""
+
+import os
+import numpy as np
+import tensorflow as tf
+from extracao_features import janelas_epocas, calcular_passo
+from config import config
+
+ARQUIVO_VALORES = 'valores.bin'
+ARQUIVO_INDICE = 'indice.npz'
+
+class ArmazemSinais:
+    """Sinais brutos rotulados em disco (np.memmap), acessados sem carregar o arquivo"""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with np.load(os.path.join(diretorio, ARQUIVO_INDICE)) as indice:
+            self.ids = indice['ids']
+            self.inicios = indice['inicios']
+            self.comprimentos = indice['comprimentos']
+            self.rotulos = indice['rotulos']
+            self.dtype = np.dtype(str(indice['dtype']))
+        caminho = os.path.join(diretorio, ARQUIVO_VALORES)
+        self.valores = np.memmap(caminho, dtype=self.dtype, mode='r') if os.path.getsize(caminho) else np.empty(0, self.dtype)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def sinal(self, i):
+        """Valores do i-ésimo sinal (view do memmap)"""
+        return self.valores[self.inicios[i]:self.inicios[i] + self.comprimentos[i]]
+
+def salvar_armazem_sinais(diretorio, sinais, dtype=None):
+    """
+    Grava o armazém sinal a sinal, sem manter todos os valores na memória
+
+    Args:
+        diretorio (str): Diretório do armazém (valores.bin e indice.npz)
+        sinais (iterable): Tuplas (id_sinal, valores, rotulo 0/1)
+
+    Returns:
+        ArmazemSinais: O armazém gravado, aberto para leitura
+    """
+    dtype = np.dtype(dtype or config.PIPELINE_DTYPE)
+    os.makedirs(diretorio, exist_ok=True)
+    ids, inicios, comprimentos, rotulos = [], [], [], []
+    posicao = 0
+    with open(os.path.join(diretorio, ARQUIVO_VALORES), 'wb') as f:
+        for id_sinal, valores, rotulo in sinais:
+            valores = np.asarray(valores, dtype=dtype)
+            f.write(valores.tobytes())
+            ids.append(int(id_sinal))
+            inicios.append(posicao)
+            comprimentos.append(len(valores))
+            rotulos.append(int(rotulo))
+            posicao += len(valores)
+    np.savez(os.path.join(diretorio, ARQUIVO_INDICE),
+             ids=np.array(ids, dtype=np.int64), inicios=np.array(inicios, dtype=np.int64),
+             comprimentos=np.array(comprimentos, dtype=np.int64), rotulos=np.array(rotulos, dtype=np.int64),
+             dtype=np.array(dtype.str))
+    return ArmazemSinais(diretorio)
+
+def normalizar_janelas(janelas):
+    """
+    Normaliza cada janela pela própria média e desvio padrão
+
+    Returns:
+        np.array: (n_janelas, tamanho, 1) no dtype do pipeline, pronto para a CNN
+    """
+    janelas = np.asarray(janelas, dtype=config.PIPELINE_DTYPE)
+    media = janelas.mean(axis=1, keepdims=True, dtype=np.float64)
+    desvio = janelas.std(axis=1, keepdims=True, dtype=np.float64)
+    normalizadas = (janelas - media) / np.maximum(desvio, 1e-8)
+    return normalizadas.astype(config.PIPELINE_DTYPE, copy=False)[..., np.newaxis]
+
+def indices_elegiveis(armazem, indices, tamanho):
+    """Sinais (entre `indices`) com pelo menos uma janela completa"""
+    indices = np.asarray(indices, dtype=np.int64)
+    return indices[armazem.comprimentos[indices] >= tamanho]
+
+def gerar_lotes_aleatorios(armazem, indices, tamanho, batch_size, semente=42):
+    """
+    Gerador infinito de lotes de janelas com classes balanceadas e deslocamentos aleatórios
+
+    Cada amostra sorteia a classe (com a mesma chance para cada classe presente),
+    um sinal dessa classe e o início da janela dentro do sinal.
+
+    Yields:
+        tuple: (janelas (batch, tamanho, 1), rótulos (batch,))
+    """
+    rng = np.random.default_rng(semente)
+    indices = indices_elegiveis(armazem, indices, tamanho)
+    por_classe = [indices[armazem.rotulos[indices] == classe] for classe in (0, 1)]
+    por_classe = [(classe, sinais) for classe, sinais in zip((0, 1), por_classe) if len(sinais)]
+    lote = np.empty((batch_size, tamanho), dtype=armazem.dtype)
+    rotulos = np.empty(batch_size, dtype=np.float32)
+
+    while True:
+        for posicao, escolha in enumerate(rng.integers(len(por_classe), size=batch_size)):
+            classe, sinais = por_classe[escolha]
+            i = sinais[rng.integers(len(sinais))]
+            inicio = armazem.inicios[i] + rng.integers(armazem.comprimentos[i] - tamanho + 1)
+            lote[posicao] = armazem.valores[inicio:inicio + tamanho]
+            rotulos[posicao] = classe
+        yield normalizar_janelas(lote), rotulos.copy()
+
+def gerar_lotes_fixos(armazem, indices, tamanho, sobreposicao, batch_size):
+    """
+    Gerador finito com todas as janelas (com sobreposição) dos sinais, na ordem
+
+    Yields:
+        tuple: (janelas (n, tamanho, 1), rótulos (n,))
+    """
+    for i in indices_elegiveis(armazem, indices, tamanho):
+        janelas, _ = janelas_epocas(armazem.sinal(i), tamanho, sobreposicao)
+        for inicio in range(0, len(janelas), batch_size):
+            bloco = janelas[inicio:inicio + batch_size]
+            yield normalizar_janelas(bloco), np.full(len(bloco), armazem.rotulos[i], dtype=np.float32)
+
+def lotes_fixos(armazem, indices, tamanho, sobreposicao, batch_size):
+    """Número de lotes que gerar_lotes_fixos produz para os sinais"""
+    passo = calcular_passo(tamanho, sobreposicao)
+    comprimentos = armazem.comprimentos[indices_elegiveis(armazem, indices, tamanho)]
+    n_janelas = (comprimentos - tamanho) // passo + 1
+    return int(np.sum(-(-n_janelas // batch_size)))
+
+def dataset_janelas(gerador, tamanho, n_lotes=None):
+    """
+    Envolve um gerador de lotes em um tf.data.Dataset com prefetch
+
+    Args:
+        n_lotes (int): Lotes de um gerador finito; fixa a cardinalidade do dataset,
+                       que o Keras não consegue inferir de um gerador
+    """
+    assinatura = (tf.TensorSpec(shape=(None, tamanho, 1), dtype=tf.as_dtype(config.PIPELINE_DTYPE)),
+                  tf.TensorSpec(shape=(None,), dtype=tf.float32))
+    dataset = tf.data.Dataset.from_generator(gerador, output_signature=assinatura)
+    if n_lotes is not None:
+        dataset = dataset.apply(tf.data.experimental.assert_cardinality(n_lotes))
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+def passos_por_epoca(armazem, indices, tamanho, batch_size):
+    """Lotes por época: cobre, em média, cada janela sem sobreposição dos sinais de treino uma vez"""
+    comprimentos = armazem.comprimentos[indices_elegiveis(armazem, indices, tamanho)]
+    return max(int(np.sum(comprimentos // tamanho)) // batch_size, 1)
+
+def prever_janelas(modelo, valores, tamanho, sobreposicao, tamanho_bloco=None):
+    """
+    Probabilidade média das janelas de um sinal (None se o sinal é menor que a janela)
+
+    As janelas são views do sinal; só o bloco em predição é normalizado em memória.
+    """
+    janelas, _ = janelas_epocas(valores, tamanho, sobreposicao)
+    if len(janelas) == 0:
+        return None
+    tamanho_bloco = tamanho_bloco or config.TFDATA_READ_BLOCK
+    probabilidades = [
+        np.asarray(modelo.predict_on_batch(normalizar_janelas(janelas[inicio:inicio + tamanho_bloco]))).ravel()
+        for inicio in range(0, len(janelas), tamanho_bloco)
+    ]
+    return float(np.mean(np.concatenate(probabilidades)))
+
+def main():
+    """Cria o armazém a partir do banco e treina a CNN de sinais brutos"""
+    from ml_classifier import EEGClassifier
+
+    print("🧠 CNN FIM A FIM EM SINAIS BRUTOS")
+    print("=" * 50)
+    classificador = EEGClassifier()
+    armazem = classificador.criar_armazem_sinais(config.RAW_STORE_DIR, limite=None)
+    if armazem is None or len(armazem) == 0:
+        print("❌ Nenhum sinal para o armazém")
+        return
+    classificador.criar_modelo('cnn_bruto')
+    classificador.treinar_modelo(armazem, armazem.rotulos)
+    if classificador.is_trained:
+        classificador.salvar_modelo(config.RAW_MODEL_PATH)
+
+if __name__ == "__main__":
+    main()
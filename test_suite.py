@@ -5,7 +5,14 @@ Suite de testes consolidada para o sistema EEG
 
 import os
 import numpy as np
-from dinamica_simbolica import calcular_entropia_shannon, aplicar_dinamica_simbolica
+from dinamica_simbolica import (calcular_entropia_shannon, aplicar_dinamica_simbolica, gerar_sequencia_binaria,
+                                gerar_grupos_deslizantes, converter_para_decimal, calcular_frequencia)
+from extracao_features import NOMES_FEATURES, NOMES_FEATURES_BASICAS, janelas_epocas, extrair_features_epocas
+from complexidade import (complexidade_lempel_ziv, complexidade_lempel_ziv_lote, entropia_permutacao, entropia_amostral,
+                          entropia_amostral_lote)
+from entropia_multiescala import somas_acumuladas, granular, entropia_multiescala, entropia_multiescala_lote
+from qualidade_sinal import (avaliar_qualidade, maior_trecho_constante, FLAG_NAO_FINITO,
+                             FLAG_LINHA_PLANA, FLAG_CLIPPING, FLAG_CURTO)
 from config import config
 
 def testar_entropia_shannon():
@@ -167,6 +174,1243 @@ def testar_dinamica_simbolica():
         if os.path.exists(arquivo_temp):
             os.remove(arquivo_temp)
 
+def _features_referencia(valores, m=3):
+    """Features de uma época calculadas passo a passo, como em EEGClassifier.extrair_features_sinal"""
+    n = len(valores)
+    limiar = np.mean(valores)
+    sequencia = gerar_sequencia_binaria(valores, limiar)
+    palavras = converter_para_decimal(gerar_grupos_deslizantes(sequencia, m))
+    frequencias = calcular_frequencia(palavras)
+    freq_values = np.array(list(frequencias.values()))
+    media, std = np.mean(valores), np.std(valores)
+    bits = np.array([int(b) for b in sequencia])
+    probabilidades = freq_values / freq_values.sum()
+    return {
+        'entropia_shannon': calcular_entropia_shannon(frequencias),
+        'limiar': limiar,
+        'total_amostras': n,
+        'total_padroes': len(palavras),
+        'padroes_unicos': len(frequencias),
+        'media_valores': media,
+        'desvio_padrao': std,
+        'variancia': np.var(valores),
+        'skewness': (n / ((n-1) * (n-2))) * np.sum(((valores - media) / std) ** 3),
+        'kurtosis': (n * (n+1) / ((n-1) * (n-2) * (n-3))) * np.sum(((valores - media) / std) ** 4) - (3 * (n-1)**2 / ((n-2) * (n-3))),
+        'amplitude': np.max(valores) - np.min(valores),
+        'rms': np.sqrt(np.mean(valores ** 2)),
+        'proporcao_uns': np.mean(bits),
+        'transicoes': int(np.sum(bits[1:] != bits[:-1])),
+        'comprimento_sequencia': n,
+        'max_frequencia': np.max(freq_values),
+        'min_frequencia': np.min(freq_values),
+        'std_frequencias': np.std(freq_values),
+        'entropia_frequencias': -np.sum(probabilidades * np.log2(probabilidades))
+    }
+
+def testar_features_epocas():
+    """Testa a extração vetorizada de features por época contra o cálculo passo a passo"""
+    
+    print("\n🪟 TESTANDO FEATURES POR ÉPOCA")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(7)
+    sinal = np.cumsum(rng.normal(0, 1, 3000))
+    tamanho, sobreposicao = 500, 0.5
+    
+    epocas, inicios = janelas_epocas(sinal, tamanho, sobreposicao)
+    matriz, _ = extrair_features_epocas(sinal, tamanho, sobreposicao, dtype=np.float64)
+    matriz_32, _ = extrair_features_epocas(sinal, tamanho, sobreposicao, dtype=np.float32)
+    
+    print(f"   Épocas: {epocas.shape[0]} x {tamanho} amostras")
+    print(f"   Matriz de features: {matriz.shape}")
+    
+    assert np.shares_memory(epocas, sinal), "As épocas devem ser views do sinal original"
+    assert matriz.shape == (len(inicios), len(NOMES_FEATURES))
+    assert list(inicios[:3]) == [0, 250, 500]
+    
+    for i in range(len(inicios)):
+        referencia = _features_referencia(sinal[inicios[i]:inicios[i] + tamanho])
+        for j, nome in enumerate(NOMES_FEATURES_BASICAS):
+            assert np.isclose(matriz[i, j], referencia[nome], rtol=1e-9, atol=1e-12), \
+                f"Época {i}, feature {nome}: {matriz[i, j]} != {referencia[nome]}"
+    
+    print("   ✅ Features por época idênticas ao cálculo passo a passo!")
+    
+    # Pipeline em float32: mesmas features com acumuladores em float64
+    assert matriz_32.dtype == np.float32
+    estatisticas = [NOMES_FEATURES.index(nome) for nome in ('media_valores', 'desvio_padrao', 'variancia', 'rms', 'amplitude')]
+    assert np.allclose(matriz_32[:, estatisticas], matriz[:, estatisticas], rtol=1e-4)
+    print("   ✅ Pipeline float32 consistente com float64!")
+
+def _lempel_ziv_referencia(sequencia):
+    """Número de frases LZ76 pela definição (busca da frase mais longa já vista)"""
+    n = len(sequencia)
+    posicao = frases = 0
+    while posicao < n:
+        comprimento = 1
+        while posicao + comprimento <= n and sequencia[posicao:posicao + comprimento] in sequencia[:posicao + comprimento - 1]:
+            comprimento += 1
+        frases += 1
+        posicao += comprimento
+    return frases
+
+def testar_complexidade():
+    """Testa as medidas de complexidade contra as definições"""
+    
+    print("\n🌀 TESTANDO MEDIDAS DE COMPLEXIDADE")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(11)
+    
+    # LZ76: sequências aleatórias, periódicas e esparsas
+    for caso in range(60):
+        n = int(rng.integers(1, 300))
+        if caso % 3 == 0:
+            bits = rng.integers(0, 2, n)
+        elif caso % 3 == 1:
+            bits = np.tile(rng.integers(0, 2, int(rng.integers(1, 8))), n)[:n]
+        else:
+            bits = (rng.random(n) < 0.1).astype(int)
+        sequencia = ''.join(map(str, bits))
+        assert complexidade_lempel_ziv(sequencia, normalizar=False) == _lempel_ziv_referencia(sequencia), sequencia
+    assert complexidade_lempel_ziv('0001101001000101', normalizar=False) == 6
+    print("   ✅ Lempel-Ziv igual à definição!")
+    
+    # Entropia de permutação: série monótona = 0, ruído branco ≈ 1
+    assert entropia_permutacao(np.arange(100.0)) == 0.0
+    assert entropia_permutacao(rng.normal(size=20000)) > 0.99
+    print("   ✅ Entropia de permutação nos limites esperados!")
+    
+    # Entropia amostral contra a contagem de todos os pares (sinal contínuo e quantizado)
+    for sinal in (rng.normal(size=400), np.round(rng.normal(size=400) * 2)):
+        n, m = len(sinal), 2
+        tolerancia = 0.2 * np.std(sinal)
+        pares = []
+        for comprimento in (m, m + 1):
+            modelos = np.lib.stride_tricks.sliding_window_view(sinal, comprimento)[:n - m]
+            distancias = np.abs(modelos[:, None, :] - modelos[None, :, :]).max(axis=2)
+            pares.append((np.count_nonzero(distancias <= tolerancia) - len(modelos)) // 2)
+        assert np.isclose(entropia_amostral(sinal, m=m, r=0.2), -np.log(pares[1] / pares[0]))
+    
+    # Sinal regular tem entropia amostral menor que ruído
+    senoide = np.sin(np.linspace(0, 60 * np.pi, 3000))
+    assert entropia_amostral(senoide) < entropia_amostral(rng.normal(size=3000))
+    print("   ✅ Entropia amostral igual à contagem direta!")
+    
+    # Colunas de complexidade da matriz por época
+    sinal = np.cumsum(rng.normal(0, 1, 2000))
+    matriz, inicios = extrair_features_epocas(sinal, 500, 0.5, dtype=np.float64)
+    coluna_lz = NOMES_FEATURES.index('complexidade_lz')
+    coluna_pe = NOMES_FEATURES.index('entropia_permutacao')
+    coluna_se = NOMES_FEATURES.index('entropia_amostral')
+    for i, inicio in enumerate(inicios):
+        epoca = sinal[inicio:inicio + 500]
+        assert np.isclose(matriz[i, coluna_lz], complexidade_lempel_ziv(epoca >= epoca.mean()))
+        assert np.isclose(matriz[i, coluna_pe], entropia_permutacao(epoca))
+        assert np.isclose(matriz[i, coluna_se], entropia_amostral(epoca))
+    print("   ✅ Features de complexidade por época consistentes!")
+    
+    # Lotes iguais às funções de uma linha (linhas constantes, periódicas e quantizadas)
+    epocas = np.round(rng.normal(0, 2, (30, 256)))
+    epocas[0] = 1.0
+    epocas[1] = np.tile([0.0, 1.0, 1.0], 86)[:256]
+    binario = epocas >= epocas.mean(axis=1, keepdims=True)
+    assert np.array_equal(complexidade_lempel_ziv_lote(binario, normalizar=False),
+                          [_lempel_ziv_referencia(''.join(map(str, linha.astype(int)))) for linha in binario])
+    assert np.allclose(entropia_amostral_lote(epocas), [entropia_amostral(epoca) for epoca in epocas])
+    print("   ✅ LZ76 e entropia amostral em lote iguais às versões por linha!")
+
+def testar_entropia_multiescala():
+    """Testa o coarse graining por somas acumuladas e a entropia por escala em lote"""
+    
+    print("\n📐 TESTANDO ENTROPIA MULTIESCALA")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(5)
+    sinais = rng.normal(0, 1, (4, 1003))
+    somas = somas_acumuladas(sinais)
+    for escala in (1, 2, 5, 7):
+        n_blocos = sinais.shape[1] // escala
+        esperado = sinais[:, :n_blocos * escala].reshape(4, n_blocos, escala).mean(axis=2)
+        assert np.allclose(granular(somas, escala), esperado)
+    print("   ✅ Coarse graining igual às médias de blocos!")
+    
+    # Lote igual ao cálculo sinal a sinal; escala 1 = entropia de Shannon da dinâmica simbólica
+    curvas = entropia_multiescala_lote(sinais, 5, 'simbolica')
+    assert curvas.shape == (4, 5)
+    for linha, sinal in enumerate(sinais):
+        assert np.allclose(curvas[linha], entropia_multiescala(sinal, 5, 'simbolica'))
+        frequencias = calcular_frequencia(converter_para_decimal(
+            gerar_grupos_deslizantes(gerar_sequencia_binaria(sinal, np.mean(sinal)), 3)))
+        assert np.isclose(curvas[linha, 0], calcular_entropia_shannon(frequencias))
+    
+    # Ruído branco perde entropia amostral nas escalas maiores
+    amostral = entropia_multiescala(rng.normal(0, 1, 6000), 5, 'amostral')
+    print(f"   Entropia amostral por escala (ruído branco): {np.round(amostral, 3)}")
+    assert amostral[0] > amostral[-1]
+    print("   ✅ Entropia multiescala CORRETA!")
+
+def testar_predicao_lote():
+    """Testa a predição em lote contra a predição sinal a sinal (sem banco: valores em memória)"""
+    from sklearn.ensemble import RandomForestClassifier
+    from ml_classifier import EEGClassifier
+    from extracao_features import extrair_features_valores
+    
+    print("\n📦 TESTANDO PREDIÇÃO EM LOTE")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(13)
+    sinais = {id_sinal: np.cumsum(rng.normal(0, 1, comprimento)).astype(config.PIPELINE_DTYPE)
+              for id_sinal, comprimento in zip(range(1, 9), [600, 600, 800, 600, 800, 700, 600, 900])}
+    sinais[9] = np.zeros(600, dtype=config.PIPELINE_DTYPE)  # Reprovado na triagem
+    
+    classificador = EEGClassifier()
+    classificador.feature_names = list(NOMES_FEATURES_BASICAS)
+    X = np.array([list(extrair_features_valores(v, nomes=NOMES_FEATURES_BASICAS).values()) for v in sinais.values()])
+    classificador.model = RandomForestClassifier(n_estimators=10, random_state=0).fit(
+        classificador._escalar(X, ajustar=True), np.arange(len(X)) % 2)
+    classificador.is_trained = True
+    classificador.obter_valores_sinais = lambda ids: {i: sinais[i] for i in ids if i in sinais}
+    
+    resultados = classificador.prever_lote(list(sinais) + [99])
+    assert resultados[9] is None and resultados[99] is None
+    for id_sinal in range(1, 9):
+        individual = classificador.prever_com_features(extrair_features_valores(sinais[id_sinal], nomes=NOMES_FEATURES_BASICAS))
+        assert np.isclose(resultados[id_sinal]['probabilidade'], individual['probabilidade'])
+        assert resultados[id_sinal]['classe_predita'] == individual['classe_predita']
+    print(f"   ✅ {len(resultados) - 2} sinais preditos em lote, iguais à predição individual!")
+    
+    # Vários modelos com features extraídas uma única vez
+    from ml_classifier import prever_lote_modelos
+    outro = EEGClassifier()
+    outro.feature_names = NOMES_FEATURES_BASICAS[::-1][:10]
+    outro.model = RandomForestClassifier(n_estimators=10, random_state=1).fit(
+        outro._escalar(X[:, ::-1][:, :10], ajustar=True), np.arange(len(X)) % 3 == 0)
+    outro.is_trained = True
+    outro.obter_valores_sinais = classificador.obter_valores_sinais
+    
+    extracoes = []
+    extrair_original = classificador.extrair_features_lote
+    classificador.extrair_features_lote = lambda *args: extracoes.append(args) or extrair_original(*args)
+    predicoes = prever_lote_modelos({'principal': classificador, 'outro': outro, 'ausente': None}, list(sinais))
+    assert set(predicoes) == {'principal', 'outro'} and len(extracoes) == 1
+    for nome, modelo in (('principal', classificador), ('outro', outro)):
+        individuais = modelo.prever_lote(list(sinais))
+        for id_sinal in sinais:
+            if individuais[id_sinal] is None:
+                assert predicoes[nome][id_sinal] is None
+            else:
+                assert np.isclose(predicoes[nome][id_sinal]['probabilidade'], individuais[id_sinal]['probabilidade'])
+    print("   ✅ Features compartilhadas entre modelos com uma única extração!")
+    
+    # Pontuação na ingestão: valores em memória, sem consultar o banco
+    consultas = []
+    classificador.obter_valores_sinais = lambda ids: consultas.append(ids) or {}
+    na_ingestao = prever_lote_modelos({'principal': classificador, 'outro': outro}, [3], {3: sinais[3]})
+    assert not consultas
+    for nome in ('principal', 'outro'):
+        assert np.isclose(na_ingestao[nome][3]['probabilidade'], predicoes[nome][3]['probabilidade'])
+    print("   ✅ Pontuação a partir do array em memória igual à do banco!")
+    
+    # Paridade com o caminho de treino (extrair_features_sinal/prever_sinal), com a dinâmica
+    # simbólica do banco substituída por uma em memória e m diferente do padrão: os dois
+    # caminhos leem config.SYMBOLIC_M
+    import ml_classifier
+    ms_usados = []
+    def dinamica_em_memoria(id_sinal, m=3):
+        ms_usados.append(m)
+        limiar = float(np.mean(sinais[id_sinal], dtype=np.float64))
+        sequencia = gerar_sequencia_binaria(sinais[id_sinal], limiar)
+        palavras = converter_para_decimal(gerar_grupos_deslizantes(sequencia, m))
+        frequencias = calcular_frequencia(palavras)
+        return {'sequencia_binaria': sequencia, 'palavras_decimais': palavras, 'limiar': limiar,
+                'entropia': calcular_entropia_shannon(frequencias), 'frequencias': frequencias}
+    
+    dinamica_original, m_original = ml_classifier.aplicar_dinamica_simbolica, config.SYMBOLIC_M
+    ml_classifier.aplicar_dinamica_simbolica, config.SYMBOLIC_M = dinamica_em_memoria, 4
+    classificador.obter_valores_sinal = lambda id_sinal: sinais[id_sinal]
+    classificador.obter_valores_sinais = lambda ids: {i: sinais[i] for i in ids if i in sinais}
+    try:
+        ids_lote, X_lote = classificador.extrair_features_lote({i: sinais[i] for i in range(1, 9)}, NOMES_FEATURES)
+        lote = classificador.prever_lote(list(range(1, 9)))
+        for linha, id_sinal in enumerate(ids_lote):
+            features = classificador.extrair_features_sinal(id_sinal)
+            assert np.allclose(X_lote[linha], [features[nome] for nome in NOMES_FEATURES], rtol=1e-4, atol=1e-5)
+            individual = classificador.prever_sinal(id_sinal)
+            assert np.isclose(lote[id_sinal]['probabilidade'], individual['probabilidade'])
+            assert lote[id_sinal]['classe_predita'] == individual['classe_predita']
+    finally:
+        ml_classifier.aplicar_dinamica_simbolica, config.SYMBOLIC_M = dinamica_original, m_original
+    assert ms_usados and set(ms_usados) == {4}
+    print("   ✅ Lote igual a extrair_features_sinal/prever_sinal com o mesmo m!")
+
+def testar_cache_predicoes():
+    """Testa o cache versionado de predições (LRU, invalidação, persistência)"""
+    import tempfile
+    import pickle
+    from cache_predicoes import CachePredicoes, versao_arquivo_modelo
+    from ml_classifier import EEGClassifier
+    
+    print("\n🗃️ TESTANDO CACHE DE PREDIÇÕES")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        cache = CachePredicoes(os.path.join(pasta, 'cache.pkl'), capacidade=3)
+        predicao = {'classe_predita': 'Sim', 'probabilidade': 0.9}
+        
+        for id_sinal in (1, 2, 3):
+            cache.guardar(id_sinal, 'principal', 'v1', predicao)
+        assert cache.obter(1, 'principal', 'v1') == predicao  # 1 passa a ser o mais recente
+        cache.guardar(4, 'principal', 'v1', predicao)         # 2 sai pelo LRU
+        assert cache.obter(2, 'principal', 'v1') is None
+        assert cache.obter(1, 'principal', 'v2') is None      # Outra versão do modelo
+        assert cache.estatisticas()['taxa_acerto'] == round(1 / 3, 4)
+        
+        cache.guardar(4, 'lstm', 'v1', predicao)              # 3 sai pelo LRU
+        assert cache.invalidar_modelo('principal', manter_versao='v1') == 0
+        assert cache.invalidar_sinal(4) == 2 and len(cache) == 1
+        assert cache.invalidar_modelo('principal', manter_versao='v2') == 1 and len(cache) == 0
+        
+        # Persistência e descarte do formato antigo {id_sinal: predição}
+        cache.guardar(5, 'principal', 'v1', predicao)
+        assert cache.salvar()
+        recarregado = CachePredicoes(cache.caminho_arquivo, capacidade=3)
+        assert recarregado.carregar() and recarregado.obter(5, 'principal', 'v1') == predicao
+        with open(cache.caminho_arquivo, 'wb') as f:
+            pickle.dump({5: predicao}, f)
+        assert not CachePredicoes(cache.caminho_arquivo).carregar()
+        
+        # A versão do classificador é o hash do arquivo salvo, e muda quando o modelo muda
+        classificador = EEGClassifier()
+        classificador.model = {'pesos': [1, 2, 3]}
+        classificador.is_trained = True
+        caminho_modelo = os.path.join(pasta, 'modelo.pkl')
+        classificador.salvar_modelo(caminho_modelo)
+        versao = classificador.versao
+        assert versao and versao == versao_arquivo_modelo(caminho_modelo)
+        classificador.model = {'pesos': [4, 5, 6]}
+        classificador.salvar_modelo(caminho_modelo)
+        assert classificador.versao != versao and classificador.versao == versao_arquivo_modelo(caminho_modelo)
+        assert versao_arquivo_modelo(os.path.join(pasta, 'inexistente.pkl')) is None
+    
+    print("   ✅ Cache de predições CORRETO!")
+
+def testar_loteador_inferencia():
+    """Testa o agrupamento de pedidos concorrentes em micro-lotes"""
+    import threading
+    from servidor_inferencia import LoteadorInferencia
+    
+    print("\n🚚 TESTANDO MICRO-LOTES DE INFERÊNCIA")
+    print("=" * 50)
+    
+    lotes = []
+    def prever_ids(ids):
+        lotes.append(list(ids))
+        if -1 in ids:
+            raise ValueError("sinal inválido")
+        return {id_sinal: id_sinal * 10 for id_sinal in ids}
+    
+    loteador = LoteadorInferencia(prever_ids, janela_ms=50, max_itens=16)
+    resultados = {}
+    def cliente(id_sinal):
+        resultados[id_sinal] = loteador.prever(id_sinal, timeout=5)
+    
+    clientes = [threading.Thread(target=cliente, args=(id_sinal,)) for id_sinal in range(40)]
+    for thread in clientes:
+        thread.start()
+    for thread in clientes:
+        thread.join()
+    
+    assert resultados == {id_sinal: id_sinal * 10 for id_sinal in range(40)}
+    assert max(len(lote) for lote in lotes) <= 16 and len(lotes) < 40
+    print(f"   40 pedidos atendidos em {len(lotes)} lotes: {loteador.estatisticas()}")
+    
+    # Uma falha na predição chega a todos os pedidos do lote
+    futuros = [loteador.submeter(id_sinal) for id_sinal in (-1, 7)]
+    for futuro in futuros:
+        try:
+            futuro.result(timeout=5)
+            assert False, "A exceção deveria ser propagada"
+        except ValueError:
+            pass
+    
+    loteador.parar()
+    print("   ✅ Micro-lotes de inferência CORRETOS!")
+
+def testar_floresta_compilada():
+    """Testa a Random Forest compilada em arrays contra o predict_proba do sklearn"""
+    from sklearn.ensemble import RandomForestClassifier
+    from floresta_compilada import compilar_floresta
+    from ml_classifier import EEGClassifier
+    
+    print("\n🌲 TESTANDO RANDOM FOREST COMPILADA")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(17)
+    X = rng.normal(size=(400, 12))
+    y = (X[:, 0] + X[:, 1] ** 2 + rng.normal(size=400) > 1).astype(int)
+    X_teste = rng.normal(size=(300, 12))
+    
+    for parametros in ({'max_depth': 10}, {'max_depth': None, 'class_weight': 'balanced'}):
+        floresta = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=1, **parametros).fit(X, y)
+        compilada = compilar_floresta(floresta)
+        assert np.array_equal(compilada.predict_proba(X_teste), floresta.predict_proba(X_teste)), parametros
+        assert np.array_equal(compilada.predict(X_teste), floresta.predict(X_teste))
+        assert np.array_equal(compilada.predict_proba(X_teste[:1]), floresta.predict_proba(X_teste[:1]))
+    print("   ✅ Probabilidades idênticas ao sklearn (lote e linha única)!")
+    
+    # O EEGClassifier usa a floresta compilada depois do treino
+    classificador = EEGClassifier()
+    classificador.criar_modelo('random_forest')
+    classificador.model.set_params(n_jobs=1)
+    classificador.treinar_modelo(X, y)
+    assert classificador.floresta_compilada is not None
+    esperado = classificador.model.predict_proba(classificador._escalar(X_teste))[:, 1]
+    assert np.array_equal(classificador.prever_matriz(X_teste), esperado)
+    print("   ✅ EEGClassifier.prever_matriz usa a floresta compilada!")
+
+def testar_mlp_numpy():
+    """Testa o forward pass em numpy do mlp_tabular contra o Keras"""
+    import tempfile
+    from ml_classifier import EEGClassifier
+    from mlp_numpy import MLPNumpy
+    from sklearn.preprocessing import StandardScaler
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout, BatchNormalization, Input
+    
+    print("\n🧮 TESTANDO MLP TABULAR EM NUMPY")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(19)
+    X = rng.normal(3, 5, (200, 8))
+    
+    classificador = EEGClassifier()
+    classificador.feature_names = [f'f{i}' for i in range(8)]
+    classificador.tipo_modelo_keras = 'mlp_tabular'
+    classificador.model = classificador._criar_mlp_tabular(8)
+    
+    # Estatísticas da BatchNormalization diferentes da identidade
+    for camada in classificador.model.layers:
+        if isinstance(camada, BatchNormalization):
+            camada.set_weights([rng.uniform(0.5, 2, w.shape) if i != 1 else rng.normal(0, 1, w.shape)
+                                for i, w in enumerate(camada.get_weights())])
+    classificador.scaler = StandardScaler().fit(X)
+    classificador.is_trained = True
+    
+    esperado = classificador.model.predict(classificador._escalar(X), verbose=0).ravel()
+    classificador._exportar_mlp_numpy()
+    assert classificador.mlp_numpy is not None
+    assert np.allclose(classificador.prever_matriz(X), esperado, atol=1e-5)
+    print("   ✅ Mesma saída sigmoid do Keras (BN dobrada na Dense seguinte)!")
+    
+    # BN logo após uma Dense linear e BN no fim da rede
+    modelo = Sequential([Input(shape=(8,)), Dense(6), BatchNormalization(), Dense(4, activation='tanh'),
+                         Dropout(0.5), BatchNormalization()])
+    for camada in modelo.layers:
+        if isinstance(camada, BatchNormalization):
+            camada.set_weights([rng.uniform(0.5, 2, w.shape) for w in camada.get_weights()])
+    motor = MLPNumpy.de_modelo(modelo)
+    assert np.allclose(motor.forward(X), modelo.predict(X, verbose=0), atol=1e-4)
+    
+    # Arquivo .npz salvo junto com o modelo, carregado sem o Keras
+    with tempfile.TemporaryDirectory() as pasta:
+        classificador.salvar_modelo(os.path.join(pasta, 'modelo_mlp_tabular.pkl'))
+        carregado = MLPNumpy.carregar(os.path.join(pasta, 'modelo_mlp_tabular.npz'))
+        assert carregado.feature_names == classificador.feature_names
+        assert np.array_equal(carregado.prever_matriz(X), classificador.prever_matriz(X))
+    print("   ✅ Exportação .npz servida sem TensorFlow!")
+
+def testar_cascata_inferencia():
+    """Testa a cascata: só os sinais incertos vão aos modelos pesados, e o ajuste dos limiares"""
+    import tempfile
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from ml_classifier import EEGClassifier
+    from extracao_features import extrair_features_valores
+    from cascata_inferencia import CascataInferencia, combinar_probabilidades, ajustar_limiares
+    
+    print("\n🪜 TESTANDO CASCATA DE INFERÊNCIA")
+    print("=" * 50)
+    
+    combinada = combinar_probabilidades([[0.2, 0.6, np.nan], [np.nan, np.nan, np.nan]], 'media')
+    assert np.isclose(combinada[0], 0.4) and np.isnan(combinada[1])
+    assert np.isclose(combinar_probabilidades([[0.2, 0.6, 0.9]], 'votacao')[0], 2 / 3)
+    
+    rng = np.random.default_rng(5)
+    sinais = {id_sinal: np.cumsum(rng.normal(0, 1, 600)).astype(config.PIPELINE_DTYPE) for id_sinal in range(1, 13)}
+    X = np.array([list(extrair_features_valores(v, nomes=NOMES_FEATURES_BASICAS).values()) for v in sinais.values()])
+    y = np.arange(len(X)) % 2
+    
+    def criar(modelo, nomes):
+        classificador = EEGClassifier()
+        classificador.feature_names = list(nomes)
+        colunas = [NOMES_FEATURES_BASICAS.index(nome) for nome in nomes]
+        classificador.model = modelo.fit(classificador._escalar(X[:, colunas], ajustar=True), y)
+        classificador.is_trained = True
+        classificador.obter_valores_sinais = lambda ids: {i: sinais[i] for i in ids if i in sinais}
+        return classificador
+    
+    rapido = criar(RandomForestClassifier(n_estimators=15, random_state=0), NOMES_FEATURES_BASICAS)
+    pesados = {'a': criar(LogisticRegression(), NOMES_FEATURES_BASICAS[:8]),
+               'b': criar(LogisticRegression(C=0.1), NOMES_FEATURES_BASICAS[::-1]),
+               'ausente': None}
+    
+    linhas_pesadas = []
+    for modelo in (pesados['a'], pesados['b']):
+        prever_original = modelo.prever_matriz
+        modelo.prever_matriz = lambda X_, f=prever_original: linhas_pesadas.append(len(X_)) or f(X_)
+    
+    ids = list(sinais)
+    prob_rapido = {i: p['probabilidade'] for i, p in rapido.prever_lote(ids).items()}
+    cascata = CascataInferencia(limiar_inferior=0.35, limiar_superior=0.65, combinacao='media',
+                                caminho_limiares=os.path.join(tempfile.mkdtemp(), 'limiares.json'))
+    resultados = cascata.prever_lote(rapido, pesados, ids)
+    
+    incertos = [i for i in ids if 0.35 < prob_rapido[i] < 0.65]
+    assert linhas_pesadas == [len(incertos)] * 2 if incertos else linhas_pesadas == []
+    individuais = {nome: pesados[nome].prever_lote(ids) for nome in ('a', 'b')}
+    for i in ids:
+        assert resultados[i]['escalado'] == (i in incertos)
+        esperado = np.mean([individuais[n][i]['probabilidade'] for n in ('a', 'b')]) if i in incertos else prob_rapido[i]
+        assert np.isclose(resultados[i]['probabilidade'], esperado)
+    
+    estatisticas = cascata.estatisticas()
+    assert estatisticas['sinais'] == len(ids) and estatisticas['escalados'] == len(incertos)
+    print(f"   ✅ {len(incertos)}/{len(ids)} sinais escalados, latência economizada {estatisticas['latencia_economizada_s']}s")
+    
+    # Ajuste: o rápido erra perto de 0.5, os pesados acertam sempre
+    n = 400
+    rotulos = rng.integers(0, 2, n)
+    confiantes = rng.random(n) < 0.7
+    prob_r = np.where(confiantes, np.where(rotulos == 1, 0.9, 0.1), np.where(rotulos == 1, 0.45, 0.55))
+    prob_p = np.column_stack([np.where(rotulos == 1, 0.8, 0.2)] * 3)
+    prob_p[::10, 1] = np.nan
+    ajuste = ajustar_limiares(prob_r, prob_p, rotulos, tolerancia=0.0)
+    assert ajuste['acuracia'] == 1.0 and ajuste['acuracia_rapido'] < 1.0
+    assert np.isclose(ajuste['taxa_escalonamento'], 1 - confiantes.mean())
+    assert ajuste['limiar_inferior'] < 0.45 and ajuste['limiar_superior'] > 0.55
+    
+    assert cascata.salvar_limiares(ajuste)
+    outra = CascataInferencia(caminho_limiares=cascata.caminho_limiares)
+    assert outra.carregar_limiares() and outra.limiar_inferior == ajuste['limiar_inferior']
+    print(f"   ✅ Limiares ajustados: ({ajuste['limiar_inferior']}, {ajuste['limiar_superior']}), "
+          f"{ajuste['taxa_escalonamento']:.0%} escalados")
+    
+    # Predições de validação: as de sinais do próprio ajuste ficam de fora (o principal
+    # descarta o sinal, os pesados viram NaN); modelo sem ids_treino não entra
+    import app as aplicacao
+    salvas = [(i, tipo, 0.1 * i, 'S' if i % 2 else 'N')
+              for i in range(1, 7) for tipo in ('principal', 'mlp_tabular', 'cnn_original', 'lstm')]
+    
+    class CursorFalso:
+        def execute(self, consulta, parametros):
+            pass
+        def fetchall(self):
+            return salvas
+        def close(self):
+            pass
+    
+    class ConexaoFalsa:
+        def cursor(self):
+            return CursorFalso()
+        def close(self):
+            pass
+    
+    ids_treino = {'principal': {1, 2, 3}, 'mlp_tabular': {1, 2, 3, 4}, 'cnn_original': None, 'lstm': set()}
+    conexao_original = aplicacao.obter_conexao_db
+    aplicacao.obter_conexao_db = ConexaoFalsa
+    try:
+        prob_r, prob_p, rotulos = aplicacao.carregar_predicoes_validacao(['mlp_tabular', 'cnn_original', 'lstm'],
+                                                                         ids_treino)
+    finally:
+        aplicacao.obter_conexao_db = conexao_original
+    assert np.allclose(prob_r, [0.4, 0.5, 0.6]) and list(rotulos) == [0, 1, 0]
+    assert np.isnan(prob_p[0, 0]) and np.allclose(prob_p[1:, 0], [0.5, 0.6])
+    assert np.isnan(prob_p[:, 1]).all() and np.allclose(prob_p[:, 2], [0.4, 0.5, 0.6])
+    
+    # ids_treino persiste com o modelo
+    caminho = os.path.join(tempfile.mkdtemp(), 'rapido.pkl')
+    rapido.ids_treino = {1, 2, 3}
+    assert rapido.salvar_modelo(caminho)
+    carregado = EEGClassifier()
+    assert carregado.carregar_modelo(caminho) and carregado.ids_treino == {1, 2, 3}
+    print("   ✅ Ajuste só com predições fora do treino de cada modelo!")
+
+def testar_fila_tarefas():
+    """Testa a fila de tarefas: resultado, erro, profundidade máxima (429) e expiração"""
+    import threading
+    import time
+    import app as aplicacao
+    from fila_tarefas import FilaTarefas, FilaCheia, CONCLUIDA, ERRO
+    
+    print("\n📬 TESTANDO FILA DE TAREFAS")
+    print("=" * 50)
+    
+    liberar = threading.Event()
+    fila = FilaTarefas(max_trabalhadores=1, max_fila=2, expiracao_s=60)
+    bloqueada = fila.submeter('teste', lambda: liberar.wait(5) and 'ok')
+    com_erro = fila.submeter('teste', lambda: 1 / 0)
+    try:
+        fila.submeter('teste', lambda: None)
+        assert False, "A fila deveria estar cheia"
+    except FilaCheia:
+        pass
+    assert fila.estatisticas()['rejeitadas'] == 1
+    
+    liberar.set()
+    limite = time.time() + 5
+    while fila.estatisticas()['ativas'] and time.time() < limite:
+        time.sleep(0.01)
+    assert fila.obter(bloqueada)['status'] == CONCLUIDA and fila.obter(bloqueada)['resultado'] == 'ok'
+    assert fila.obter(com_erro)['status'] == ERRO and 'division' in fila.obter(com_erro)['erro']
+    
+    fila.expiracao_s = 0
+    time.sleep(0.01)
+    assert fila.obter(bloqueada) is None and fila.estatisticas()['guardadas'] == 0
+    fila.encerrar()
+    print("   ✅ Resultados, erros e expiração da fila CORRETOS!")
+    
+    # Rotas: 202 com o ID, consulta em /jobs/<id>, 429 com a fila cheia e 404 depois de expirar
+    fila_original = aplicacao.fila_tarefas
+    aplicacao.fila_tarefas = FilaTarefas(max_trabalhadores=1, max_fila=1, expiracao_s=60)
+    predicao_original = aplicacao.executar_predicao_sinal
+    liberar.clear()
+    aplicacao.executar_predicao_sinal = lambda sinal_id: liberar.wait(5) and {'sucesso': True, 'id': sinal_id}
+    try:
+        cliente = aplicacao.app.test_client()
+        resposta = cliente.get('/predicao_sinal/7?assincrono=1')
+        assert resposta.status_code == 202
+        url = resposta.get_json()['status_url']
+        assert cliente.get('/predicao_sinal/8?assincrono=1').status_code == 429
+        liberar.set()
+        limite = time.time() + 5
+        while cliente.get(url).get_json()['status'] != CONCLUIDA and time.time() < limite:
+            time.sleep(0.01)
+        assert cliente.get(url).get_json()['resultado'] == {'sucesso': True, 'id': 7}
+        assert cliente.get('/jobs/inexistente').status_code == 404
+    finally:
+        aplicacao.fila_tarefas.encerrar()
+        aplicacao.fila_tarefas = fila_original
+        aplicacao.executar_predicao_sinal = predicao_original
+    print("   ✅ Rotas assíncronas: 202, consulta do resultado, 429 e 404!")
+
+def testar_classificacao_continua():
+    """Testa a classificação contínua: eventos por salto iguais à predição da janela e estatísticas incrementais"""
+    from sklearn.ensemble import RandomForestClassifier
+    from ml_classifier import EEGClassifier
+    from extracao_features import extrair_features_valores
+    from classificacao_continua import BufferCircular, SessaoContinua, ler_amostras_texto
+    
+    print("\n📡 TESTANDO CLASSIFICAÇÃO CONTÍNUA")
+    print("=" * 50)
+    
+    buffer = BufferCircular(5)
+    assert len(buffer.escrever([1, 2, 3])) == 0
+    assert list(buffer.escrever([4, 5, 6, 7])) == [1, 2]
+    assert list(buffer.janela()) == [3, 4, 5, 6, 7]
+    
+    rng = np.random.default_rng(21)
+    treino = [np.cumsum(rng.normal(0, 1, 300)).astype(config.PIPELINE_DTYPE) for _ in range(8)]
+    classificador = EEGClassifier()
+    classificador.feature_names = list(NOMES_FEATURES_BASICAS)
+    X = np.array([list(extrair_features_valores(v, nomes=NOMES_FEATURES_BASICAS).values()) for v in treino])
+    classificador.model = RandomForestClassifier(n_estimators=10, random_state=0).fit(
+        classificador._escalar(X, ajustar=True), np.arange(len(X)) % 2)
+    classificador.is_trained = True
+    
+    janela, salto = 300, 64
+    sinal = (np.cumsum(rng.normal(0, 1, 2000)) * 10).round().astype(config.PIPELINE_DTYPE)
+    sessao = SessaoContinua('teste', janela=janela, salto=salto, m=3)
+    eventos = []
+    inicio = 0
+    for tamanho in rng.integers(1, 200, 100):
+        eventos += sessao.adicionar(sinal[inicio:inicio + tamanho], classificador)
+        inicio += tamanho
+        if inicio >= len(sinal):
+            break
+    
+    finais = [fim for fim in range(salto, len(sinal) + 1, salto) if fim >= janela]
+    assert [evento['amostra_final'] for evento in eventos] == finais
+    for evento in eventos:
+        fim = evento['amostra_final']
+        esperado = classificador.prever_com_features(extrair_features_valores(sinal[fim - janela:fim], nomes=NOMES_FEATURES_BASICAS))
+        assert np.isclose(evento['predicao']['probabilidade'], esperado['probabilidade'])
+        assert np.isclose(evento['estatisticas']['media_janela'], sinal[fim - janela:fim].mean(dtype=np.float64))
+    
+    estatisticas = sessao.estatisticas()
+    assert estatisticas['amostras'] == len(sinal)
+    assert np.isclose(estatisticas['media_sessao'], sinal.mean(dtype=np.float64))
+    assert np.isclose(estatisticas['desvio_padrao_sessao'], sinal.astype(np.float64).std())
+    
+    # Dinâmica simbólica causal contra o cálculo direto
+    valores = sinal.astype(np.float64)
+    bits = (valores >= np.cumsum(valores) / np.arange(1, len(valores) + 1)).astype(int)
+    palavras = bits[:-2] * 4 + bits[1:-1] * 2 + bits[2:]
+    assert np.array_equal(sessao.contagens_palavras, np.bincount(palavras, minlength=8))
+    assert sessao.buffer.dados.shape == (janela,)
+    print(f"   ✅ {len(eventos)} eventos iguais à predição da janela, estatísticas incrementais corretas!")
+    
+    # Leitura do corpo em blocos, com números cortados entre blocos
+    blocos = [b"1.5, 2", b"0\n-3", b" abc 4e1\n", b"5"]
+    assert np.allclose(np.concatenate(list(ler_amostras_texto(blocos))), [1.5, 20, -3, 40, 5])
+    print("   ✅ Leitura de blocos de texto CORRETA!")
+
+def testar_cache_datasets():
+    """Testa o cache de datasets: reutiliza com os mesmos sinais e rótulos, refaz quando mudam"""
+    import tempfile
+    from ml_classifier import EEGClassifier
+    
+    print("\n🗃️ TESTANDO CACHE DE DATASETS")
+    print("=" * 50)
+    
+    rotulos = {1: 'S', 2: 'S', 3: 'N', 4: 'N'}
+    
+    class CursorFalso:
+        def execute(self, consulta, parametros):
+            categoria, limite = parametros
+            self.linhas = [(i, f"sinal_{i}", p) for i, p in rotulos.items() if p == categoria][:limite]
+        def fetchall(self):
+            return self.linhas
+        def close(self):
+            pass
+    
+    class ConexaoFalsa:
+        def cursor(self):
+            return CursorFalso()
+        def close(self):
+            pass
+    
+    extracoes = []
+    def extrair(id_sinal):
+        extracoes.append(id_sinal)
+        return {nome: float(id_sinal * (k + 1)) for k, nome in enumerate(NOMES_FEATURES_BASICAS)}
+    
+    diretorio_original = config.DATASET_CACHE_DIR
+    config.DATASET_CACHE_DIR = tempfile.mkdtemp()
+    try:
+        classificador = EEGClassifier()
+        classificador.obter_conexao_db = ConexaoFalsa
+        classificador.extrair_features_sinal = extrair
+        
+        X1, y1, nomes1 = classificador.criar_dataset(limite=10)
+        assert len(extracoes) == 4 and classificador.dataset_do_cache is False
+        X2, y2, nomes2 = classificador.criar_dataset(limite=10)
+        assert len(extracoes) == 4 and classificador.dataset_do_cache is True
+        assert np.array_equal(X1, X2) and np.array_equal(y1, y2) and nomes1 == nomes2 == NOMES_FEATURES_BASICAS
+        
+        rotulos[2] = 'N'  # Rótulo alterado: nova chave
+        classificador.criar_dataset(limite=10)
+        assert len(extracoes) == 8 and classificador.dataset_do_cache is False
+    finally:
+        config.DATASET_CACHE_DIR = diretorio_original
+    print("   ✅ Dataset reutilizado sem extração e refeito com rótulo alterado!")
+
+def testar_treinamento_paralelo():
+    """Testa o orquestrador de treinamento paralelo: modelo salvo, falha isolada e progresso no log"""
+    import tempfile
+    from ml_classifier import EEGClassifier
+    from treinamento_paralelo import treinar_modelos_paralelo, orcamento_threads
+    
+    print("\n🏭 TESTANDO TREINAMENTO PARALELO")
+    print("=" * 50)
+    
+    assert orcamento_threads(4, n_nucleos=8) == 2 and orcamento_threads(4, n_nucleos=2) == 1
+    
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(40, len(NOMES_FEATURES_BASICAS))).astype(config.PIPELINE_DTYPE)
+    y = np.arange(40) % 2
+    diretorio = tempfile.mkdtemp()
+    caminho = os.path.join(diretorio, 'rf.pkl')
+    
+    mensagens = []
+    concluidos = []
+    resultados = treinar_modelos_paralelo(
+        [('principal', 'random_forest', caminho), ('invalido', 'tipo_inexistente', os.path.join(diretorio, 'x.pkl'))],
+        X, y, NOMES_FEATURES_BASICAS, log=mensagens.append,
+        ao_concluir=lambda nome, resultado: concluidos.append(nome))
+    
+    assert resultados['principal']['sucesso'] and not resultados['invalido']['sucesso']
+    assert sorted(concluidos) == ['invalido', 'principal']
+    assert any('principal' in mensagem and 'salvo' in mensagem for mensagem in mensagens)
+    
+    modelo = EEGClassifier()
+    assert modelo.carregar_modelo(caminho) and modelo.versao == resultados['principal']['versao']
+    assert modelo.feature_names == NOMES_FEATURES_BASICAS
+    print(f"   ✅ Modelo treinado em processo e salvo; falha isolada ({len(mensagens)} mensagens de log)")
+
+def testar_aprendizado_online():
+    """Testa o aprendizado online: partial_fit por rótulo, versão atômica, retreino periódico e por drift"""
+    import tempfile
+    from aprendizado_online import AprendizadoOnline
+    
+    print("\n🔁 TESTANDO APRENDIZADO ONLINE")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(4)
+    diretorio = tempfile.mkdtemp()
+    caminho = os.path.join(diretorio, 'online.pkl')
+    online = AprendizadoOnline(caminho=caminho, tipo_modelo='sgd', retreino_a_cada=12, janela_drift=4, limiar_drift=0.5)
+    
+    versoes = set()
+    motivos = []
+    for i in range(12):
+        rotulo = 'S' if i % 2 else 'N'
+        sinal = rng.normal(0, 80 if rotulo == 'S' else 20, 1000).round()
+        resultado = online.registrar_rotulo(sinal, rotulo)
+        assert resultado['atualizado'] and resultado['tempo_ms'] > 0
+        versoes.add(resultado['versao'])
+        motivos.append(resultado['retreino'])
+    
+    assert len(versoes) == 12 and os.path.exists(caminho) and not os.path.exists(caminho + '.tmp')
+    assert motivos[-1] == 'periodico' and not any(motivos[:-1])
+    assert online.estatisticas()['rotulos_avaliados'] == 4
+    
+    # Arquivo salvo é o modelo atual
+    recarregado = AprendizadoOnline(caminho=caminho)
+    assert recarregado.carregar() and recarregado.modelo.versao == online.modelo.versao
+    
+    # Sinal reprovado na triagem não atualiza o modelo
+    assert not online.registrar_rotulo(np.zeros(1000), 'S')['atualizado']
+    
+    # Retreino completo zera os contadores
+    X = rng.normal(size=(40, len(online.modelo.feature_names))).astype(config.PIPELINE_DTYPE)
+    y = np.arange(40) % 2
+    thread = online.iniciar_retreino(lambda: (X, y, online.modelo.feature_names), 'periodico', log=lambda mensagem: None)
+    thread.join()
+    estatisticas = online.estatisticas()
+    assert estatisticas['retreinos'] == 1 and estatisticas['rotulos_desde_retreino'] == 0
+    
+    # Drift: acurácia recente cai abaixo da melhor da janela
+    online.acertos.extend([True] * 4)
+    assert online._motivo_retreino() is None
+    online.acertos.extend([False] * 3)
+    assert online._motivo_retreino() == 'drift'
+    
+    # O MLP sklearn sem early stopping também aprende rótulo a rótulo
+    mlp = AprendizadoOnline(caminho=os.path.join(diretorio, 'mlp.pkl'), tipo_modelo='mlp_online')
+    assert mlp.registrar_rotulo(rng.normal(0, 50, 1000).round(), 'S')['atualizado']
+    print(f"   ✅ {estatisticas['total_rotulos']} rótulos em {estatisticas['tempo_medio_ms']:.1f} ms em média; retreino e drift detectados")
+
+def testar_floresta_incremental():
+    """Testa o Random Forest incremental: árvores novas, aposentadoria, holdout estável e queda de acurácia"""
+    import tempfile
+    from ml_classifier import EEGClassifier
+    from floresta_incremental import em_holdout
+    
+    print("\n🌲 TESTANDO RANDOM FOREST INCREMENTAL")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(5)
+    def gerar(ids, inverter=False):
+        y = np.asarray(ids) % 2
+        X = rng.normal(size=(len(ids), len(NOMES_FEATURES_BASICAS))) + 2.0 * (y[:, None] if not inverter else 1 - y[:, None])
+        return X.astype(config.PIPELINE_DTYPE), y
+    
+    assert np.array_equal(em_holdout(np.arange(1, 500), 0.2), em_holdout(np.arange(1, 500), 0.2))
+    assert 0.1 < em_holdout(np.arange(1, 500), 0.2).mean() < 0.3
+    
+    modelo = EEGClassifier()
+    modelo.feature_names = NOMES_FEATURES_BASICAS
+    ids = np.arange(1, 201)
+    X, y = gerar(ids)
+    registro = modelo.treinar_floresta_completa(X, y, ids)
+    assert registro['modo'] == 'completo' and registro['arvores'] == 100 and registro['acuracia_holdout'] > 0.9
+    assert modelo.ids_treino == set(ids[~em_holdout(ids, config.RF_HOLDOUT_FRACTION)].tolist())
+    
+    # Cada lote de sinais novos acrescenta árvores; acima do máximo as antigas saem
+    sementes = []
+    for lote in range(8):
+        ids_novos = np.arange(201 + 40 * lote, 241 + 40 * lote)
+        registro = modelo.crescer_floresta_incremental(*gerar(ids_novos), ids_novos)
+        assert registro['arvores_novas'] == config.RF_INCREMENT_TREES and not registro['requer_completo']
+        sementes.append(tuple(arvore.random_state for arvore in modelo.model.estimators_[-config.RF_INCREMENT_TREES:]))
+    
+    # Com a floresta cheia, cada rodada ainda sorteia sementes novas (e a base não muda)
+    assert len(set(sementes)) == len(sementes)
+    assert modelo.model.random_state == 42
+    assert registro['arvores'] == config.RF_MAX_TREES and registro['arvores_aposentadas'] == config.RF_INCREMENT_TREES
+    assert registro['amostras_janela'] <= config.RF_RECENT_WINDOW
+    assert len(modelo.model.estimators_) == modelo.model.n_estimators == config.RF_MAX_TREES
+    todos = np.arange(1, 241 + 40 * 7)
+    assert modelo.ids_treino == set(todos[~em_holdout(todos, config.RF_HOLDOUT_FRACTION)].tolist())
+    
+    # Estado salvo junto com o modelo
+    caminho = os.path.join(tempfile.mkdtemp(), 'rf.pkl')
+    assert modelo.salvar_modelo(caminho)
+    recarregado = EEGClassifier()
+    assert recarregado.carregar_modelo(caminho)
+    assert recarregado.estado_incremental['ids'] == modelo.estado_incremental['ids']
+    
+    # Sem sinais novos, nada muda
+    recarregado.buscar_sinais_rotulados = lambda: [(201, 'N')]
+    assert recarregado.retreinar_floresta(log=lambda mensagem: None)['modo'] == 'sem_novos'
+    
+    # Rótulos invertidos derrubam a acurácia no holdout: pede o ajuste completo
+    ids_invertidos = np.arange(1000, 1200)
+    registro = modelo.crescer_floresta_incremental(*gerar(ids_invertidos, inverter=True), ids_invertidos)
+    assert registro['requer_completo']
+    print(f"   ✅ Floresta cresceu até {config.RF_MAX_TREES} árvores; queda no holdout detectada "
+          f"({registro['acuracia_holdout']:.2f} < {registro['acuracia_referencia']:.2f})")
+
+def testar_busca_hiperparametros():
+    """Testa a busca de hiperparâmetros: rodadas do successive halving, leaderboard e criar_modelo usando o melhor"""
+    import tempfile
+    from ml_classifier import EEGClassifier
+    from busca_hiperparametros import buscar_hiperparametros, avaliar_tentativa, orcamentos_rodadas, carregar_resultados
+    
+    print("\n🎛️ TESTANDO BUSCA DE HIPERPARÂMETROS")
+    print("=" * 50)
+    
+    assert orcamentos_rodadas(3, 1 / 9) == [1 / 9, 1 / 3, 1.0]
+    
+    rng = np.random.default_rng(6)
+    y = np.arange(60) % 2
+    X = (rng.normal(size=(60, len(NOMES_FEATURES_BASICAS))) + 1.5 * y[:, None]).astype(config.PIPELINE_DTYPE)
+    
+    caminho_original = config.HYPERPARAMS_PATH
+    config.HYPERPARAMS_PATH = os.path.join(tempfile.mkdtemp(), 'hiperparametros.json')
+    try:
+        # Avaliação no próprio processo: 9 -> 3 -> 1 configurações por tipo
+        avaliar = lambda tipo, parametros, orcamento: avaliar_tentativa(tipo, parametros, orcamento, X, y, NOMES_FEATURES_BASICAS)
+        resultado = buscar_hiperparametros(X, y, NOMES_FEATURES_BASICAS, tipos_modelos=['random_forest', 'sgd'],
+                                           n_configuracoes=9, eta=3, orcamento_minimo=1 / 9,
+                                           log=lambda mensagem: None, avaliar=avaliar)
+        assert len(resultado['leaderboard']) == 2 * (9 + 3 + 1)
+        assert set(resultado['melhores']) == {'random_forest', 'sgd'}
+        assert resultado['melhores']['random_forest']['acuracia'] > 0.7
+        
+        # criar_modelo passa a usar a melhor configuração gravada
+        melhor_rf = resultado['melhores']['random_forest']['parametros']
+        modelo = EEGClassifier()
+        modelo.criar_modelo('random_forest')
+        assert all(modelo.model.get_params()[nome] == valor for nome, valor in melhor_rf.items())
+        
+        # Pool de processos: os melhores de outros tipos são mantidos no arquivo
+        resultado = buscar_hiperparametros(X, y, NOMES_FEATURES_BASICAS, tipos_modelos=['sgd'], n_configuracoes=3,
+                                           eta=3, orcamento_minimo=1 / 3, max_processos=1, log=lambda mensagem: None)
+        assert len(resultado['leaderboard']) == 3 + 1 and 'erro' not in resultado['leaderboard'][0]
+        assert set(carregar_resultados()['melhores']) == {'random_forest', 'sgd'}
+    finally:
+        config.HYPERPARAMS_PATH = caminho_original
+    print(f"   ✅ Successive halving com {len(resultado['leaderboard'])} tentativas no pool; melhor configuração aplicada")
+
+def testar_validacao_cruzada():
+    """Testa a validação cruzada: dobras estratificadas, cache das dobras e intervalo de confiança"""
+    import tempfile
+    from validacao_cruzada import validar_modelo, ajustar_dobra, dividir_dobras, intervalo_confianca
+    
+    print("\n🧪 TESTANDO VALIDAÇÃO CRUZADA")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(7)
+    y = np.arange(50) % 2
+    X = (rng.normal(size=(50, len(NOMES_FEATURES_BASICAS))) + 1.5 * y[:, None]).astype(config.PIPELINE_DTYPE)
+    
+    dobras = dividir_dobras(y, 5, repeticoes=2)
+    assert len(dobras) == 10
+    for _, _, treino, teste in dobras:
+        assert len(np.intersect1d(treino, teste)) == 0 and abs(y[teste].mean() - 0.5) <= 0.1
+    assert len(dividir_dobras(np.array([0, 0, 0, 1, 1]), 5)) == 2  # k limitado pela menor classe
+    
+    intervalo = intervalo_confianca([0.8, 0.9, 0.85, 0.95, 0.75], fracao_teste=0.2)
+    assert intervalo['ic'][0] < intervalo['media'] < intervalo['ic'][1] <= 1.0
+    
+    diretorio = tempfile.mkdtemp()
+    ajustes = []
+    def ajustar(tipo, hiperparametros, treino, teste):
+        ajustes.append(len(teste))
+        return ajustar_dobra(tipo, hiperparametros, treino, teste, X, y, NOMES_FEATURES_BASICAS)
+    
+    resultado = validar_modelo(X, y, NOMES_FEATURES_BASICAS, 'random_forest', k=5, repeticoes=2, hiperparametros={},
+                               log=lambda mensagem: None, ajustar=ajustar, diretorio_cache=diretorio)
+    assert len(ajustes) == 10 and len(resultado['dobras']) == 10 and resultado['dobras_em_cache'] == 0
+    assert resultado['acuracia']['media'] > 0.7 and resultado['acuracia']['ic'][0] < resultado['acuracia']['media']
+    
+    # Mesmos dados e configuração: todas as dobras vêm do cache
+    repetido = validar_modelo(X, y, NOMES_FEATURES_BASICAS, 'random_forest', k=5, repeticoes=2, hiperparametros={},
+                              log=lambda mensagem: None, ajustar=ajustar, diretorio_cache=diretorio)
+    assert len(ajustes) == 10 and repetido['dobras_em_cache'] == 10
+    assert repetido['acuracia'] == resultado['acuracia']
+    
+    # Dobras ajustadas em paralelo no pool de processos
+    paralelo = validar_modelo(X, y, NOMES_FEATURES_BASICAS, 'sgd', k=3, repeticoes=1, hiperparametros={},
+                              max_processos=2, log=lambda mensagem: None, diretorio_cache=diretorio)
+    assert len(paralelo['dobras']) == 3 and paralelo['dobras_em_cache'] == 0
+    ic = resultado['acuracia']['ic']
+    print(f"   ✅ Acurácia {resultado['acuracia']['media']:.3f} (IC 95% {ic[0]:.3f}–{ic[1]:.3f}); dobras reaproveitadas do cache")
+
+def testar_pipeline_dados():
+    """Testa os pipelines tf.data em memória e a partir de um armazém em disco (memmap)"""
+    import tempfile
+    import pipeline_dados
+    from sklearn.preprocessing import StandardScaler
+    from ml_classifier import EEGClassifier
+    
+    print("\n🧪 TESTANDO PIPELINE TF.DATA")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(11)
+    y = np.arange(60) % 2
+    X = (rng.normal(size=(60, len(NOMES_FEATURES_BASICAS))) + 1.5 * y[:, None]).astype(config.PIPELINE_DTYPE)
+    scaler = pipeline_dados.ajustar_scaler(StandardScaler(), X)
+    esperado = scaler.transform(X).astype(config.PIPELINE_DTYPE)
+    
+    # Em memória: escala e formato (n, f, 1) aplicados no pipeline, em ordem sem embaralhar
+    lotes = list(pipeline_dados.criar_pipeline(X, y, scaler=scaler, canal=True, batch_size=16).as_numpy_iterator())
+    assert [len(x) for x, _ in lotes] == [16, 16, 16, 12] and lotes[0][0].shape[1:] == (X.shape[1], 1)
+    assert np.allclose(np.concatenate([x for x, _ in lotes])[..., 0], esperado, atol=1e-5)
+    
+    # Armazém em disco: scaler em blocos igual ao ajuste direto; embaralhado mantém os pares (x, y)
+    diretorio = pipeline_dados.salvar_armazem(tempfile.mkdtemp(), X, y, NOMES_FEATURES_BASICAS)
+    X_disco, y_disco, nomes = pipeline_dados.abrir_armazem(diretorio)
+    assert pipeline_dados.em_disco(X_disco) and nomes == list(NOMES_FEATURES_BASICAS)
+    scaler_disco = pipeline_dados.ajustar_scaler(StandardScaler(), X_disco, tamanho_bloco=7)
+    assert np.allclose(scaler_disco.mean_, scaler.mean_, atol=1e-5) and np.allclose(scaler_disco.scale_, scaler.scale_, atol=1e-5)
+    
+    indices = np.arange(10, 50)
+    dados = pipeline_dados.criar_pipeline(X_disco, y_disco, indices, scaler_disco, batch_size=8, embaralhar=True)
+    x_lidos, y_lidos = map(np.concatenate, zip(*dados.as_numpy_iterator()))
+    ordem = np.lexsort(x_lidos.T[::-1])
+    referencia = np.lexsort(esperado[indices].T[::-1])
+    assert np.allclose(x_lidos[ordem], esperado[indices][referencia], atol=1e-5)
+    assert np.array_equal(y_lidos[ordem], y[indices][referencia])
+    
+    # Cache em arquivo: a segunda época repete as amostras, em outra ordem
+    cache = os.path.join(tempfile.mkdtemp(), 'cache')
+    dados = pipeline_dados.criar_pipeline(X_disco, y_disco, scaler=scaler_disco, batch_size=8, embaralhar=True, cache=cache)
+    epocas = [np.concatenate([x for x, _ in dados.as_numpy_iterator()]) for _ in range(2)]
+    assert np.allclose(np.sort(epocas[0], axis=0), np.sort(epocas[1], axis=0)) and not np.allclose(epocas[0], epocas[1])
+    
+    # Treino e predição Keras direto do memmap, com cache em arquivo: o ajuste usa um
+    # prefixo próprio sob TFDATA_CACHE e não deixa arquivos ao terminar
+    pasta_cache = tempfile.mkdtemp()
+    cache_original = config.TFDATA_CACHE
+    config.TFDATA_CACHE = os.path.join(pasta_cache, 'keras')
+    try:
+        classificador = EEGClassifier()
+        classificador.criar_modelo('mlp_tabular', {'epochs': 3, 'batch_size': 16})
+        resultado = classificador.treinar_modelo(X_disco, y_disco)
+    finally:
+        config.TFDATA_CACHE = cache_original
+    assert classificador.is_trained and len(resultado['history']['loss']) <= 3
+    assert os.listdir(pasta_cache) == []
+    probabilidades = classificador.prever_matriz(X_disco)
+    assert probabilidades.shape == (60,) and np.allclose(probabilidades, classificador.prever_matriz(X), atol=1e-4)
+    print(f"   ✅ Pipelines em memória e em disco; acurácia de validação do memmap {resultado['accuracy']:.3f}")
+
+def testar_sinais_brutos():
+    """Testa o armazém de sinais brutos, o gerador de janelas balanceado e o modelo cnn_bruto"""
+    import tempfile
+    import sinais_brutos
+    from ml_classifier import EEGClassifier, prever_lote_modelos
+    
+    print("\n🧪 TESTANDO CNN EM SINAIS BRUTOS")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(5)
+    t = np.arange(1500)
+    sinais = []
+    for id_sinal in range(1, 17):
+        rotulo = int(id_sinal <= 4)  # Classes desbalanceadas: 4 positivos, 12 negativos
+        valores = rng.normal(0, 20, len(t)) + (60 * np.sin(2 * np.pi * t / 16) if rotulo else 0)
+        sinais.append((id_sinal, valores.round(), rotulo))
+    sinais.append((99, rng.normal(0, 20, 100).round(), 0))  # Menor que a janela: fica fora do treino
+    
+    diretorio = tempfile.mkdtemp()
+    armazem = sinais_brutos.salvar_armazem_sinais(diretorio, iter(sinais))
+    assert isinstance(armazem.valores, np.memmap) and len(armazem) == 17
+    assert np.array_equal(armazem.sinal(3), sinais[3][1].astype(config.PIPELINE_DTYPE))
+    
+    # Gerador: classes balanceadas, janelas normalizadas e deslocamentos variados
+    gerador = sinais_brutos.gerar_lotes_aleatorios(armazem, np.arange(17), 128, 64)
+    janelas, rotulos = zip(*(next(gerador) for _ in range(10)))
+    janelas, rotulos = np.concatenate(janelas), np.concatenate(rotulos)
+    assert janelas.shape == (640, 128, 1) and 0.4 < rotulos.mean() < 0.6
+    assert np.allclose(janelas.mean(axis=1), 0, atol=1e-3) and len(np.unique(janelas[:, 0, 0])) > 600
+    fixos = list(sinais_brutos.gerar_lotes_fixos(armazem, [0, 16], 128, 0.5, 8))
+    assert sum(len(x) for x, _ in fixos) == len(sinais_brutos.janelas_epocas(armazem.sinal(0), 128, 0.5)[0])
+    assert len(fixos) == sinais_brutos.lotes_fixos(armazem, [0, 16], 128, 0.5, 8)
+    validacao = sinais_brutos.dataset_janelas(
+        lambda: sinais_brutos.gerar_lotes_fixos(armazem, [0, 16], 128, 0.5, 8), 128, len(fixos))
+    assert int(validacao.cardinality()) == len(fixos)
+    
+    classificador = EEGClassifier()
+    classificador.criar_modelo('cnn_bruto', {'tamanho_janela': 128, 'epochs': 4, 'passos_por_epoca': 10,
+                                             'learning_rate': 3e-3})
+    resultado = classificador.treinar_modelo(armazem, armazem.rotulos)
+    assert classificador.is_trained and resultado['accuracy'] >= 0.75
+    
+    # Salvo e carregado: mesma janela e mesmas predições, também em prever_lote_modelos
+    caminho = os.path.join(diretorio, 'modelo_cnn_bruto.pkl')
+    assert classificador.salvar_modelo(caminho)
+    carregado = EEGClassifier()
+    assert carregado.carregar_modelo(caminho) and carregado.usa_sinal_bruto
+    valores_por_id = {id_sinal: valores for id_sinal, valores, _ in sinais[:2] + sinais[-2:]}
+    predicoes = carregado.prever_valores_lote(valores_por_id)
+    assert predicoes[99] is None and predicoes[1]['classe_predita'] == 'Sim' and predicoes[16]['classe_predita'] == 'Não'
+    lote = prever_lote_modelos({'cnn_bruto': carregado}, list(valores_por_id), valores_por_id)
+    assert lote['cnn_bruto'][1]['probabilidade'] == predicoes[1]['probabilidade']
+    print(f"   ✅ Janelas balanceadas do memmap; acurácia por sinal {resultado['accuracy']:.3f}")
+
+def testar_destilacao():
+    """Testa a destilação do ensemble Keras no estudante com alvos suaves e o relatório de concordância"""
+    import tempfile
+    import destilacao
+    from ml_classifier import EEGClassifier
+    
+    print("\n🧪 TESTANDO DESTILAÇÃO DO ENSEMBLE")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(9)
+    t = np.arange(600)
+    valores = {}
+    for id_sinal in range(1, 61):
+        ruido = rng.normal(0, 20, len(t))
+        valores[id_sinal] = (ruido + (60 * np.sin(2 * np.pi * t / 16) if id_sinal % 2 else 0)).round()
+    ids = np.array(sorted(valores))
+    rotulos = np.where(np.arange(len(ids)) < 40, ids % 2, -1)  # 20 sinais sem categoria real
+    
+    extrator = EEGClassifier()
+    _, X = extrator.extrair_features_lote({i: valores[i] for i in ids[:40]})
+    diretorio = tempfile.mkdtemp()
+    caminhos = []
+    for tipo in ('mlp_tabular', 'cnn'):
+        professor = EEGClassifier()
+        professor.criar_modelo(tipo, {'epochs': 5, 'learning_rate': 3e-3})
+        professor.feature_names = list(NOMES_FEATURES)
+        professor.treinar_modelo(X, ids[:40] % 2)
+        caminhos.append(os.path.join(diretorio, f'modelo_{tipo}.pkl'))
+        assert professor.salvar_modelo(caminhos[-1])
+    professores = destilacao.carregar_professores(caminhos + [os.path.join(diretorio, 'inexistente.pkl')])
+    assert list(professores) == caminhos
+    
+    obtidos = []
+    def obter_valores(ids_bloco):
+        obtidos.append(len(ids_bloco))
+        return {i: valores[i] for i in ids_bloco}
+    caminho_modelo = os.path.join(diretorio, 'modelo_estudante.pkl')
+    caminho_relatorio = os.path.join(diretorio, 'destilacao.json')
+    relatorio = destilacao.destilar(professores, ids, rotulos, obter_valores, caminho_modelo=caminho_modelo,
+                                    caminho_relatorio=caminho_relatorio, log=lambda mensagem: None)
+    assert sum(obtidos) == 60 and relatorio['sinais_rotulados_pelo_ensemble'] == 60
+    assert relatorio['concordancia'] >= 0.8 and relatorio['erro_absoluto_medio'] < 0.3
+    assert relatorio['latencia_estudante_ms'] < relatorio['latencia_professor_ms']
+    assert destilacao.carregar_relatorio(caminho_relatorio)['versao'] == relatorio['versao']
+    
+    # Estudante salvo: tipo sklearn com floresta compilada, mesmas colunas do ensemble
+    estudante = EEGClassifier()
+    assert estudante.carregar_modelo(caminho_modelo) and estudante.floresta_compilada is not None
+    assert estudante.feature_names == relatorio['feature_names']
+    
+    # Alvos suaves: probabilidades próximas das do professor, não só a classe
+    suave = EEGClassifier()
+    suave.criar_modelo('estudante')
+    x = rng.normal(size=(400, 1))
+    alvo = 1 / (1 + np.exp(-2 * x[:, 0]))
+    suave.treinar_alvos_suaves(x, alvo)
+    assert np.mean(np.abs(suave.prever_matriz(x) - alvo)) < 0.1
+    print(f"   ✅ Concordância {relatorio['concordancia']:.1%}; latência {relatorio['latencia_estudante_ms']:.2f} ms "
+          f"vs {relatorio['latencia_professor_ms']:.2f} ms do ensemble")
+
+def testar_perfil_treino():
+    """Testa o perfil de treino: fases, épocas Keras, treino em processo e execuções gravadas"""
+    import json
+    import tempfile
+    import perfil_treino
+    from perfil_treino import PerfilTreino, salvar_perfil, listar_perfis
+    from ml_classifier import EEGClassifier
+    from treinamento_paralelo import treinar_modelos_paralelo
+    
+    print("\n🧪 TESTANDO PERFIL DE TREINO")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(4)
+    y = np.arange(60) % 2
+    X = (rng.normal(size=(60, len(NOMES_FEATURES_BASICAS))) + 1.5 * y[:, None]).astype(config.PIPELINE_DTYPE)
+    
+    perfil = PerfilTreino('teste')
+    with perfil.fase('calculo', amostras=1000) as registro:
+        sum(i * i for i in range(200000))
+        registro['extra'] = True
+    fase = perfil.fases[0]
+    assert fase['cpu_s'] > 0 and 0 < fase['utilizacao_cpu'] <= 1.5 and fase['amostras_por_s'] > 0 and fase['extra']
+    assert fase['rss_mb'] > 0 and fase['pico_rss_mb'] >= fase['rss_mb'] * 0.5
+    
+    # Sklearn e Keras no mesmo perfil: escala, ajuste e avaliação de cada um, e as épocas do Keras
+    for tipo, hiperparametros in (('random_forest', {'n_estimators': 10}), ('mlp_tabular', {'epochs': 3})):
+        modelo = EEGClassifier()
+        modelo.criar_modelo(tipo, hiperparametros)
+        modelo.perfil = perfil
+        modelo.treinar_modelo(X, y)
+        assert modelo.is_trained
+    fases = [(registro['fase'], registro['modelo']) for registro in perfil.fases[1:]]
+    assert fases == [('escala', 'RandomForestClassifier'), ('ajuste', 'RandomForestClassifier'),
+                     ('avaliacao', 'RandomForestClassifier'), ('escala', 'mlp_tabular'), ('ajuste', 'mlp_tabular'),
+                     ('avaliacao', 'mlp_tabular')]
+    epocas = perfil.epocas['mlp_tabular']
+    assert [registro['epoca'] for registro in epocas] == [1, 2, 3] and epocas[0]['amostras'] == 48
+    assert all(registro['amostras_por_s'] > 0 and 'val_loss' in registro for registro in epocas)
+    
+    # Sem psutil: RSS de /proc e CPU de process_time
+    psutil_original, perfil_treino.psutil = perfil_treino.psutil, None
+    try:
+        assert perfil_treino.medir()['rss_mb'] > 0 and perfil_treino.medidas_intervalo(
+            perfil_treino.medir(), perfil_treino.medir())['pico_rss_mb'] > 0
+    finally:
+        perfil_treino.psutil = psutil_original
+    
+    # Treino em outro processo: o perfil do processo volta com a conclusão
+    diretorio = tempfile.mkdtemp()
+    treinar_modelos_paralelo([('principal', 'random_forest', os.path.join(diretorio, 'rf.pkl'))], X, y,
+                             NOMES_FEATURES_BASICAS, log=lambda mensagem: None, perfil=perfil)
+    externo = perfil.resumo()['processos']['principal']
+    assert externo['status'] == 'completed' and 'ajuste' in [registro['fase'] for registro in externo['fases']]
+    
+    # Execuções gravadas: só as mais recentes ficam, listadas da mais nova para a mais antiga
+    for nome in ('a', 'b', 'c'):
+        execucao = PerfilTreino(nome)
+        execucao.finalizar('completed')
+        salvar_perfil(execucao, diretorio=diretorio, max_execucoes=2)
+    assert [resumo['nome'] for resumo in listar_perfis(diretorio)] == ['c', 'b']
+    json.dumps(perfil.resumo())
+    print(f"   ✅ {len(perfil.fases)} fases e {len(epocas)} épocas; {epocas[-1]['amostras_por_s']:.0f} amostras/s na última")
+
+def testar_triagem_qualidade():
+    """Testa a triagem de qualidade com sinais bons e corrompidos"""
+    
+    print("\n🔬 TESTANDO TRIAGEM DE QUALIDADE")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(3)
+    sinal_bom = rng.normal(0, 50, 2000).round()
+    
+    sinal_nan = sinal_bom.copy()
+    sinal_nan[10] = np.nan
+    
+    sinal_plano = sinal_bom.copy()
+    sinal_plano[500:700] = sinal_plano[500]
+    
+    sinal_saturado = np.clip(sinal_bom, -40, 40)
+    
+    casos = [
+        ("Sinal bom", sinal_bom, 0),
+        ("Com NaN", sinal_nan, FLAG_NAO_FINITO),
+        ("Trecho plano", sinal_plano, FLAG_LINHA_PLANA),
+        ("Saturado", sinal_saturado, FLAG_CLIPPING),
+        ("Curto", sinal_bom[:100], FLAG_CURTO),
+        ("Constante", np.zeros(1000), FLAG_LINHA_PLANA)
+    ]
+    
+    for nome, sinal, esperado in casos:
+        qualidade = avaliar_qualidade(sinal, max_trecho_plano=64)
+        print(f"   {nome}: flags={qualidade['flags']} {qualidade['motivos']}")
+        assert qualidade['flags'] & esperado == esperado, f"{nome}: flags {qualidade['flags']} sem {esperado}"
+        assert qualidade['valido'] == (esperado == 0)
+    
+    assert maior_trecho_constante(np.array([1, 1, 2, 2, 2, 3])) == 3
+    assert maior_trecho_constante(np.array([1, 2, 3])) == 1
+    print("   ✅ Triagem de qualidade CORRETA!")
+
 def executar_todos_testes():
     """Executa todos os testes"""
     
@@ -178,6 +1422,28 @@ def executar_todos_testes():
     testar_conexao_banco()
     criar_arquivo_teste()
     testar_dinamica_simbolica()
+    testar_features_epocas()
+    testar_complexidade()
+    testar_entropia_multiescala()
+    testar_predicao_lote()
+    testar_cache_predicoes()
+    testar_loteador_inferencia()
+    testar_floresta_compilada()
+    testar_mlp_numpy()
+    testar_cascata_inferencia()
+    testar_fila_tarefas()
+    testar_classificacao_continua()
+    testar_cache_datasets()
+    testar_treinamento_paralelo()
+    testar_aprendizado_online()
+    testar_floresta_incremental()
+    testar_busca_hiperparametros()
+    testar_validacao_cruzada()
+    testar_pipeline_dados()
+    testar_sinais_brutos()
+    testar_destilacao()
+    testar_perfil_treino()
+    testar_triagem_qualidade()
     
     print("\n" + "=" * 60)
     print("✅ TODOS OS TESTES CONCLUÍDOS!")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Treinamento paralelo de vários modelos em processos separados
+
+Cada modelo é treinado em um processo próprio (contexto 'spawn', seguro com o
+TensorFlow), com um orçamento de threads fixo: as variáveis OMP/MKL/OpenBLAS e as
+threads intra/inter-op do TensorFlow são definidas antes de importar as
+bibliotecas, então os processos não disputam os mesmos núcleos. Cada processo salva
+o seu modelo assim que termina e avisa o orquestrador por uma fila, que repassa o
+progresso (épocas do Keras) e a conclusão para o log do chamador; com um perfil,
+cada processo também devolve o seu PerfilTreino junto com a conclusão.
+"""
+
+import os
+import time
+import queue
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from config import config
+
+# Variáveis de ambiente que limitam as threads das bibliotecas numéricas
+VARIAVEIS_THREADS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                     'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS')
+
+def orcamento_threads(n_processos, n_nucleos=None):
+    """Threads por processo para que n_processos simultâneos não passem dos núcleos"""
+    if config.TRAINING_THREADS_PER_PROCESS > 0:
+        return config.TRAINING_THREADS_PER_PROCESS
+    n_nucleos = n_nucleos or os.cpu_count() or 1
+    return max(1, n_nucleos // max(n_processos, 1))
+
+def _variaveis_threads(n_threads):
+    """Valores das variáveis de ambiente para um orçamento de n_threads"""
+    return {variavel: str(1 if variavel == 'TF_NUM_INTEROP_THREADS' else n_threads) for variavel in VARIAVEIS_THREADS}
+
+@contextmanager
+def ambiente(variaveis):
+    """Define variáveis de ambiente dentro do bloco e restaura os valores anteriores ao sair"""
+    anteriores = {variavel: os.environ.get(variavel) for variavel in variaveis}
+    os.environ.update(variaveis)
+    try:
+        yield
+    finally:
+        for variavel, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(variavel, None)
+            else:
+                os.environ[variavel] = valor
+
+def _iniciar_com_ambiente(processo, variaveis):
+    """
+    Inicia o processo com as variáveis definidas: o filho 'spawn' herda o ambiente
+    já na criação, antes de importar o numpy (que lê OPENBLAS/OMP ao carregar)
+    """
+    with ambiente(variaveis):
+        processo.start()
+
+# Dataset e orçamento de threads de um processo de pool_treinamento (definidos no inicializador)
+dados_trabalhador = {}
+
+def _iniciar_trabalhador(n_threads, X, y, feature_names):
+    """Inicializador dos processos do pool: threads do TensorFlow e dataset compartilhado"""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    dados_trabalhador.update(X=X, y=y, feature_names=list(feature_names), n_threads=n_threads)
+
+@contextmanager
+def pool_treinamento(max_processos, X, y, feature_names):
+    """
+    Pool de processos 'spawn' para muitos treinos curtos (busca de hiperparâmetros,
+    validação cruzada). O dataset vai uma única vez para cada processo, pelo
+    inicializador, e fica em dados_trabalhador; o ambiente de threads vale enquanto o
+    pool existe, então todo processo nasce com ele.
+    """
+    n_threads = orcamento_threads(max_processos)
+    with ambiente(_variaveis_threads(n_threads)), \
+            ProcessPoolExecutor(max_workers=max_processos, mp_context=multiprocessing.get_context('spawn'),
+                                initializer=_iniciar_trabalhador,
+                                initargs=(n_threads, X, y, feature_names)) as pool:
+        yield pool
+
+def _treinar_processo(nome, tipo_modelo, caminho_arquivo, X, y, feature_names, n_threads, fila, intervalo_epocas,
+                      perfilar=False, ids_sinais=None):
+    """Corpo do processo de treinamento de um modelo"""
+    inicio = time.time()
+    perfil = None
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+        from ml_classifier import EEGClassifier
+
+        class ProgressoEpocas(tf.keras.callbacks.Callback):
+            """Envia o progresso das épocas para o orquestrador"""
+            def on_epoch_end(self, epoca, logs=None):
+                if epoca == 0 or (epoca + 1) % intervalo_epocas == 0:
+                    metricas = {chave: float(valor) for chave, valor in (logs or {}).items()
+                                if chave in ('loss', 'val_loss', 'accuracy', 'val_accuracy')}
+                    fila.put(('progresso', nome, {'epoca': epoca + 1, **metricas}))
+
+        modelo = EEGClassifier()
+        modelo.criar_modelo(tipo_modelo)
+        if hasattr(modelo.model, 'n_jobs'):
+            modelo.model.n_jobs = n_threads
+        modelo.feature_names = list(feature_names)
+        if ids_sinais is not None:
+            modelo.ids_treino = set(int(id_sinal) for id_sinal in ids_sinais)
+        modelo.callbacks_treino.append(ProgressoEpocas())
+        if perfilar:
+            from perfil_treino import PerfilTreino
+            perfil = modelo.perfil = PerfilTreino(nome)
+        fila.put(('inicio', nome, {'threads': n_threads, 'pid': os.getpid()}))
+
+        modelo.treinar_modelo(X, y)
+        if not modelo.is_trained:
+            erro = 'Modelo não foi treinado corretamente'
+        elif not modelo.salvar_modelo(caminho_arquivo):
+            erro = 'Erro ao salvar o modelo'
+        else:
+            erro = None
+        resultado = ({'sucesso': True, 'caminho': caminho_arquivo, 'versao': modelo.versao} if erro is None
+                     else {'sucesso': False, 'erro': erro})
+    except Exception as e:
+        resultado = {'sucesso': False, 'erro': str(e)}
+    resultado['duracao_s'] = time.time() - inicio
+    if perfil is not None:
+        perfil.finalizar('completed' if resultado['sucesso'] else 'error')
+        resultado['perfil'] = perfil.resumo()
+    fila.put(('fim', nome, resultado))
+
+def treinar_modelos_paralelo(especificacoes, X, y, feature_names, log=print, ao_concluir=None,
+                             max_processos=None, threads_por_processo=None, intervalo_epocas=10, perfil=None,
+                             ids_sinais=None):
+    """
+    Treina vários modelos ao mesmo tempo, cada um em um processo
+
+    Args:
+        especificacoes (list): Tuplas (nome, tipo_modelo, caminho do arquivo)
+        X (np.array): Features de treinamento
+        y (np.array): Rótulos
+        feature_names (list): Nomes das colunas de X
+        log (callable): Recebe as mensagens de progresso
+        ao_concluir (callable): Chamado com (nome, resultado) assim que cada modelo termina
+        max_processos (int): Processos simultâneos (padrão: config.TRAINING_PROCESSES, 0 = um por modelo)
+        threads_por_processo (int): Orçamento de threads (padrão: núcleos / processos)
+        intervalo_epocas (int): De quantas em quantas épocas o progresso é registrado
+        perfil (PerfilTreino): Recebe o perfil (fases e épocas) de cada processo
+        ids_sinais (np.array): ID do sinal de cada linha de X (salvo em ids_treino de cada modelo)
+
+    Returns:
+        dict: {nome: resultado com 'sucesso', 'duracao_s' e 'erro' ou 'caminho'/'versao'}
+    """
+    max_processos = max_processos or config.TRAINING_PROCESSES or len(especificacoes)
+    max_processos = max(1, min(max_processos, len(especificacoes)))
+    n_threads = threads_por_processo or orcamento_threads(max_processos)
+
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    pendentes = list(especificacoes)
+    ativos = {}
+    resultados = {}
+    inicio = time.time()
+    log(f"⚙️ Treinando {len(especificacoes)} modelos em até {max_processos} processos ({n_threads} threads cada)")
+
+    def finalizar(nome, resultado):
+        perfil_processo = resultado.pop('perfil', None)
+        if perfil is not None and perfil_processo is not None:
+            perfil.anexar(nome, perfil_processo)
+        resultados[nome] = resultado
+        processo = ativos.pop(nome, None)
+        if processo is not None:
+            processo.join(timeout=5)
+        if resultado['sucesso']:
+            log(f"✅ {nome} treinado e salvo em {resultado['duracao_s']:.1f}s")
+        else:
+            log(f"❌ {nome} falhou: {resultado.get('erro')}")
+        if ao_concluir:
+            try:
+                ao_concluir(nome, resultado)
+            except Exception as e:
+                log(f"⚠️ Erro ao carregar {nome} depois do treino: {e}")
+
+    while pendentes or ativos:
+        while pendentes and len(ativos) < max_processos:
+            nome, tipo_modelo, caminho_arquivo = pendentes.pop(0)
+            processo = contexto.Process(
+                target=_treinar_processo,
+                args=(nome, tipo_modelo, caminho_arquivo, X, y, feature_names, n_threads, fila, intervalo_epocas,
+                      perfil is not None, ids_sinais),
+                name=f"treino_{nome}", daemon=True)
+            _iniciar_com_ambiente(processo, _variaveis_threads(n_threads))
+            ativos[nome] = processo
+
+        try:
+            tipo, nome, dados = fila.get(timeout=0.5)
+        except queue.Empty:
+            # Processo que morreu sem avisar (ex.: falta de memória)
+            for nome, processo in list(ativos.items()):
+                if not processo.is_alive() and fila.empty():
+                    finalizar(nome, {'sucesso': False, 'erro': f'Processo terminou com código {processo.exitcode}',
+                                     'duracao_s': time.time() - inicio})
+            continue
+
+        if tipo == 'inicio':
+            log(f"🧠 {nome}: treinamento iniciado (pid {dados['pid']}, {dados['threads']} threads)")
+        elif tipo == 'progresso':
+            metricas = ', '.join(f"{chave} {valor:.4f}" for chave, valor in dados.items() if chave != 'epoca')
+            log(f"📈 {nome}: época {dados['epoca']} — {metricas}")
+        elif tipo == 'fim':
+            finalizar(nome, dados)
+
+    log(f"⏱️ Treinamento paralelo concluído em {time.time() - inicio:.1f}s")
+    return resultados
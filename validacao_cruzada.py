@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Validação cruzada estratificada para métricas honestas dos modelos
+
+O treino normal avalia em um único corte de 20% (cerca de 8 sinais), o que deixa a
+acurácia muito ruidosa. Aqui cada modelo é ajustado em k dobras estratificadas
+(opcionalmente repetidas com outra permutação), em paralelo no pool de
+treinamento_paralelo. Cada dobra cria um EEGClassifier novo, então o StandardScaler
+é ajustado só com o treino da dobra.
+
+As probabilidades de cada dobra ficam em cache (.npz por dobra), com chave nos
+dados, no tipo de modelo, nos hiperparâmetros e na divisão; repetir a validação
+com os mesmos dados só treina as dobras que faltam. O intervalo de confiança da
+média usa a variância corrigida de Nadeau e Bengio, que considera a sobreposição
+dos conjuntos de treino entre as dobras.
+
+Uso: python validacao_cruzada.py [tipo_modelo ...]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from datetime import datetime
+import numpy as np
+from scipy import stats
+from sklearn.model_selection import RepeatedStratifiedKFold
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from extracao_features import versao_extrator
+from busca_hiperparametros import melhores_hiperparametros
+from treinamento_paralelo import pool_treinamento, dados_trabalhador
+from config import config
+
+METRICAS = {
+    'acuracia': accuracy_score,
+    'precisao': lambda y, p: precision_score(y, p, zero_division=0),
+    'recall': lambda y, p: recall_score(y, p, zero_division=0),
+    'f1': lambda y, p: f1_score(y, p, zero_division=0)
+}
+
+def dividir_dobras(y, k, repeticoes=1, semente=42):
+    """
+    Dobras estratificadas (k é limitado pelo tamanho da menor classe)
+
+    Returns:
+        list: Tuplas (repetição, dobra, índices de treino, índices de teste)
+    """
+    k = max(2, min(k, int(np.bincount(np.asarray(y, dtype=int)).min())))
+    divisor = RepeatedStratifiedKFold(n_splits=k, n_repeats=repeticoes, random_state=semente)
+    return [(i // k, i % k, treino, teste) for i, (treino, teste) in enumerate(divisor.split(np.zeros(len(y)), y))]
+
+def chave_validacao(X, y, tipo_modelo, hiperparametros, k, repeticoes, semente):
+    """Hash dos dados e da configuração da validação (a chave do cache das dobras)"""
+    resumo = hashlib.sha1()
+    resumo.update(np.ascontiguousarray(X).tobytes())
+    resumo.update(np.ascontiguousarray(y).astype(np.int64).tobytes())
+    resumo.update(json.dumps([tipo_modelo, hiperparametros, k, repeticoes, semente, versao_extrator()],
+                             sort_keys=True, default=str).encode('utf-8'))
+    return resumo.hexdigest()[:16]
+
+def _caminho_dobra(chave, repeticao, dobra, diretorio):
+    return os.path.join(diretorio, f"cv_{chave}_{repeticao}_{dobra}.npz")
+
+def carregar_dobra(chave, repeticao, dobra, diretorio=None):
+    """Probabilidades em cache de uma dobra (None se ausente)"""
+    caminho = _caminho_dobra(chave, repeticao, dobra, diretorio or config.CV_CACHE_DIR)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with np.load(caminho) as dados:
+            return dados['probabilidades']
+    except Exception as e:
+        print(f"⚠️ Dobra em cache ilegível ({caminho}): {e}")
+        return None
+
+def salvar_dobra(chave, repeticao, dobra, probabilidades, diretorio=None, max_arquivos=None):
+    """Guarda as probabilidades de uma dobra (escrita atômica) e limpa os arquivos menos usados"""
+    diretorio = diretorio or config.CV_CACHE_DIR
+    max_arquivos = max_arquivos or config.CV_CACHE_MAX_FILES
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = _caminho_dobra(chave, repeticao, dobra, diretorio)
+        temporario = f"{caminho}.tmp.npz"
+        np.savez_compressed(temporario, probabilidades=probabilidades)
+        os.replace(temporario, caminho)
+
+        arquivos = sorted((os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+                           if nome.startswith('cv_') and nome.endswith('.npz') and '.tmp' not in nome),
+                          key=os.path.getmtime)
+        for antigo in arquivos[:max(len(arquivos) - max_arquivos, 0)]:
+            os.remove(antigo)
+    except Exception as e:
+        print(f"⚠️ Erro ao salvar dobra em cache: {e}")
+
+def ajustar_dobra(tipo_modelo, hiperparametros, treino, teste, X=None, y=None, feature_names=None):
+    """
+    Ajusta um modelo novo no treino da dobra (scaler incluído) e prevê o teste
+
+    Returns:
+        dict: 'probabilidades' e 'duracao_s' (ou 'erro')
+    """
+    from ml_classifier import EEGClassifier
+
+    inicio = time.time()
+    X = dados_trabalhador['X'] if X is None else X
+    y = dados_trabalhador['y'] if y is None else y
+    feature_names = dados_trabalhador['feature_names'] if feature_names is None else feature_names
+    try:
+        modelo = EEGClassifier()
+        modelo.criar_modelo(tipo_modelo, hiperparametros)
+        if 'n_threads' in dados_trabalhador and hasattr(modelo.model, 'n_jobs'):
+            modelo.model.n_jobs = dados_trabalhador['n_threads']
+        modelo.feature_names = list(feature_names)
+        modelo.treinar_modelo(X[treino], y[treino])
+        if not modelo.is_trained:
+            raise RuntimeError("Modelo não foi treinado")
+        return {'probabilidades': np.asarray(modelo.prever_matriz(X[teste]), dtype=np.float64),
+                'duracao_s': round(time.time() - inicio, 3)}
+    except Exception as e:
+        return {'erro': str(e), 'duracao_s': round(time.time() - inicio, 3)}
+
+def intervalo_confianca(valores, fracao_teste, confianca=0.95):
+    """
+    Intervalo da média das dobras com a variância corrigida de Nadeau e Bengio:
+    var * (1/J + n_teste/n_treino), com J dobras
+
+    Returns:
+        dict: 'media', 'desvio' e 'ic' ([inferior, superior], limitado a [0, 1])
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    media = float(valores.mean())
+    if len(valores) < 2:
+        return {'media': media, 'desvio': 0.0, 'ic': [media, media]}
+    variancia = valores.var(ddof=1) * (1.0 / len(valores) + fracao_teste / (1.0 - fracao_teste))
+    margem = float(stats.t.ppf(0.5 + confianca / 2, len(valores) - 1) * np.sqrt(variancia))
+    return {'media': media, 'desvio': float(valores.std(ddof=1)),
+            'ic': [max(0.0, media - margem), min(1.0, media + margem)]}
+
+def validar_modelo(X, y, feature_names, tipo_modelo='random_forest', k=None, repeticoes=None, semente=42,
+                   max_processos=None, hiperparametros=None, log=print, ajustar=None, diretorio_cache=None):
+    """
+    Validação cruzada estratificada de um tipo de modelo
+
+    Args:
+        k (int): Dobras (padrão: config.CV_FOLDS)
+        repeticoes (int): Repetições com outras permutações (padrão: config.CV_REPEATS)
+        max_processos (int): Processos do pool (padrão: config.CV_PROCESSES, 0 = núcleos)
+        hiperparametros (dict): Padrão: a melhor configuração da busca de hiperparâmetros
+        ajustar (callable): Substitui o pool (ajuste no próprio processo), para testes
+
+    Returns:
+        dict: Métricas por dobra, média e intervalo de 95% de cada métrica e a acurácia
+              das predições fora da dobra
+    """
+    inicio = time.time()
+    k = k or config.CV_FOLDS
+    repeticoes = repeticoes or config.CV_REPEATS
+    max_processos = max_processos or config.CV_PROCESSES or os.cpu_count() or 1
+    hiperparametros = melhores_hiperparametros(tipo_modelo) if hiperparametros is None else dict(hiperparametros)
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=int)
+
+    dobras = dividir_dobras(y, k, repeticoes, semente)
+    k = len(dobras) // repeticoes
+    chave = chave_validacao(X, y, tipo_modelo, hiperparametros, k, repeticoes, semente)
+
+    probabilidades = {}
+    faltando = []
+    for repeticao, dobra, treino, teste in dobras:
+        em_cache = carregar_dobra(chave, repeticao, dobra, diretorio_cache)
+        if em_cache is not None and len(em_cache) == len(teste):
+            probabilidades[(repeticao, dobra)] = em_cache
+        else:
+            faltando.append((repeticao, dobra, treino, teste))
+    log(f"🧪 Validação cruzada de {tipo_modelo}: {k} dobras x {repeticoes} repetições "
+        f"({len(dobras) - len(faltando)} em cache, {len(faltando)} para ajustar)")
+
+    if faltando:
+        if ajustar is None:
+            with pool_treinamento(min(max_processos, len(faltando)), X, y, feature_names) as pool:
+                resultados = list(pool.map(ajustar_dobra, [tipo_modelo] * len(faltando),
+                                           [hiperparametros] * len(faltando),
+                                           [treino for _, _, treino, _ in faltando],
+                                           [teste for _, _, _, teste in faltando]))
+        else:
+            resultados = [ajustar(tipo_modelo, hiperparametros, treino, teste) for _, _, treino, teste in faltando]
+
+        for (repeticao, dobra, _, _), resultado in zip(faltando, resultados):
+            if 'erro' in resultado:
+                raise RuntimeError(f"Dobra {dobra + 1} da repetição {repeticao + 1} falhou: {resultado['erro']}")
+            probabilidades[(repeticao, dobra)] = resultado['probabilidades']
+            salvar_dobra(chave, repeticao, dobra, resultado['probabilidades'], diretorio_cache)
+
+    # Métricas por dobra e predições fora da dobra de cada repetição
+    por_dobra = []
+    acertos_fora = np.zeros(repeticoes)
+    for repeticao, dobra, treino, teste in dobras:
+        preditos = (probabilidades[(repeticao, dobra)] >= 0.5).astype(int)
+        registro = {'repeticao': repeticao + 1, 'dobra': dobra + 1, 'n_teste': int(len(teste))}
+        registro.update({nome: float(metrica(y[teste], preditos)) for nome, metrica in METRICAS.items()})
+        por_dobra.append(registro)
+        acertos_fora[repeticao] += np.sum(preditos == y[teste])
+
+    fracao_teste = 1.0 / k
+    resultado = {
+        'tipo_modelo': tipo_modelo,
+        'hiperparametros': hiperparametros,
+        'k': k,
+        'repeticoes': repeticoes,
+        'amostras': int(len(y)),
+        'dobras': por_dobra,
+        'acuracia_fora_da_dobra': float(acertos_fora.mean() / len(y)),
+        'dobras_em_cache': len(dobras) - len(faltando),
+        'duracao_s': round(time.time() - inicio, 3),
+        'data': datetime.now().isoformat(timespec='seconds')
+    }
+    for nome in METRICAS:
+        resultado[nome] = intervalo_confianca([registro[nome] for registro in por_dobra], fracao_teste)
+
+    acuracia = resultado['acuracia']
+    log(f"📊 {tipo_modelo}: acurácia {acuracia['media']:.4f} "
+        f"(IC 95% {acuracia['ic'][0]:.4f}–{acuracia['ic'][1]:.4f}) em {resultado['duracao_s']:.1f}s")
+    return resultado
+
+def carregar_resultados(caminho=None):
+    """Resultados gravados por tipo de modelo ({} se nunca houve validação)"""
+    caminho = caminho or config.CV_RESULTS_PATH
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Resultados de validação ilegíveis em {caminho}: {e}")
+        return {}
+
+def salvar_resultado(resultado, caminho=None):
+    """Grava o resultado do tipo de modelo, mantendo os dos outros tipos (escrita atômica)"""
+    caminho = caminho or config.CV_RESULTS_PATH
+    resultados = carregar_resultados(caminho)
+    resultados[resultado['tipo_modelo']] = resultado
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+def validar_com_dataset(tipos_modelos=None, log=print, **kwargs):
+    """Valida os tipos de modelo no dataset de todos os sinais rotulados e grava os resultados"""
+    from ml_classifier import EEGClassifier
+
+    X, y, feature_names = EEGClassifier().criar_dataset(limite=None)
+    if X is None:
+        raise RuntimeError("Dataset de treinamento indisponível")
+    resultados = {}
+    for tipo_modelo in tipos_modelos or ['random_forest']:
+        resultados[tipo_modelo] = validar_modelo(X, y, feature_names, tipo_modelo, log=log, **kwargs)
+        salvar_resultado(resultados[tipo_modelo])
+    return resultados
+
+if __name__ == "__main__":
+    validar_com_dataset(sys.argv[1:] or None)